@@ -0,0 +1,329 @@
+"""Benchmarks de tiempo por frame para los caminos de dibujo y actualización.
+
+Corre con los drivers ``dummy`` de SDL (sin ventana ni audio) y mide cada
+camino con cargas parametrizadas. Uso::
+
+    python benchmark.py --output bench.json
+    python benchmark.py --output nuevo.json --compare bench.json
+
+Con ``--compare`` se marca como regresión cualquier camino cuya media o p95
+empeore más que ``--threshold`` y el proceso termina con código 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from functools import partial
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from ritmo_runner.config import BEAT_DURATION, GOLD, HEIGHT, KEYS, LEVELS, QUALITY_PRESETS, TUTORIAL, WIDTH
+from ritmo_runner.game import Game
+from ritmo_runner.particles import ParticleSystem
+from ritmo_runner.render import draw_note, draw_player, init_display
+from ritmo_runner.simulation import SIM_STEP, ManualClock, Note
+from ritmo_runner.viewport import Viewport, make_viewport
+
+NOTE_LOADS = [10, 100, 1000]
+PARTICLE_LOADS = [100, 1000, 4000]
+# Ventana a pantalla completa para medir las calidades de la resolución interna;
+# el escalado a la ventana lo hace la GPU al presentar y no entra en la medida
+FULLSCREEN_SIZE = (1920, 1080)
+
+
+# === CARGAS ===
+def make_game(seed=0, dirty_rects=False, quality=1.0, window_size=(WIDTH, HEIGHT)):
+    # Sin ventana: se dibuja el objetivo interno y no se presenta nada
+    if not pygame.display.get_init():
+        pygame.display.init()
+    viewport = Viewport(quality=quality, size=window_size)
+    game = Game(viewport=viewport, clock=ManualClock(), seed=seed, dirty_rects=dirty_rects,
+                record_replays=False, record_telemetry=False)
+    game.start_game()
+    return game
+
+
+def fill_notes(sim, count, on_screen=True):
+    rng = np.random.default_rng(count)
+    for i in range(count):
+        figures = LEVELS[sim.current_level]['figures']
+        fig = figures[i % len(figures)]
+        if on_screen:
+            # El tiempo en que la nota está en una x al azar de la pantalla
+            x = float(rng.uniform(0, WIDTH))
+            time = sim.time + (x - sim.player.x) / sim.speed
+        else:
+            time = (1e6 + i) * BEAT_DURATION
+        sim.notes.add(Note(fig, i % len(KEYS), time / BEAT_DURATION, sim.current_level, time))
+
+
+def top_up_particles(particles, count):
+    missing = count - len(particles)
+    if missing > 0:
+        vx = particles.rng.uniform(-4, 4, missing)
+        vy = particles.rng.uniform(-6, -2, missing)
+        particles.emit(WIDTH // 2, HEIGHT // 2, GOLD, vx, vy)
+
+
+# === CAMINOS ===
+def bench_background(level):
+    game = make_game()
+    game.sim.current_level = level
+
+    def frame(i):
+        game.sim.scroll_x += 5
+        game.draw_background()
+    return None, frame, game.shutdown
+
+
+def bench_lanes():
+    game = make_game()
+
+    def setup(i):
+        game.sim.lane_flash[i % 4] = 1.0
+
+    def frame(i):
+        game.draw_lanes()
+    return setup, frame, game.shutdown
+
+
+def bench_ui(level):
+    game = make_game()
+    game.sim.current_level = level
+
+    def setup(i):
+        game.sim.score += 37
+        game.sim.combo = i % 50
+        game.sim.feedback_text = f"GOOD +{i % 200}"
+        game.sim.feedback_timer = 1.0
+        game.sim.time += SIM_STEP
+
+    def frame(i):
+        game.draw_ui()
+    return setup, frame, game.shutdown
+
+
+def bench_notes_draw(count):
+    game = make_game()
+    fill_notes(game.sim, count)
+    sim = game.sim
+    notes = list(sim.notes)
+
+    def frame(i):
+        t = sim.time + i * SIM_STEP
+        for note in notes:
+            draw_note(game.screen, note, sim.note_x(note, t), 350 + note.lane * 60, t)
+    return None, frame, game.shutdown
+
+
+def bench_player_draw():
+    game = make_game()
+    player = game.sim.player
+
+    def setup(i):
+        player.update(SIM_STEP)
+
+    def frame(i):
+        draw_player(game.screen, player)
+    return setup, frame, game.shutdown
+
+
+def bench_particles_update(count):
+    particles = ParticleSystem(capacity=max(count, 4096))
+
+    def setup(i):
+        top_up_particles(particles, count)
+
+    def frame(i):
+        particles.update()
+    return setup, frame, None
+
+
+def bench_particles_draw(count):
+    game = make_game()
+    particles = ParticleSystem(capacity=max(count, 4096))
+
+    def setup(i):
+        top_up_particles(particles, count)
+        particles.update()
+
+    def frame(i):
+        particles.draw(game.screen)
+    return setup, frame, game.shutdown
+
+
+def bench_game_update(count):
+    game = make_game()
+    fill_notes(game.sim, count, on_screen=False)
+
+    def setup(i):
+        game.clock.advance(SIM_STEP)
+
+    def frame(i):
+        game.update(SIM_STEP)
+    return setup, frame, game.shutdown
+
+
+def bench_frame(dirty_rects, quality=1.0, window_size=(WIDTH, HEIGHT)):
+    # Frame completo (actualización + dibujo + presentación) durante la partida
+    game = make_game(dirty_rects=dirty_rects, quality=quality, window_size=window_size)
+
+    def setup(i):
+        game.clock.advance(SIM_STEP)
+        game.update(SIM_STEP)
+
+    def frame(i):
+        game.draw()
+    return setup, frame, game.shutdown
+
+
+def bench_upload(quality):
+    # Lo que cuesta en CPU presentar: subir el objetivo entero a la textura
+    viewport = make_viewport(init_display(FULLSCREEN_SIZE, gpu=True), quality)
+
+    def frame(i):
+        viewport.invalidate()
+        viewport.compose()
+    return None, frame, viewport.close
+
+
+def bench_static_frame(dirty_rects):
+    game = make_game(dirty_rects=dirty_rects)
+    game.state = TUTORIAL
+
+    def frame(i):
+        game.draw()
+    return None, frame, game.shutdown
+
+
+def benchmarks():
+    # Pares (nombre, fábrica): cada camino se prepara sólo si se va a medir
+    for level in range(len(LEVELS)):
+        yield f"draw_background[level={level}]", partial(bench_background, level)
+    yield "draw_lanes", bench_lanes
+    for level in range(len(LEVELS)):
+        yield f"draw_ui[level={level}]", partial(bench_ui, level)
+    for count in NOTE_LOADS:
+        yield f"note_draw[notes={count}]", partial(bench_notes_draw, count)
+    yield "player_draw", bench_player_draw
+    for count in PARTICLE_LOADS:
+        yield f"particles_update[particles={count}]", partial(bench_particles_update, count)
+        yield f"particles_draw[particles={count}]", partial(bench_particles_draw, count)
+    for count in NOTE_LOADS:
+        yield f"game_update[notes={count}]", partial(bench_game_update, count)
+    for mode, dirty_rects in (('full', False), ('dirty', True)):
+        yield f"frame_playing[{mode}]", partial(bench_frame, dirty_rects)
+        yield f"frame_tutorial[{mode}]", partial(bench_static_frame, dirty_rects)
+    for name, quality in QUALITY_PRESETS.items():
+        yield f"frame_playing[1080p,quality={name}]", partial(bench_frame, False, quality, FULLSCREEN_SIZE)
+        yield f"present_upload[1080p,quality={name}]", partial(bench_upload, quality)
+
+
+# === MEDICIÓN ===
+def measure(setup, frame, frames, warmup):
+    for i in range(warmup):
+        if setup:
+            setup(i)
+        frame(i)
+    times = np.empty(frames)
+    perf_counter = time.perf_counter
+    for i in range(frames):
+        if setup:
+            setup(warmup + i)
+        start = perf_counter()
+        frame(warmup + i)
+        times[i] = perf_counter() - start
+    return summarize(times * 1000.0)
+
+
+def summarize(times_ms):
+    p50, p95, p99 = np.percentile(times_ms, [50, 95, 99])
+    return {
+        'mean_ms': float(times_ms.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'frames': int(len(times_ms)),
+    }
+
+
+def run(frames=300, warmup=30, name_filter=None):
+    results = {}
+    for name, factory in benchmarks():
+        if name_filter and name_filter not in name:
+            continue
+        setup, frame, teardown = factory()
+        try:
+            results[name] = measure(setup, frame, frames, warmup)
+        finally:
+            if teardown:
+                teardown()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Devuelve la lista de caminos más lentos que en ``baseline``."""
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for metric in ('mean_ms', 'p95_ms'):
+            if old[metric] > 0 and new[metric] > old[metric] * (1 + threshold):
+                regressions.append((name, metric, old[metric], new[metric]))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'camino':42} {'media':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, r in results.items():
+        print(f"{name:42} {r['mean_ms']:8.3f} {r['p50_ms']:8.3f} {r['p95_ms']:8.3f} {r['p99_ms']:8.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de tiempo por frame de Ritmo Runner")
+    parser.add_argument('--frames', type=int, default=300, help="frames medidos por camino")
+    parser.add_argument('--warmup', type=int, default=30, help="frames de calentamiento sin medir")
+    parser.add_argument('--filter', dest='name_filter', help="sólo caminos cuyo nombre contenga este texto")
+    parser.add_argument('--output', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--compare', help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="empeoramiento relativo tolerado antes de marcar regresión")
+    args = parser.parse_args(argv)
+
+    results = run(args.frames, args.warmup, args.name_filter)
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'pygame': pygame.version.ver,
+                    'numpy': np.__version__,
+                    'machine': platform.machine(),
+                    'frames': args.frames,
+                    'timestamp': time.time(),
+                },
+                'results': results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"REGRESIÓN {name} {metric}: {old:.3f} -> {new:.3f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Ritmo Runner: juego educativo para aprender figuras rítmicas.
+
+Importar el paquete es barato: sólo carga las constantes y la simulación, que
+no dependen de pygame. ``Game``, ``ParticleSystem`` y ``SoundBank`` se
+importan al primer acceso.
+"""
+from importlib import import_module
+
+from .config import (
+    BEAT_DURATION, BPM, FIGURES, GAMEOVER, HEIGHT, HIT_WINDOW_GOOD, HIT_WINDOW_OK,
+    HIT_WINDOW_PERFECT, KEY_NAMES, KEYS, LANE_COLORS, LEVEL_POINTS, LEVELS, MENU, NOTE_PITCHES,
+    PAUSED, PLAYING, TUTORIAL, WIDTH,
+)
+from .autoplay import Bot
+from .simulation import SIM_STEP, ManualClock, Note, NoteStore, Player, Simulation, WallClock
+from .tempo import TempoCursor, TempoMap
+
+_LAZY = {
+    'Game': '.game',
+    'ParticleSystem': '.particles',
+    'SoundBank': '.audio',
+    'main': '.app',
+}
+
+__all__ = [
+    'BEAT_DURATION', 'BPM', 'FIGURES', 'GAMEOVER', 'HEIGHT', 'HIT_WINDOW_GOOD',
+    'HIT_WINDOW_OK', 'HIT_WINDOW_PERFECT', 'KEY_NAMES', 'KEYS', 'LANE_COLORS', 'LEVEL_POINTS',
+    'LEVELS', 'MENU', 'NOTE_PITCHES', 'PAUSED', 'PLAYING', 'TUTORIAL', 'WIDTH', 'SIM_STEP',
+    'Bot', 'ManualClock', 'Note', 'NoteStore', 'Player', 'Simulation', 'TempoCursor', 'TempoMap',
+    'WallClock',
+    *_LAZY,
+]
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
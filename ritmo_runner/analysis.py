@@ -0,0 +1,274 @@
+"""Partituras automáticas a partir de un WAV: ataques, tempo y cuantización.
+
+El audio se recorre por bloques de ``BLOCK`` ventanas (STFT con ventana de
+Hann de ``FRAME`` muestras y salto ``HOP``) leídos por ``mmap``, así que la
+memoria no depende del largo de la canción. De cada ventana sólo se guarda el
+flujo espectral (cuánto crece la energía respecto a la anterior) y el
+centroide espectral. Con eso se detectan los ataques, se estima el tempo por
+autocorrelación y la fase del pulso, se cuantizan los ataques a la rejilla de
+semicorcheas eligiendo para cada uno la figura de ``FIGURES`` que cabe hasta
+el siguiente, y el carril sale del centroide (graves a la izquierda).
+
+El resultado se guarda compilado (``.rrc``) en la caché, con el hash del
+archivo en el nombre: volver a abrir la misma canción no analiza nada.
+
+Uso::
+
+    python -m ritmo_runner.analysis cancion.wav
+    python -m ritmo_runner.analysis cancion.wav -o cancion.chart
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+from .config import FIGURES
+
+FRAME = 2048
+HOP = 512
+BLOCK = 512
+MIN_BPM = 60
+MAX_BPM = 200
+GRID = 0.25
+VERSION = 2
+
+
+def default_analysis_cache():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ritmo_runner', 'analysis')
+
+
+# === LECTURA ===
+def wav_data_offset(path):
+    """Desplazamiento en bytes del bloque ``data`` de un archivo RIFF/WAVE."""
+    with open(path, 'rb') as f:
+        if f.read(12)[8:] != b'WAVE':
+            raise ValueError(f"{path}: no es un WAV")
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"{path}: WAV sin datos")
+            size = int.from_bytes(chunk[4:], 'little')
+            if chunk[:4] == b'data':
+                return f.tell()
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def open_wav(path):
+    """Devuelve ``(muestras, frecuencia)``: un ``memmap`` int16 de forma (muestras, canales)."""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: sólo se admite PCM de 16 bits")
+        channels = wav.getnchannels()
+        frames = wav.getnframes()
+        rate = wav.getframerate()
+    if frames == 0:
+        raise ValueError(f"{path}: WAV vacío")
+    data = np.memmap(path, dtype='<i2', mode='r', offset=wav_data_offset(path), shape=(frames, channels))
+    return data, rate
+
+
+def file_hash(path, chunk=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while block := f.read(chunk):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# === ANÁLISIS ===
+def onset_envelope(samples, rate, frame=FRAME, hop=HOP, block=BLOCK):
+    """Flujo espectral y centroide (Hz) de cada ventana, calculados bloque a bloque."""
+    total = max(0, 1 + (len(samples) - frame) // hop)
+    flux = np.zeros(total, dtype=np.float32)
+    centroid = np.zeros(total, dtype=np.float32)
+    window = np.hanning(frame).astype(np.float32)
+    freqs = np.fft.rfftfreq(frame, 1 / rate).astype(np.float32)
+    prev = None
+    for first in range(0, total, block):
+        count = min(block, total - first)
+        start = first * hop
+        chunk = samples[start:start + (count - 1) * hop + frame].astype(np.float32).mean(axis=1) / 32768
+        frames = np.lib.stride_tricks.sliding_window_view(chunk, frame)[::hop]
+        spectrum = np.abs(np.fft.rfft(frames * window, axis=1)).astype(np.float32)
+        # Compresión logarítmica: los ataques suaves cuentan casi como los fuertes
+        magnitude = np.log1p(100 * spectrum)
+        previous = magnitude[:1] if prev is None else prev
+        rise = np.diff(magnitude, axis=0, prepend=previous)
+        flux[first:first + count] = np.maximum(rise, 0).sum(axis=1)
+        centroid[first:first + count] = (spectrum * freqs).sum(axis=1) / (spectrum.sum(axis=1) + 1e-9)
+        prev = magnitude[-1:]
+    return flux, centroid
+
+
+def pick_onsets(flux, fps, wait=0.07, average=0.15, delta=0.05):
+    """Índices de las ventanas con un ataque: máximos locales sobre la media móvil."""
+    if len(flux) < 3:
+        return np.zeros(0, dtype=np.int64)
+    env = flux / (flux.max() or 1)
+    w = max(1, int(average * fps))
+    mean = np.convolve(np.pad(env, w, mode='reflect'), np.ones(2 * w + 1) / (2 * w + 1), mode='valid')
+    m = max(1, int(wait * fps / 2))
+    padded = np.pad(env, m, mode='edge')
+    local_max = env >= np.lib.stride_tricks.sliding_window_view(padded, 2 * m + 1).max(axis=1)
+    candidates = np.flatnonzero(local_max & (env > mean + delta))
+    # Separación mínima entre ataques
+    onsets = []
+    for i in candidates:
+        if not onsets or i - onsets[-1] >= wait * fps:
+            onsets.append(i)
+    return np.array(onsets, dtype=np.int64)
+
+
+def estimate_tempo(flux, fps, min_bpm=MIN_BPM, max_bpm=MAX_BPM):
+    """Devuelve ``(bpm, fase)``; la fase es el segundo del primer pulso."""
+    n = len(flux)
+    if n < 3:
+        return 120.0, 0.0
+    env = flux - flux.mean()
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    spectrum = np.fft.rfft(env, size)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n]
+    # Hacia dentro del rango: ``lo`` redondeado hacia abajo pasaría de ``max_bpm``
+    lo = max(1, int(np.ceil(60 * fps / max_bpm)))
+    hi = min(n - 2, int(np.ceil(60 * fps / min_bpm)))
+    if hi <= lo:
+        return 120.0, 0.0
+    lags = np.arange(lo, hi + 1)
+    # Sin periodicidad (silencio, audio plano) no hay tempo que estimar
+    if autocorr[lags].max() <= 0:
+        return 120.0, 0.0
+    # Preferencia suave por tempos cercanos a 120 para no elegir el doble o la mitad
+    prior = np.exp(-0.5 * (np.log2(60 * fps / lags / 120)) ** 2)
+    best = lags[np.argmax(autocorr[lags] * prior)]
+    # Interpolación parabólica del máximo
+    a, b, c = autocorr[best - 1], autocorr[best], autocorr[best + 1]
+    shift = 0.5 * (a - c) / (a - 2 * b + c) if a - 2 * b + c else 0.0
+    period = best + float(np.clip(shift, -0.5, 0.5))
+    # Afinado: el máximo en 2, 4, 8... periodos reparte el error de medio frame
+    # entre muchos pulsos; sin esto la rejilla se desplaza en canciones largas
+    multiple = 2
+    while multiple * period + 3 < n // 2:
+        center = int(round(multiple * period))
+        window = np.arange(center - 2, center + 3)
+        peak = window[np.argmax(autocorr[window])]
+        a, b, c = autocorr[peak - 1], autocorr[peak], autocorr[peak + 1]
+        shift = 0.5 * (a - c) / (a - 2 * b + c) if a - 2 * b + c else 0.0
+        period = (peak + float(np.clip(shift, -0.5, 0.5))) / multiple
+        multiple *= 2
+    bpm = 60 * fps / period
+    
+    # Fase: el desplazamiento cuya rejilla de pulsos recoge más flujo
+    steps = int(np.ceil(period))
+    grid = np.arange(0, n - period, period)
+    scores = [env[np.minimum((grid + offset).astype(np.int64), n - 1)].sum() for offset in range(steps)]
+    phase = int(np.argmax(scores)) / fps
+    return bpm, phase
+
+
+def quantize(times, strengths, centroids, bpm, phase, grid=GRID):
+    """Notas ``(pulso, carril, figura)`` a partir de los ataques en segundos."""
+    if len(times) == 0:
+        return []
+    beat = 60 / bpm
+    beats = phase / beat + np.round((times - phase) / beat / grid) * grid
+    # Un ataque por celda de la rejilla: el más fuerte
+    order = np.lexsort((-strengths, beats))
+    beats, strengths, centroids = beats[order], strengths[order], centroids[order]
+    keep = np.concatenate([[True], np.diff(beats) > grid / 2])
+    keep &= beats >= 0
+    beats, centroids = beats[keep], centroids[keep]
+    
+    # Figura: la más larga que cabe hasta la siguiente nota
+    figures = sorted(FIGURES, key=lambda name: -FIGURES[name]['duration'])
+    durations = np.array([FIGURES[name]['duration'] for name in figures])
+    gaps = np.diff(beats, append=beats[-1] + 1) + 1e-6
+    choice = np.minimum(np.searchsorted(-durations, -gaps, side='left'), len(figures) - 1)
+    # Carril por cuartiles del centroide: graves a la izquierda, agudos a la derecha
+    edges = np.quantile(centroids, [0.25, 0.5, 0.75]) if len(centroids) >= 4 else []
+    lanes = np.searchsorted(edges, centroids) if len(edges) else np.zeros(len(beats), dtype=np.int64)
+    return [(round(float(b), 4), int(lane), figures[i]) for b, lane, i in zip(beats, lanes, choice)]
+
+
+def analyze(path):
+    """Analiza un WAV y devuelve ``(meta, notas)`` como ``chart.parse_chart``."""
+    samples, rate = open_wav(path)
+    hop = max(1, round(HOP * rate / 44100))
+    frame = max(hop * 2, round(FRAME * rate / 44100))
+    if len(samples) < frame:
+        raise ValueError(f"{path}: demasiado corto para analizar ({len(samples)} muestras)")
+    flux, centroid = onset_envelope(samples, rate, frame, hop)
+    fps = rate / hop
+    bpm, phase = estimate_tempo(flux, fps)
+    onsets = pick_onsets(flux, fps)
+    # Tiempo de cada ataque: centro de su ventana
+    times = (onsets * hop + frame / 2) / rate
+    notes = quantize(times, flux[onsets], centroid[onsets], bpm, phase)
+    title = os.path.splitext(os.path.basename(path))[0][:64]
+    return {'title': title, 'bpm': round(float(bpm), 3)}, notes
+
+
+# === CACHÉ ===
+def chart_for_song(path, cache_dir=None):
+    """Partitura compilada de un WAV; sólo se analiza si no está ya en la caché."""
+    from .chart import ChartError, check_compiled, write_compiled
+    cache_dir = cache_dir or default_analysis_cache()
+    cached = os.path.join(cache_dir, f"{file_hash(path)}-{VERSION}.rrc")
+    if os.path.exists(cached):
+        try:
+            check_compiled(cached)
+            return cached
+        except ChartError:
+            # Entrada truncada o de otra versión: se vuelve a analizar
+            pass
+    meta, notes = analyze(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    write_compiled(cached, meta, notes)
+    return cached
+
+
+def write_source(path, meta, notes):
+    """Guarda las notas en formato fuente (``.chart``) para retocarlas a mano."""
+    from .config import KEY_NAMES
+    lines = ["# Generada por ritmo_runner.analysis", f"title = {meta['title']}", f"bpm = {meta['bpm']}", ""]
+    lines.extend(f"{beat:<10g} {KEY_NAMES[lane]}  {figure}" for beat, lane, figure in notes)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ritmo_runner.analysis',
+                                     description="Genera una partitura de Ritmo Runner a partir de un WAV")
+    parser.add_argument('path', help="canción en WAV PCM de 16 bits")
+    parser.add_argument('-o', '--output', help="guardar también la partitura fuente (.chart)")
+    parser.add_argument('--cache-dir', help="carpeta de la caché de análisis")
+    args = parser.parse_args(argv)
+    
+    try:
+        samples, rate = open_wav(args.path)
+        start = time.perf_counter()
+        if args.output:
+            meta, notes = analyze(args.path)
+            write_source(args.output, meta, notes)
+            target, bpm, count = args.output, meta['bpm'], len(notes)
+        else:
+            from .chart import read_header
+            target = chart_for_song(args.path, args.cache_dir)
+            header = read_header(target)
+            bpm, count = header['bpm'], header['count']
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError, wave.Error) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    duration = len(samples) / rate
+    print(f"{args.path} -> {target}\n{bpm:.1f} BPM, {count} notas, "
+          f"{duration:.0f} s de audio en {elapsed:.2f} s ({duration / max(elapsed, 1e-9):.0f}x tiempo real)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
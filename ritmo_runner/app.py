@@ -0,0 +1,176 @@
+"""Punto de entrada: ``ritmo-runner`` o ``python -m ritmo_runner``.
+
+Los módulos pesados (pygame, NumPy, el juego) se importan aquí dentro de
+``main`` para que ``--profile-startup`` pueda medir cada fase del arranque.
+"""
+import argparse
+import cProfile
+import io
+import pstats
+import sys
+import time
+import wave
+from contextlib import contextmanager
+
+from .autoplay import PROFILES
+from .config import QUALITY_PRESETS
+
+
+class StartupProfiler:
+    """Mide fases del arranque y, si está activo, las funciones más costosas."""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.phases = []
+        self.profile = cProfile.Profile() if enabled else None
+    
+    @contextmanager
+    def phase(self, name):
+        if self.profile is not None:
+            self.profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+            if self.profile is not None:
+                self.profile.disable()
+    
+    def report(self, out=sys.stderr, top=15):
+        total = time.perf_counter() - self.origin
+        print(f"{'fase':28} {'ms':>9} {'%':>6}", file=out)
+        for name, elapsed in self.phases:
+            print(f"{name:28} {elapsed * 1000:9.1f} {100 * elapsed / total:6.1f}", file=out)
+        print(f"{'total':28} {total * 1000:9.1f}", file=out)
+        
+        if self.profile is not None:
+            buf = io.StringIO()
+            pstats.Stats(self.profile, stream=buf).sort_stats('cumulative').print_stats(top)
+            print(buf.getvalue(), file=out)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='ritmo-runner', description="Ritmo Runner: aprende ritmos con música")
+    parser.add_argument('--seed', type=int, help="semilla para generar siempre las mismas notas")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--chart', help="partitura a tocar (.chart o .rrc) en lugar de notas aleatorias")
+    source.add_argument('--song', metavar='WAV',
+                        help="tocar una canción (WAV PCM de 16 bits) con su partitura generada automáticamente")
+    parser.add_argument('--fps', type=int, default=60, help="límite de fotogramas por segundo (0 = sin límite)")
+    parser.add_argument('--vsync', action='store_true',
+                        help="sincronizar con el refresco del monitor en lugar de limitar los fps")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="repintar y presentar sólo las zonas de pantalla que cambian")
+    parser.add_argument('--quality', default='alta', choices=[*QUALITY_PRESETS, 'auto'],
+                        help="resolución interna: baja (50 %%), media (75 %%), alta (100 %%) o auto "
+                             "(baja si los frames no caben en el presupuesto)")
+    parser.add_argument('--fullscreen', action='store_true', help="jugar a pantalla completa")
+    parser.add_argument('--replay-dir', help="carpeta donde guardar las repeticiones de cada partida")
+    parser.add_argument('--no-replays', action='store_true', help="no grabar repeticiones")
+    parser.add_argument('--player', default='', help="nombre del jugador en la telemetría de sus sesiones")
+    parser.add_argument('--telemetry-dir', help="carpeta donde guardar la telemetría de cada partida")
+    parser.add_argument('--no-telemetry', action='store_true', help="no grabar telemetría")
+    parser.add_argument('--autoplay', nargs='?', const='experto', choices=list(PROFILES), metavar='PERFIL',
+                        help=f"deja jugar al bot con un perfil ({', '.join(PROFILES)}; por defecto experto)")
+    parser.add_argument('--join', metavar='HOST[:PUERTO]',
+                        help="unirse a la partida de la clase que sirve `python -m ritmo_runner.classroom serve`")
+    parser.add_argument('--mute', action='store_true', help="no abrir el mezclador de audio")
+    parser.add_argument('--metronome', action='store_true', help="empezar con el metrónomo encendido (también con M)")
+    parser.add_argument('--backing', metavar='WAV', help="pista de fondo (WAV PCM de 16 bits) en lugar de la sintetizada")
+    parser.add_argument('--no-backing', action='store_true', help="jugar sin pista de fondo")
+    parser.add_argument('--profile', action='store_true',
+                        help="mostrar desde el inicio el overlay de tiempos por frame (también con F3)")
+    parser.add_argument('--trace', metavar='ARCHIVO',
+                        help="guardar al salir una traza en formato Chrome trace-event JSON")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="mostrar cuánto tarda cada fase del arranque y salir")
+    parser.add_argument('--power-report', action='store_true',
+                        help="mostrar al salir el tiempo de CPU y los fps de cada estado del juego")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = StartupProfiler(args.profile_startup)
+    
+    with profiler.phase('import pygame'):
+        import pygame
+    with profiler.phase('import juego'):
+        from .audio import AudioEngine, SynthBacking, WavBacking, init_mixer
+        from .game import Game
+        from .render import get_fonts, init_display
+        from .viewport import make_viewport
+    chart_path = args.chart
+    if args.song:
+        with profiler.phase('análisis canción'):
+            # Sólo la primera vez: después la partitura sale de la caché
+            from .analysis import chart_for_song
+            try:
+                chart_path = chart_for_song(args.song)
+            except (OSError, ValueError, wave.Error) as exc:
+                print(f"error: {exc}", file=sys.stderr)
+                return 1
+    if chart_path:
+        # Antes de abrir la ventana: una partitura dañada se recompila o se informa aquí
+        from .chart import ChartError, load_chart
+        try:
+            load_chart(chart_path)
+        except (OSError, ChartError) as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+    engine = None
+    if not args.mute:
+        with profiler.phase('mezclador'):
+            # Motor propio de baja latencia; si SDL no lo abre, pygame.mixer
+            try:
+                backing = None
+                if args.song:
+                    backing = WavBacking(args.song, loop=False)
+                elif args.backing:
+                    backing = WavBacking(args.backing)
+                elif not args.no_backing:
+                    backing = SynthBacking()
+                engine = AudioEngine(backing=backing).open()
+                engine.metronome = args.metronome
+            except (OSError, ValueError, RuntimeError) as exc:
+                print(f"aviso: {exc}; se usa pygame.mixer", file=sys.stderr)
+                engine = None
+                init_mixer()
+    with profiler.phase('ventana'):
+        # Sólo se escala en la GPU si hace falta: sin escalado, ``pygame.display``
+        # presenta únicamente las zonas que cambiaron
+        gpu = args.fullscreen or args.quality != 'alta'
+        viewport = make_viewport(init_display(vsync=args.vsync, fullscreen=args.fullscreen, gpu=gpu),
+                                 QUALITY_PRESETS.get(args.quality, 1.0), vsync=args.vsync)
+    with profiler.phase('fuentes'):
+        get_fonts()
+    classroom = None
+    if args.join:
+        from .classroom import ClassroomClient, parse_address
+        from .simulation import WallClock
+        host, port = parse_address(args.join)
+        classroom = ClassroomClient(host, port, name=args.player,
+                                    clock=engine.clock if engine is not None else WallClock())
+        classroom.start_thread()
+    with profiler.phase('Game()'):
+        game = Game(viewport=viewport, seed=args.seed, chart_path=chart_path,
+                    fps=0 if args.vsync else args.fps, dirty_rects=args.dirty_rects,
+                    replay_dir=args.replay_dir, record_replays=not args.no_replays,
+                    telemetry_dir=args.telemetry_dir, record_telemetry=not args.no_telemetry,
+                    player=args.player, trace_path=args.trace, autoplay=args.autoplay,
+                    classroom=classroom, power_report=args.power_report, auto_quality=args.quality == 'auto',
+                    clock=engine.clock if engine is not None else None, audio=engine)
+    if args.profile:
+        from .profiler import profiler as frame_profiler
+        frame_profiler.enable(overlay=True)
+    with profiler.phase('primer frame'):
+        game.draw()
+    
+    if args.profile_startup:
+        profiler.report()
+        game.shutdown()
+        pygame.quit()
+        return 0
+    
+    game.run()
+    return 0
@@ -0,0 +1,529 @@
+"""Audio: mezclador por software, banco de sonidos de nota y pista de fondo.
+
+``AudioEngine`` abre directamente un dispositivo de SDL y mezcla en bloques
+NumPy de ``AUDIO_BUFFER`` muestras dentro de su callback: voces de nota sin
+límite de canales, metrónomo y pista de fondo programados a la muestra, y un
+reloj (``AudioClock``) que sigue a lo que realmente está sonando. Si el
+dispositivo no se puede abrir se usa ``pygame.mixer`` como antes.
+"""
+import ctypes
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+from .analysis import open_wav
+from .config import AUDIO_BUFFER, BEAT_DURATION, BPM, FIGURES, NOTE_PITCHES, SAMPLE_RATE
+from .tempo import TempoMap
+
+
+# === MEZCLADOR ===
+def init_mixer():
+    """Abre el mezclador con la configuración del juego si aún no está abierto."""
+    if pygame.mixer.get_init() is None:
+        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=AUDIO_BUFFER)
+    return pygame.mixer.get_init()
+
+
+# === BANCO DE SONIDOS ===
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ritmo_runner', 'sounds')
+
+
+class SoundBank:
+    """Sonidos de nota sintetizados bajo demanda y guardados en disco.
+    
+    Cada nota se sintetiza en mono la primera vez que se pide (o antes, en un
+    hilo de ``prefetch``) y el PCM se guarda en un ``.npy`` cuyo nombre depende
+    del tono, la duración, el BPM y la envolvente; en los siguientes arranques
+    se abre con ``mmap`` y no se sintetiza nada. Sólo se duplica a estéreo al
+    crear el ``pygame.mixer.Sound`` si el mezclador lo necesita.
+    """
+    ENVELOPE = {'attack': 0.01, 'decay': 0.05, 'release': 0.1, 'sustain': 0.7}
+    VERSION = 1
+    
+    def __init__(self, cache_dir=None, workers=2, use_disk=True, engine=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.use_disk = use_disk
+        # Con ``engine`` el PCM cacheado se mezcla ahí en vez de en pygame.mixer
+        self.engine = engine
+        self.pcm = {}
+        self.sounds = {}
+        self.pending = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers) if workers else None
+    
+    @staticmethod
+    def key(fig_name, lane):
+        return f"{fig_name}_{lane}"
+    
+    def params(self, fig_name, lane):
+        return (NOTE_PITCHES[lane], FIGURES[fig_name]['duration'], BPM, SAMPLE_RATE,
+                tuple(sorted(self.ENVELOPE.items())), self.VERSION)
+    
+    def cache_path(self, fig_name, lane):
+        digest = hashlib.sha1(repr(self.params(fig_name, lane)).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{self.key(fig_name, lane)}_{digest}.npy")
+    
+    @classmethod
+    def synthesize(cls, pitch, duration_beats):
+        duration = duration_beats * BEAT_DURATION * 0.5  # Sonidos más cortos
+        sample_rate = SAMPLE_RATE
+        t = np.linspace(0, duration, int(sample_rate * duration), False)
+        freq = 440 * (2 ** ((pitch - 69) / 12))
+        
+        # Envolvente ADSR mejorada
+        attack = int(sample_rate * cls.ENVELOPE['attack'])
+        decay = int(sample_rate * cls.ENVELOPE['decay'])
+        release = int(sample_rate * cls.ENVELOPE['release'])
+        sustain_level = cls.ENVELOPE['sustain']
+        
+        envelope = np.ones_like(t)
+        if len(envelope) > attack:
+            envelope[:attack] = np.linspace(0, 1, attack)
+        if len(envelope) > attack + decay:
+            envelope[attack:attack+decay] = np.linspace(1, sustain_level, decay)
+        if len(envelope) > release:
+            envelope[-release:] = np.linspace(sustain_level, 0, release)
+        
+        # Onda con armónicos
+        wave = 0.4 * np.sin(2 * np.pi * freq * t)
+        wave += 0.2 * np.sin(4 * np.pi * freq * t)  # Octava
+        wave += 0.1 * np.sin(6 * np.pi * freq * t)  # Quinta
+        wave *= envelope
+        
+        return (wave * 32767).astype(np.int16)
+    
+    def load_pcm(self, fig_name, lane):
+        """PCM mono de una nota: desde el caché en disco o sintetizado."""
+        path = self.cache_path(fig_name, lane)
+        if self.use_disk:
+            try:
+                return np.load(path, mmap_mode='r')
+            except (OSError, ValueError):
+                pass
+        
+        pcm = self.synthesize(NOTE_PITCHES[lane], FIGURES[fig_name]['duration'])
+        if self.use_disk:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, pcm)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass
+        return pcm
+    
+    def prefetch(self, fig_names=None, lanes=None):
+        """Encola en el pool la preparación de los sonidos que aún no están listos."""
+        fig_names = FIGURES if fig_names is None else fig_names
+        lanes = range(len(NOTE_PITCHES)) if lanes is None else lanes
+        for fig_name in fig_names:
+            for lane in lanes:
+                key = self.key(fig_name, lane)
+                if key in self.pcm or key in self.pending:
+                    continue
+                if self.executor is None:
+                    self.pcm[key] = self.load_pcm(fig_name, lane)
+                else:
+                    self.pending[key] = self.executor.submit(self.load_pcm, fig_name, lane)
+    
+    def prepare(self, fig_names):
+        """Sonidos listos para reproducir de ``fig_names``, sin tocar el banco.
+        
+        Pensado para un hilo de precarga: devuelve ``{clave: (pcm, sonido)}``
+        (``Sound`` sólo sin motor de audio, que mezcla el PCM tal cual) para ``install``.
+        """
+        ready = {}
+        for fig_name in fig_names:
+            for lane in range(len(NOTE_PITCHES)):
+                key = self.key(fig_name, lane)
+                if key in self.sounds or (self.engine is not None and key in self.pcm):
+                    continue
+                pcm = self.pcm.get(key)
+                if pcm is None:
+                    future = self.pending.get(key)
+                    pcm = future.result() if future is not None else self.load_pcm(fig_name, lane)
+                ready[key] = (pcm, None if self.engine is not None else self.make_sound(pcm))
+        return ready
+    
+    def install(self, ready):
+        for key, (pcm, sound) in ready.items():
+            self.pcm.setdefault(key, pcm)
+            self.pending.pop(key, None)
+            if sound is not None:
+                self.sounds.setdefault(key, sound)
+    
+    def get_pcm(self, fig_name, lane):
+        key = self.key(fig_name, lane)
+        pcm = self.pcm.get(key)
+        if pcm is None:
+            future = self.pending.pop(key, None)
+            pcm = future.result() if future is not None else self.load_pcm(fig_name, lane)
+            self.pcm[key] = pcm
+        return pcm
+    
+    @staticmethod
+    def make_sound(pcm):
+        """``pygame.mixer.Sound`` a partir de PCM mono, o ``None`` sin mezclador."""
+        mixer = pygame.mixer.get_init()
+        if mixer is None:
+            return None
+        channels = mixer[2]
+        samples = np.repeat(pcm[:, None], channels, axis=1) if channels > 1 else np.asarray(pcm)
+        return pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+    
+    def get(self, fig_name, lane):
+        key = self.key(fig_name, lane)
+        sound = self.sounds.get(key)
+        if sound is None:
+            if pygame.mixer.get_init() is None:
+                return None
+            sound = self.make_sound(self.get_pcm(fig_name, lane))
+            self.sounds[key] = sound
+        return sound
+    
+    @staticmethod
+    def synthesize_click(freq=1500, duration=0.02):
+        t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
+        wave = 0.6 * np.sin(2 * np.pi * freq * t) * np.exp(-t * 250)
+        return (wave * 32767).astype(np.int16)
+    
+    def click_pcm(self):
+        pcm = self.pcm.get('click')
+        if pcm is None:
+            pcm = self.pcm['click'] = self.synthesize_click()
+        return pcm
+    
+    def play_click(self, at=None):
+        """Clic de metrónomo; con motor de audio puede programarse para el instante ``at``."""
+        if self.engine is not None:
+            self.engine.play(self.click_pcm(), at=at)
+            return
+        sound = self.click()
+        if sound is not None:
+            sound.play()
+    
+    def click(self):
+        """Clic corto de metrónomo (calibración)."""
+        sound = self.sounds.get('click')
+        if sound is None:
+            sound = self.make_sound(self.synthesize_click())
+            if sound is None:
+                return None
+            self.sounds['click'] = sound
+        return sound
+    
+    def play(self, fig_name, lane):
+        if self.engine is not None:
+            self.engine.play(self.get_pcm(fig_name, lane))
+            return
+        sound = self.get(fig_name, lane)
+        if sound is not None:
+            sound.play()
+    
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# === PISTA DE FONDO ===
+class SynthBacking:
+    """Acompañamiento procedural: bajo por pulso y charles a contratiempo.
+    
+    Sigue el mapa de tempo de la canción (``set_tempo``; por defecto ``BPM``
+    en 4/4). Cada muestra es función sólo de su índice, así que se genera
+    bloque a bloque sin estado y sin tener la canción entera en memoria.
+    """
+    PROGRESSION = (48, 45, 41, 43)  # Do, La, Fa, Sol (MIDI)
+    
+    def __init__(self, sample_rate=SAMPLE_RATE, gain=0.25):
+        self.sample_rate = sample_rate
+        self.gain = gain
+        self.noise = np.random.default_rng(0).uniform(-1, 1, 4096).astype(np.float32)
+        self.freqs = np.array([440 * 2 ** ((pitch - 69) / 12) for pitch in self.PROGRESSION])
+        self.set_tempo(TempoMap())
+    
+    def set_tempo(self, tempo):
+        # Tablas del mapa como arrays para convertir el bloque entero de una vez
+        self.seconds = np.array(tempo.seconds)
+        self.beats = np.array(tempo.beats)
+        self.spb = np.array(tempo.spb)
+        self.meter_beats = np.array(tempo.meter_beats)
+        self.bar_beats = np.array(tempo.bar_beats)
+        self.meter_bars = np.array(tempo.meter_bars)
+    
+    def render(self, start, frames):
+        index = np.arange(start, start + frames)
+        t = index / self.sample_rate
+        i = np.maximum(np.searchsorted(self.seconds, t, 'right') - 1, 0)
+        beat_pos = self.beats[i] + (t - self.seconds[i]) / self.spb[i]
+        beat = np.floor(beat_pos)
+        phase = beat_pos - beat
+        
+        # Un acorde por compás
+        m = np.maximum(np.searchsorted(self.meter_beats, beat_pos, 'right') - 1, 0)
+        bar = self.meter_bars[m] + (beat_pos - self.meter_beats[m]) // self.bar_beats[m]
+        freq = self.freqs[bar.astype(np.int64) % len(self.freqs)]
+        bass = np.sin(2 * np.pi * freq * t) * np.exp(-phase * 6)
+        half = (phase - 0.5) % 1.0
+        hat = self.noise[index % len(self.noise)] * np.exp(-half * 40) * 0.3
+        out = (bass + hat) * self.gain
+        out[index < 0] = 0
+        return out.astype(np.float32)
+
+
+class WavBacking:
+    """Pista de fondo desde un WAV PCM de 16 bits, leída por ``mmap``.
+    
+    Con ``loop`` se repite sin fin; sin él (una canción con su partitura)
+    termina en silencio.
+    """
+    def __init__(self, path, sample_rate=SAMPLE_RATE, gain=0.5, loop=True):
+        self.data, self.source_rate = open_wav(path)
+        self.sample_rate = sample_rate
+        self.gain = gain
+        self.loop = loop
+    
+    def set_tempo(self, tempo):
+        # La grabación ya trae su propio tempo
+        pass
+    
+    def render(self, start, frames):
+        # Remuestreo por vecino más cercano y mezcla a mono
+        index = (np.arange(start, start + frames) * self.source_rate) // self.sample_rate
+        valid = index >= 0
+        if not self.loop:
+            valid &= index < len(self.data)
+        block = self.data[index % len(self.data)].astype(np.float32).mean(axis=1) / 32767
+        block[~valid] = 0
+        return block * self.gain
+
+
+# === MOTOR DE AUDIO ===
+def sdl_library(sdl_audio):
+    """La copia de SDL que usa pygame, para llamarla con ``ctypes`` sin el GIL.
+    
+    En Linux y macOS los símbolos se buscan también en las dependencias del
+    módulo de pygame; en Windows, en la ``SDL2.dll`` que trae pygame.
+    """
+    candidates = [sdl_audio.__file__, os.path.join(os.path.dirname(pygame.__file__), 'SDL2.dll')]
+    for path in candidates:
+        try:
+            lib = ctypes.CDLL(path)
+            lib.SDL_PauseAudioDevice.argtypes = [ctypes.c_uint32, ctypes.c_int]
+            lib.SDL_CloseAudioDevice.argtypes = [ctypes.c_uint32]
+        except (OSError, AttributeError):
+            continue
+        lib.SDL_PauseAudioDevice.restype = lib.SDL_CloseAudioDevice.restype = None
+        return lib
+    raise RuntimeError("no se encuentra la biblioteca SDL de pygame")
+
+
+class Voice:
+    """Un sonido programado: PCM int16 mono (sin copiar) desde la muestra ``start``."""
+    __slots__ = ('samples', 'start', 'scale')
+    
+    def __init__(self, samples, start, gain):
+        self.samples = samples
+        self.start = start
+        # Ganancia y paso de int16 a [-1, 1] en un solo factor
+        self.scale = np.float32(gain / 32767)
+
+
+class AudioClock:
+    """Reloj del juego guiado por la posición de reproducción del motor.
+    
+    Entre dos callbacks se interpola con el reloj del sistema, sin pasar de lo
+    ya mezclado y sin retroceder nunca. Si el dispositivo deja de pedir
+    bloques sigue avanzando con el reloj del sistema.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.last = 0.0
+        self.last_wall = time.perf_counter()
+    
+    def now(self):
+        wall = time.perf_counter()
+        heard, stamp, limit = self.engine.timing
+        if wall - stamp > self.engine.STALL:
+            t = self.last + (wall - self.last_wall)
+        else:
+            t = min(heard + (wall - stamp), limit)
+        self.last = max(t, self.last)
+        self.last_wall = wall
+        return self.last
+
+
+class AudioEngine:
+    """Mezclador por software sobre un dispositivo de audio de SDL.
+    
+    Las voces (PCM int16 mono, como las guarda ``SoundBank``) se programan en
+    muestras absolutas del flujo de salida; el callback suma las que caen en
+    cada bloque leyendo sólo el trozo que le toca, añade el metrónomo (en los
+    pulsos de la canción) y la pista de fondo, y convierte a int16. La
+    latencia propia es un bloque de ``AUDIO_BUFFER`` muestras.
+    """
+    MAX_VOICES = 64
+    STALL = 0.25
+    
+    def __init__(self, sample_rate=SAMPLE_RATE, block=AUDIO_BUFFER, channels=2, backing=None):
+        self.sample_rate = sample_rate
+        self.block = block
+        self.channels = channels
+        self.lock = threading.Lock()
+        self.voices = []
+        self.position = 0
+        self.device = None
+        self.sdl = None
+        # Al cerrar, el callback deja de mezclar y sólo devuelve silencio
+        self.stopping = False
+        self.backing = backing
+        self.metronome = False
+        self.click = SoundBank.synthesize_click()
+        self.accent = SoundBank.synthesize_click(freq=2200)
+        # Canción en curso: muestra de su inicio y siguiente pulso del metrónomo
+        self.song_origin = None
+        self.next_beat = 0
+        self.tempo = TempoMap()
+        self.tempo_cursor = self.tempo.cursor()
+        # (tiempo sonando en el último callback, instante del callback, tope)
+        self.timing = (0.0, time.perf_counter(), 0.0)
+        self.clock = AudioClock(self)
+    
+    @property
+    def latency(self):
+        return self.block / self.sample_rate
+    
+    def open(self):
+        """Abre el dispositivo; lanza ``RuntimeError`` si SDL no lo permite."""
+        try:
+            from pygame._sdl2 import audio as sdl_audio, sdl2
+            self.sdl = sdl_library(sdl_audio)
+            sdl2.init_subsystem(sdl2.INIT_AUDIO)
+            names = sdl_audio.get_audio_device_names(False)
+            self.stopping = False
+            self.device = sdl_audio.AudioDevice(
+                devicename=names[0] if names else '', iscapture=False,
+                frequency=self.sample_rate, audioformat=sdl_audio.AUDIO_S16,
+                numchannels=self.channels, chunksize=self.block, allowed_changes=0,
+                callback=self._callback)
+        except Exception as exc:
+            raise RuntimeError(f"no se pudo abrir el audio: {exc}") from exc
+        self.device.pause(0)
+        return self
+    
+    def close(self):
+        """Para y cierra el dispositivo.
+        
+        Pausar o cerrar toma el lock del dispositivo, que el hilo de audio
+        tiene mientras espera el GIL para llamar a ``_callback``: por eso se
+        llama a SDL con ``ctypes``, que suelta el GIL durante la llamada.
+        """
+        if self.device is None:
+            return
+        self.stopping = True
+        device_id = ctypes.c_uint32(self.device.deviceid)
+        self.sdl.SDL_PauseAudioDevice(device_id, 1)
+        self.sdl.SDL_CloseAudioDevice(device_id)
+        # Ya está cerrado; así pygame olvida el id y no cierra otro dispositivo
+        # que lo reutilice al recolectar el objeto
+        self.device.close()
+        self.device = None
+    
+    # === PROGRAMACIÓN ===
+    def sample_at(self, t):
+        return int(round(t * self.sample_rate))
+    
+    def play(self, samples, at=None, gain=1.0):
+        """Programa ``samples`` en el instante ``at`` del reloj.
+        
+        Sin ``at`` suena ahora más la latencia del motor: lo que ya está mezclado
+        va dos bloques por delante de lo que se oye, así que el retraso es
+        siempre el mismo en vez de depender de cuándo llegue el próximo callback.
+        """
+        if at is None:
+            at = self.clock.now() + 2 * self.latency
+        start = self.sample_at(at)
+        with self.lock:
+            if len(self.voices) >= self.MAX_VOICES:
+                self.voices.pop(0)
+            self.voices.append(Voice(samples, start, gain))
+    
+    def start_song(self, start_time, audio_offset=0.0, tempo=None):
+        """Sincroniza metrónomo y pista de fondo con una canción que empieza en ``start_time``.
+        
+        ``audio_offset`` es el retraso de salida calibrado: se adelanta el sonido
+        para que se oiga justo en el pulso. ``tempo`` es el ``TempoMap`` de la
+        canción (por defecto, ``BPM`` fijo).
+        """
+        origin = self.sample_at(start_time - audio_offset)
+        tempo = tempo or TempoMap()
+        with self.lock:
+            self.song_origin = origin
+            self.tempo = tempo
+            self.tempo_cursor = tempo.cursor()
+            elapsed = (self.position - origin) / self.sample_rate
+            self.next_beat = max(0, int(np.ceil(tempo.beat(elapsed))))
+            if self.backing is not None:
+                self.backing.set_tempo(tempo)
+    
+    def stop_song(self):
+        with self.lock:
+            self.song_origin = None
+    
+    # === MEZCLA ===
+    def render(self, frames):
+        """Mezcla el siguiente bloque de ``frames`` muestras (mono, float32)."""
+        start = self.position
+        end = start + frames
+        out = np.zeros(frames, dtype=np.float32)
+        with self.lock:
+            origin = self.song_origin
+            if origin is not None:
+                # Metrónomo: los pulsos que caen en este bloque, a la muestra
+                # exacta; el primero de cada compás, acentuado
+                if self.metronome:
+                    cursor = self.tempo_cursor
+                    tick = origin + self.sample_at(cursor.time(self.next_beat))
+                    while tick < end:
+                        downbeat = self.tempo.bar(self.next_beat)[1] < 1e-9
+                        self.voices.append(Voice(self.accent if downbeat else self.click, tick, 0.8))
+                        self.next_beat += 1
+                        tick = origin + self.sample_at(cursor.time(self.next_beat))
+                if self.backing is not None:
+                    out += self.backing.render(start - origin, frames)
+            
+            alive = []
+            for voice in self.voices:
+                if voice.start >= end:
+                    alive.append(voice)
+                    continue
+                src = max(0, start - voice.start)
+                dst = max(0, voice.start - start)
+                n = min(frames - dst, len(voice.samples) - src)
+                if n > 0:
+                    out[dst:dst + n] += voice.samples[src:src + n] * voice.scale
+                if src + n < len(voice.samples):
+                    alive.append(voice)
+            self.voices = alive
+            self.position = end
+        return out
+    
+    def _callback(self, device, stream):
+        if self.stopping:
+            stream[:] = bytes(len(stream))
+            return
+        frames = len(stream) // (2 * self.channels)
+        mono = self.render(frames)
+        pcm = (np.clip(mono, -1, 1) * 32767).astype(np.int16)
+        stream[:] = np.repeat(pcm, self.channels).tobytes()
+        # Lo que empieza a sonar ahora es el bloque anterior
+        now = time.perf_counter()
+        heard = (self.position - 2 * frames) / self.sample_rate
+        self.timing = (heard, now, (self.position - frames) / self.sample_rate)
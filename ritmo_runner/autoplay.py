@@ -0,0 +1,107 @@
+"""Jugador automático con errores de tiempo parecidos a los de una persona.
+
+``Bot`` mira las notas que van entrando en pantalla y decide en ese momento
+cuándo pulsarlas: en su tiempo más un sesgo y un error aleatorio (normal, de
+Laplace o uniforme), nunca con probabilidad ``miss_rate``, y no antes de
+``reaction`` segundos desde que la nota se ve (así la velocidad del nivel
+importa). Además puede pulsar al aire. Sirve para ver el juego solo (``--autoplay``) y
+para las simulaciones por lotes de ``ritmo_runner.tuning``.
+"""
+import heapq
+import random
+
+from .config import KEYS, WIDTH
+
+# Perfiles de jugador: sesgo, dispersión y reacción en segundos, probabilidad de
+# dejar pasar una nota y golpes al aire por segundo
+PROFILES = {
+    'perfecto': {'bias': 0.0, 'spread': 0.0, 'distribution': 'normal', 'reaction': 0.0,
+                 'miss_rate': 0.0, 'stray_rate': 0.0},
+    'experto': {'bias': 0.005, 'spread': 0.03, 'distribution': 'normal', 'reaction': 0.35,
+                'miss_rate': 0.01, 'stray_rate': 0.02},
+    'intermedio': {'bias': 0.02, 'spread': 0.06, 'distribution': 'laplace', 'reaction': 0.6,
+                   'miss_rate': 0.05, 'stray_rate': 0.05},
+    'principiante': {'bias': 0.04, 'spread': 0.1, 'distribution': 'laplace', 'reaction': 0.9,
+                     'miss_rate': 0.15, 'stray_rate': 0.1},
+}
+DISTRIBUTIONS = ('normal', 'laplace', 'uniform')
+
+
+class Bot:
+    """Genera las pulsaciones de cada paso para una ``Simulation``.
+    
+    ``presses(sim)`` se llama antes de ``sim.step`` y devuelve
+    ``(carril, tiempo)`` para las pulsaciones que caen dentro de ese paso.
+    """
+    def __init__(self, seed=None, bias=0.0, spread=0.0, distribution='normal', reaction=0.0,
+                 miss_rate=0.0, stray_rate=0.0):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribución desconocida: {distribution}")
+        self.rng = random.Random(seed)
+        self.bias = bias
+        self.spread = spread
+        self.distribution = distribution
+        self.reaction = reaction
+        self.miss_rate = miss_rate
+        self.stray_rate = stray_rate
+        self.pending = []
+        self.watching = []
+        self.last_note = None
+        self.notes_seen = 0
+        self.scheduled = 0
+    
+    @classmethod
+    def from_profile(cls, name, seed=None, **overrides):
+        return cls(seed, **{**PROFILES[name], **overrides})
+    
+    def timing_error(self):
+        if self.spread <= 0:
+            return 0.0
+        if self.distribution == 'normal':
+            return self.rng.gauss(0.0, self.spread)
+        if self.distribution == 'laplace':
+            # Misma desviación típica que la normal: escala spread / sqrt(2)
+            return self.rng.choice((-1, 1)) * self.rng.expovariate(2 ** 0.5 / self.spread)
+        return self.rng.uniform(-self.spread * 3 ** 0.5, self.spread * 3 ** 0.5)
+    
+    def new_notes(self, sim):
+        # Las notas se añaden siempre al final de ``active`` y salen por el
+        # principio: las nuevas son las que quedan a la derecha de la última vista
+        notes = []
+        for note in reversed(sim.notes.active):
+            if note is self.last_note:
+                break
+            notes.append(note)
+        if notes:
+            self.last_note = notes[0]
+        return reversed(notes)
+    
+    def observe(self, sim):
+        """Decide cuándo pulsar las notas que entran en pantalla; devuelve las recién aparecidas."""
+        notes = list(self.new_notes(sim))
+        self.notes_seen += len(notes)
+        self.watching.extend(notes)
+        still_hidden = []
+        for note in self.watching:
+            if sim.note_x(note) > WIDTH:
+                still_hidden.append(note)
+            elif self.rng.random() >= self.miss_rate:
+                t = note.time + self.bias + self.timing_error()
+                t = max(t, sim.time + self.reaction)
+                self.scheduled += 1
+                heapq.heappush(self.pending, (t, self.scheduled, note.lane))
+        self.watching = still_hidden
+        return notes
+    
+    def presses(self, sim):
+        self.observe(sim)
+        end = sim.time + sim.dt
+        presses = []
+        pending = self.pending
+        while pending and pending[0][0] <= end:
+            t, _order, lane = heapq.heappop(pending)
+            presses.append((lane, max(t, sim.time)))
+        if self.stray_rate and self.rng.random() < self.stray_rate * sim.dt:
+            presses.append((self.rng.randrange(len(KEYS)), sim.time + self.rng.random() * sim.dt))
+            presses.sort(key=lambda press: press[1])
+        return presses
@@ -0,0 +1,97 @@
+"""Calibración de latencia de entrada y de salida de audio.
+
+La rutina tiene dos fases de golpes al ritmo de ``BEAT_DURATION``: primero
+siguiendo un círculo que late en pantalla (mide el retraso de entrada y de
+imagen) y luego siguiendo un clic sonoro (suma además el retraso del audio).
+La diferencia entre ambas medianas es el retraso de salida de audio. Los
+valores se guardan en ``$XDG_CONFIG_HOME/ritmo_runner/calibration.json``.
+"""
+import json
+import os
+import statistics
+
+from .config import BEAT_DURATION
+
+
+def default_config_path():
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'ritmo_runner', 'calibration.json')
+
+
+class Calibration:
+    """Retrasos medidos, en segundos; positivos si el jugador llega tarde."""
+    def __init__(self, input_offset=0.0, audio_offset=0.0):
+        self.input_offset = input_offset
+        self.audio_offset = audio_offset
+    
+    @classmethod
+    def load(cls, path=None):
+        path = path or default_config_path()
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(float(data.get('input_offset', 0.0)), float(data.get('audio_offset', 0.0)))
+        except (OSError, ValueError, TypeError, AttributeError):
+            return cls()
+    
+    def save(self, path=None):
+        path = path or default_config_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'input_offset': self.input_offset, 'audio_offset': self.audio_offset}, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+class CalibrationSession:
+    """Una pasada de calibración; los tiempos son los del reloj del juego."""
+    PHASES = ('visual', 'audio')
+    LEAD_IN = 4
+    TAPS = 8
+    
+    def __init__(self, start_time):
+        self.phase_index = 0
+        self.phase_start = start_time
+        self.offsets = {phase: [] for phase in self.PHASES}
+    
+    @property
+    def phase(self):
+        if self.phase_index >= len(self.PHASES):
+            return None
+        return self.PHASES[self.phase_index]
+    
+    @property
+    def done(self):
+        return self.phase is None
+    
+    def beat_position(self, now):
+        """Pulso (fraccionario) dentro de la fase actual."""
+        return (now - self.phase_start) / BEAT_DURATION
+    
+    def update(self, now):
+        # Se pasa de fase un pulso después del último golpe esperado
+        if not self.done and self.beat_position(now) >= self.LEAD_IN + self.TAPS + 1:
+            self.phase_index += 1
+            self.phase_start = now
+    
+    def record_tap(self, timestamp):
+        if self.done:
+            return None
+        position = self.beat_position(timestamp)
+        beat = round(position)
+        if not self.LEAD_IN <= beat < self.LEAD_IN + self.TAPS:
+            return None
+        offset = (position - beat) * BEAT_DURATION
+        self.offsets[self.phase].append(offset)
+        return offset
+    
+    def taps(self):
+        return len(self.offsets[self.phase]) if not self.done else self.TAPS
+    
+    def result(self):
+        """``Calibration`` con las medianas, o ``None`` si faltan golpes."""
+        visual, audio = self.offsets['visual'], self.offsets['audio']
+        if len(visual) < self.TAPS // 2 or len(audio) < self.TAPS // 2:
+            return None
+        input_offset = statistics.median(visual)
+        return Calibration(input_offset, statistics.median(audio) - input_offset)
@@ -0,0 +1,351 @@
+"""Partituras: formato de texto editable, compilador binario y lector en streaming.
+
+Formato fuente (``.chart``)::
+
+    # Comentarios con almohadilla
+    title = Escala de Do
+    bpm = 120
+
+    # pulso  carril  figura
+    0        A       negra
+    1        S       negra
+    2.5      2       corchea
+
+    # Cambios de tempo y de compás desde un pulso
+    8        tempo   90
+    8        compas  3/4
+
+El carril puede ser la tecla (A, S, D, F) o su índice (0-3) y la figura una
+clave de ``FIGURES``. Los pulsos son negras; ``bpm`` es el tempo inicial y el
+compás inicial es 4/4. El compilado (``.rrc``) es una cabecera fija seguida de
+registros de ancho fijo ordenados por pulso y, detrás, la tabla de cambios de
+tempo y compás; ``ChartStream`` lo abre con ``mmap`` y entrega a la simulación
+sólo las notas que están por entrar en pantalla, así que la memoria no depende
+del largo de la canción.
+
+Uso::
+
+    python -m ritmo_runner.chart cancion.chart -o cancion.rrc
+    python -m ritmo_runner.chart cancion.rrc --info
+"""
+import argparse
+import os
+import struct
+import sys
+
+import numpy as np
+
+from .config import BPM, FIGURES, KEY_NAMES
+from .simulation import Note
+from .tempo import TempoMap
+
+MAGIC = b'RRCH'
+# La versión 1 no tiene tabla de tempo (su cabecera termina en ceros: 0 cambios)
+VERSION = 2
+VERSIONS = (1, 2)
+HEADER = struct.Struct('<4sHHIId64sI4x')
+RECORD = np.dtype([('beat', '<f8'), ('lane', 'u1'), ('figure', 'u1'), ('reserved', 'V6')])
+# Un registro por pulso con cambios; bpm 0 o numerador 0 significan "sin cambio"
+TEMPO_RECORD = np.dtype([('beat', '<f8'), ('bpm', '<f8'), ('numerator', 'u1'), ('denominator', 'u1'),
+                         ('reserved', 'V6')])
+FIGURE_CODES = list(FIGURES)
+SOURCE_SUFFIX = '.chart'
+COMPILED_SUFFIX = '.rrc'
+
+
+class ChartError(ValueError):
+    pass
+
+
+# === FUENTE ===
+def parse_lane(token):
+    upper = token.upper()
+    if upper in KEY_NAMES:
+        return KEY_NAMES.index(upper)
+    lane = int(token)
+    if not 0 <= lane < len(KEY_NAMES):
+        raise ValueError(token)
+    return lane
+
+
+def parse_figure(token):
+    name = token.lower()
+    if name in FIGURES:
+        return name
+    for key, data in FIGURES.items():
+        if data['name'].lower() == name:
+            return key
+    raise ValueError(token)
+
+
+def parse_meter(token):
+    numerator, denominator = (int(part) for part in token.split('/'))
+    if numerator <= 0 or numerator > 255 or denominator not in (1, 2, 4, 8, 16, 32):
+        raise ValueError(token)
+    return numerator, denominator
+
+
+def parse_chart(text):
+    """Devuelve ``(meta, notas)`` con notas ``(pulso, carril, figura)`` ordenadas por pulso.
+    
+    Los cambios quedan en ``meta['tempo']`` como ``(pulso, bpm)`` y en
+    ``meta['meter']`` como ``(pulso, numerador, denominador)``.
+    """
+    meta = {'title': '', 'bpm': float(BPM), 'tempo': [], 'meter': []}
+    notes = []
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        line = raw.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if '=' in line:
+            key, value = (part.strip() for part in line.split('=', 1))
+            if key == 'bpm':
+                try:
+                    meta['bpm'] = float(value)
+                except ValueError:
+                    raise ChartError(f"línea {lineno}: bpm inválido {value!r}") from None
+                if meta['bpm'] <= 0:
+                    raise ChartError(f"línea {lineno}: bpm debe ser positivo")
+            else:
+                meta[key] = value
+            continue
+
+        fields = line.split()
+        if len(fields) != 3:
+            raise ChartError(f"línea {lineno}: se esperaba 'pulso carril figura', hay {raw!r}")
+        try:
+            beat = float(fields[0])
+        except ValueError:
+            raise ChartError(f"línea {lineno}: pulso inválido {fields[0]!r}") from None
+        if beat < 0:
+            raise ChartError(f"línea {lineno}: el pulso no puede ser negativo")
+        kind = fields[1].lower()
+        if kind == 'tempo':
+            try:
+                bpm = float(fields[2])
+            except ValueError:
+                raise ChartError(f"línea {lineno}: tempo inválido {fields[2]!r}") from None
+            if bpm <= 0:
+                raise ChartError(f"línea {lineno}: el tempo debe ser positivo")
+            meta['tempo'].append((beat, bpm))
+            continue
+        if kind in ('compas', 'compás'):
+            try:
+                meta['meter'].append((beat, *parse_meter(fields[2])))
+            except ValueError:
+                raise ChartError(f"línea {lineno}: compás inválido {fields[2]!r}") from None
+            continue
+        try:
+            lane = parse_lane(fields[1])
+        except ValueError:
+            raise ChartError(f"línea {lineno}: carril inválido {fields[1]!r}") from None
+        try:
+            figure = parse_figure(fields[2])
+        except ValueError:
+            raise ChartError(f"línea {lineno}: figura desconocida {fields[2]!r}") from None
+        notes.append((beat, lane, figure))
+
+    notes.sort(key=lambda note: note[0])
+    return meta, notes
+
+
+# === COMPILADOR ===
+def tempo_records(meta):
+    """Tabla de cambios de tempo y compás, un registro por pulso."""
+    events = {}
+    for beat, bpm in meta.get('tempo', ()):
+        events.setdefault(beat, [0.0, 0, 0])[0] = bpm
+    for beat, numerator, denominator in meta.get('meter', ()):
+        events.setdefault(beat, [0.0, 0, 0])[1:] = numerator, denominator
+    table = np.zeros(len(events), dtype=TEMPO_RECORD)
+    for i, beat in enumerate(sorted(events)):
+        table[i]['beat'] = beat
+        table[i]['bpm'], table[i]['numerator'], table[i]['denominator'] = events[beat]
+    return table
+
+
+def write_compiled(path, meta, notes):
+    records = np.zeros(len(notes), dtype=RECORD)
+    if notes:
+        beats, lanes, figures = zip(*notes)
+        records['beat'] = beats
+        records['lane'] = lanes
+        records['figure'] = [FIGURE_CODES.index(figure) for figure in figures]
+        records.sort(order='beat', kind='stable')
+
+    table = tempo_records(meta)
+    title = meta.get('title', '').encode('utf-8')[:64]
+    header = HEADER.pack(MAGIC, VERSION, RECORD.itemsize, len(records), 0, meta['bpm'], title, len(table))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        records.tofile(f)
+        table.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def compile_chart(source_path, output_path=None):
+    if output_path is None:
+        output_path = os.path.splitext(source_path)[0] + COMPILED_SUFFIX
+    with open(source_path, encoding='utf-8') as f:
+        meta, notes = parse_chart(f.read())
+    write_compiled(output_path, meta, notes)
+    return output_path
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ChartError(f"{path}: archivo demasiado corto")
+    magic, version, record_size, count, _flags, bpm, title, tempo_count = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ChartError(f"{path}: no es una partida compilada")
+    if version not in VERSIONS or record_size != RECORD.itemsize:
+        raise ChartError(f"{path}: versión {version} no soportada")
+    return {
+        'count': count,
+        'bpm': bpm,
+        'title': title.rstrip(b'\0').decode('utf-8', 'replace'),
+        'tempo_count': tempo_count,
+    }
+
+
+def check_compiled(path):
+    """Cabecera de una partitura compilada, comprobando que el tamaño le cuadra."""
+    header = read_header(path)
+    expected = HEADER.size + header['count'] * RECORD.itemsize + header['tempo_count'] * TEMPO_RECORD.itemsize
+    size = os.path.getsize(path)
+    if size != expected:
+        raise ChartError(f"{path}: tamaño {size} bytes, la cabecera indica {expected} (¿archivo truncado?)")
+    return header
+
+
+def read_tempo(path, header):
+    """``TempoMap`` de una partitura compilada (la tabla es pequeña: se lee entera)."""
+    table = np.fromfile(path, dtype=TEMPO_RECORD, count=header['tempo_count'],
+                        offset=HEADER.size + header['count'] * RECORD.itemsize)
+    if len(table) < header['tempo_count']:
+        raise ChartError(f"{path}: tabla de tempo incompleta")
+    try:
+        return TempoMap(header['bpm'],
+                        [(row['beat'], row['bpm']) for row in table if row['bpm']],
+                        [(row['beat'], row['numerator'], row['denominator']) for row in table if row['numerator']])
+    except ValueError as exc:
+        raise ChartError(f"{path}: {exc}") from None
+
+
+# === LECTOR ===
+class ChartStream:
+    """Notas de una partitura compilada, leídas por ``mmap`` según avanza la canción.
+
+    ``feed`` añade a la simulación las notas que entran en pantalla en este paso:
+    las que llegarán a la zona de golpe antes de que una nota recién aparecida
+    por la derecha pudiera alcanzarla. Los pulsos son los de la partitura y
+    ``tempo`` los pasa a segundos.
+    """
+    BLOCK = 256
+    
+    def __init__(self, path):
+        self.path = path
+        self.header = check_compiled(path)
+        self.title = self.header['title']
+        self.bpm = self.header['bpm']
+        self.tempo = read_tempo(path, self.header)
+        count = self.header['count']
+        if count:
+            self.records = np.memmap(path, dtype=RECORD, mode='r', offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD)
+        self.cursor = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def done(self):
+        return self.cursor >= len(self.records)
+
+    def seek(self, beat):
+        """Coloca el cursor en la primera nota con pulso >= ``beat``."""
+        # Búsqueda binaria registro a registro: no copia la columna entera
+        lo, hi = 0, len(self.records)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.records[mid]['beat'] < beat:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.cursor = lo
+    
+    def take_until(self, beat):
+        """Devuelve ``(pulso, carril, figura)`` de las notas con pulso <= ``beat`` aún no entregadas."""
+        records = self.records
+        start = end = self.cursor
+        # Se avanza por bloques pequeños para no tocar más páginas de las necesarias
+        while end < len(records) and records[end]['beat'] <= beat:
+            block = np.array(records[end:end + self.BLOCK]['beat'])
+            end += int(np.searchsorted(block, beat, 'right'))
+        if end == start:
+            return []
+        chunk = np.array(records[start:end])
+        self.cursor = end
+        return [(b, lane, FIGURE_CODES[fig])
+                for b, lane, fig in zip(chunk['beat'].tolist(), chunk['lane'].tolist(),
+                                        chunk['figure'].tolist())]
+    
+    def feed(self, sim):
+        cursor = sim.tempo_cursor
+        for beat, lane, figure in self.take_until(cursor.beat(sim.time + sim.lookahead())):
+            sim.notes.add(Note(figure, lane, beat, sim.current_level, cursor.time(beat)))
+
+
+def load_chart(path):
+    """Abre una partitura; si es fuente la compila antes (sólo si cambió).
+    
+    Un compilado truncado o de otra versión se vuelve a compilar desde su
+    ``.chart`` si lo hay; si no, ``ChartError``.
+    """
+    if path.endswith(COMPILED_SUFFIX):
+        compiled = path
+        source = os.path.splitext(path)[0] + SOURCE_SUFFIX
+        if not os.path.exists(source):
+            source = None
+    else:
+        source, compiled = path, os.path.splitext(path)[0] + COMPILED_SUFFIX
+        if not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(source):
+            compile_chart(source, compiled)
+    try:
+        return ChartStream(compiled)
+    except ChartError as exc:
+        if source is None:
+            raise ChartError(f"{exc}; no hay {SOURCE_SUFFIX} del que volver a compilarla") from None
+    compile_chart(source, compiled)
+    return ChartStream(compiled)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ritmo_runner.chart',
+                                     description="Compila partituras de Ritmo Runner")
+    parser.add_argument('path', help="partitura fuente (.chart) o compilada (.rrc)")
+    parser.add_argument('-o', '--output', help="archivo compilado de salida")
+    parser.add_argument('--info', action='store_true', help="mostrar la cabecera de una partitura compilada")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.info:
+            header = read_header(args.path)
+            tempo = read_tempo(args.path, header)
+            print(f"título: {header['title']}\nbpm: {header['bpm']}\nnotas: {header['count']}\n"
+                  f"cambios de tempo: {len(tempo.changes())}\ncambios de compás: {len(tempo.meter_changes())}")
+            return 0
+        output = compile_chart(args.path, args.output)
+    except (OSError, ChartError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(f"{args.path} -> {output} ({read_header(output)['count']} notas)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
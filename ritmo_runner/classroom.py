@@ -0,0 +1,539 @@
+"""Modo clase: servidor en la red local con simulación autoritativa y clasificación.
+
+El servidor (asyncio, un solo hilo) recibe a los jugadores, les manda la
+semilla y la partitura, y cuando llegan todos (o pasa ``--wait``) anuncia la
+hora de inicio en su reloj. Cada cliente sincroniza su reloj con pings, juega
+en local sólo para dibujar y envía cada pulsación con su tiempo de canción.
+El servidor lleva una ``Simulation`` por jugador, retrasada ``INPUT_DELAY``
+segundos para que las pulsaciones lleguen antes de juzgarse, y difunde a
+``BOARD_RATE`` Hz sólo los campos de la clasificación que cambiaron.
+
+Protocolo: un objeto JSON por línea sobre TCP.
+
+Uso::
+
+    python -m ritmo_runner.classroom serve --chart charts/escala.chart --players 30
+    ritmo-runner --join 192.168.1.10 --player ana
+    python -m ritmo_runner.classroom bots 40 --profile intermedio
+"""
+import argparse
+import asyncio
+import base64
+import bisect
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from .simulation import SIM_STEP, Simulation, WallClock
+
+DEFAULT_PORT = 5050
+BOARD_RATE = 10
+INPUT_DELAY = 0.15
+MAX_FUTURE = 0.05
+MAX_LINE = 1 << 20
+WRITE_LIMIT = 256 * 1024
+DEFAULT_DURATION = 180.0
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def default_chart_cache():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ritmo_runner', 'charts')
+
+
+# === SERVIDOR ===
+class PlayerState:
+    """Un jugador conectado: su simulación, pulsaciones pendientes y lo último difundido."""
+    def __init__(self, player_id, name, writer):
+        self.id = player_id
+        self.name = name
+        self.writer = writer
+        self.sim = None
+        self.pending = []
+        self.sent = {}
+        self.rejected = 0
+    
+    def fields(self):
+        # Claves cortas: es lo que viaja en cada actualización
+        sim = self.sim
+        if sim is None:
+            return {'n': self.name}
+        stats = sim.stats
+        return {'n': self.name, 's': sim.score, 'c': sim.combo, 'm': sim.max_combo,
+                'l': sim.current_level, 'h': stats['perfect'] + stats['good'] + stats['ok'],
+                'x': stats['miss']}
+    
+    def delta(self):
+        """Campos que cambiaron desde la última difusión."""
+        fields = self.fields()
+        changed = {key: value for key, value in fields.items() if self.sent.get(key) != value}
+        self.sent = fields
+        return changed
+
+
+class ClassroomServer:
+    """Partida compartida: todos tocan la misma semilla o partitura a la vez."""
+    def __init__(self, seed=None, chart_path=None, duration=None, players=None, wait=30.0,
+                 countdown=5.0, rate=BOARD_RATE, input_delay=INPUT_DELAY, clock=None):
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(7), 'little')
+        self.chart_path = None
+        self.chart_data = None
+        if chart_path:
+            from .chart import load_chart
+            self.chart_path = load_chart(chart_path).path
+            with open(self.chart_path, 'rb') as f:
+                self.chart_data = base64.b64encode(f.read()).decode('ascii')
+        self.duration = duration if duration is not None or chart_path else DEFAULT_DURATION
+        self.expected = players
+        self.wait = wait
+        self.countdown = countdown
+        self.rate = rate
+        self.input_delay = input_delay
+        self.clock = clock if clock is not None else WallClock()
+        self.players = {}
+        # Quien llega con la partida empezada sólo mira: recibe la
+        # clasificación pero no está en ella
+        self.spectators = {}
+        self.connections = set()
+        self.results = []
+        self.left = []
+        self.next_id = 1
+        self.first_join = None
+        self.start_at = None
+        self.ended = False
+        self.done = asyncio.Event()
+        self.seq = 0
+        self.steps = 0
+        self.step_time = 0.0
+        self.server = None
+        self.tasks = []
+    
+    async def start(self, host='0.0.0.0', port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.tasks = [asyncio.create_task(self.simulate_loop()), asyncio.create_task(self.broadcast_loop())]
+        return self
+    
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for player in self.audience():
+            player.writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+    
+    def song_time(self):
+        return self.clock.now() - self.start_at
+    
+    def audience(self):
+        """Todas las conexiones con ``hello``: jugadores y espectadores."""
+        return [*self.players.values(), *self.spectators.values()]
+    
+    # === CONEXIONES ===
+    def send(self, player, data):
+        # Sin esperar a drain: un cliente que no lee no frena a los demás;
+        # si acumula demasiado se le desconecta
+        writer = player.writer
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > WRITE_LIMIT:
+            writer.close()
+            return
+        writer.write(data)
+    
+    async def handle_client(self, reader, writer):
+        player = None
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = json.loads(line)
+                kind = msg.get('type')
+                if kind == 'ping':
+                    writer.write(encode({'type': 'pong', 'c': msg.get('c'), 's': self.clock.now()}))
+                elif kind == 'in' and player is not None:
+                    self.receive_input(player, msg)
+                elif kind == 'hello' and player is None:
+                    player = self.join(str(msg.get('name', ''))[:24], writer)
+        except (ConnectionError, ValueError, AttributeError):
+            pass
+        finally:
+            if player is not None:
+                self.leave(player)
+            writer.close()
+            self.connections.discard(task)
+    
+    def join(self, name, writer):
+        player = PlayerState(self.next_id, name or f"jugador {self.next_id}", writer)
+        self.next_id += 1
+        if self.start_at is None:
+            self.players[player.id] = player
+        else:
+            self.spectators[player.id] = player
+        if self.first_join is None:
+            self.first_join = self.clock.now()
+        # Instantánea con lo ya difundido; desde aquí le llegan los mismos deltas que a todos
+        board = {str(p.id): p.sent for p in self.players.values() if p.sent}
+        self.send(player, encode({
+            'type': 'welcome', 'id': player.id, 'seed': self.seed, 'dt': SIM_STEP,
+            'chart': self.chart_data, 'duration': self.duration, 'at': self.start_at, 'seq': self.seq, 'board': board,
+        }))
+        self.maybe_start()
+        return player
+    
+    def leave(self, player):
+        self.spectators.pop(player.id, None)
+        if self.players.pop(player.id, None) is not None and player.sent:
+            self.left.append(player.id)
+    
+    def receive_input(self, player, msg):
+        sim = player.sim
+        lane, t = msg.get('l'), msg.get('t')
+        if sim is None or not isinstance(lane, int) or not 0 <= lane < 4:
+            return
+        if not isinstance(t, (int, float)) or not math.isfinite(t):
+            return
+        # Autoritativo: nada del futuro; lo que llega tarde se juzga ya
+        if t > self.song_time() + MAX_FUTURE:
+            player.rejected += 1
+            return
+        bisect.insort(player.pending, (max(t, sim.time), lane))
+    
+    # === PARTIDA ===
+    def maybe_start(self):
+        if self.start_at is not None or not self.players:
+            return
+        waited = self.clock.now() - self.first_join
+        if (self.expected and len(self.players) >= self.expected) or waited >= self.wait:
+            self.start_at = self.clock.now() + self.countdown
+            chart = None
+            for player in self.players.values():
+                if self.chart_path:
+                    from .chart import load_chart
+                    chart = load_chart(self.chart_path)
+                player.sim = Simulation(self.seed, chart=chart)
+            data = encode({'type': 'start', 'at': self.start_at})
+            for player in self.players.values():
+                self.send(player, data)
+    
+    def advance(self, player, target):
+        sim = player.sim
+        pending = player.pending
+        while sim.time + sim.dt <= target:
+            step_end = sim.time + sim.dt
+            ready = 0
+            while ready < len(pending) and pending[ready][0] <= step_end:
+                ready += 1
+            inputs = [(lane, t) for t, lane in pending[:ready]]
+            del pending[:ready]
+            sim.step(inputs)
+            sim.events.clear()
+            self.steps += 1
+    
+    def finished(self):
+        if self.duration is not None:
+            return self.song_time() - self.input_delay >= self.duration
+        sims = [player.sim for player in self.players.values() if player.sim is not None]
+        return not sims or all(sim.finished for sim in sims)
+    
+    async def simulate_loop(self):
+        while not self.ended:
+            await asyncio.sleep(SIM_STEP)
+            if self.start_at is None:
+                if self.first_join is not None:
+                    self.maybe_start()
+                continue
+            start = time.perf_counter()
+            target = self.song_time() - self.input_delay
+            if self.duration is not None:
+                target = min(target, self.duration)
+            for player in list(self.players.values()):
+                if player.sim is not None:
+                    self.advance(player, target)
+            self.step_time += time.perf_counter() - start
+            if self.finished():
+                self.ended = True
+    
+    def broadcast_board(self):
+        changes = {str(player.id): delta for player in self.players.values() if (delta := player.delta())}
+        for player_id in self.left:
+            changes[str(player_id)] = None
+        self.left = []
+        if not changes:
+            return
+        self.seq += 1
+        data = encode({'type': 'board', 'seq': self.seq, 'p': changes})
+        for player in self.audience():
+            self.send(player, data)
+    
+    async def broadcast_loop(self):
+        interval = 1 / self.rate
+        while True:
+            await asyncio.sleep(interval)
+            self.broadcast_board()
+            if self.ended:
+                self.results = self.leaderboard()
+                data = encode({'type': 'end'})
+                for player in self.audience():
+                    self.send(player, data)
+                self.done.set()
+                return
+    
+    def leaderboard(self):
+        rows = [(p.sent.get('s', 0), p.name, p.sent.get('m', 0), p.rejected) for p in self.players.values()]
+        return sorted(rows, reverse=True)
+
+
+# === CLIENTE ===
+class ClassroomClient:
+    """Conexión de un jugador: reloj sincronizado, envío de pulsaciones y clasificación.
+    
+    Puede correr en el bucle asyncio de quien lo use (``main``) o en un hilo
+    propio (``start_thread``), que es lo que hace el juego.
+    """
+    PINGS = 8
+    
+    def __init__(self, host, port=DEFAULT_PORT, name='', clock=None, chart_dir=None):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.clock = clock if clock is not None else WallClock()
+        self.chart_dir = chart_dir or default_chart_cache()
+        self.loop = None
+        self.thread = None
+        self.writer = None
+        # Reloj del servidor menos reloj local, del ping con menor ida y vuelta
+        self.offset = 0.0
+        self.rtt = None
+        self.id = None
+        self.seed = None
+        self.chart_path = None
+        self.duration = None
+        self.start_at = None
+        self.board = {}
+        self.seq = 0
+        self.connected = False
+        self.spectator = False
+        self.ended = False
+        self.error = None
+    
+    def local_time(self, server_time):
+        return server_time - self.offset
+    
+    def song_start(self):
+        """Inicio de la canción en el reloj local, o None si aún no se anunció (o no se juega)."""
+        if self.start_at is None or self.spectator:
+            return None
+        return self.local_time(self.start_at)
+    
+    def ranking(self):
+        return sorted(((fields.get('s', 0), fields.get('n', ''), int(player_id))
+                       for player_id, fields in self.board.items()), reverse=True)
+    
+    # === MENSAJES ===
+    def handle(self, msg):
+        kind = msg.get('type')
+        if kind == 'pong':
+            now = self.clock.now()
+            rtt = now - msg['c']
+            if self.rtt is None or rtt < self.rtt:
+                self.rtt = rtt
+                self.offset = msg['s'] - (msg['c'] + now) / 2
+        elif kind == 'board':
+            for player_id, fields in msg['p'].items():
+                if fields is None:
+                    self.board.pop(player_id, None)
+                else:
+                    self.board.setdefault(player_id, {}).update(fields)
+            self.seq = msg['seq']
+        elif kind == 'start':
+            self.start_at = msg['at']
+        elif kind == 'welcome':
+            self.id = msg['id']
+            self.seed = msg['seed']
+            self.duration = msg['duration']
+            self.start_at = msg['at']
+            self.board = msg['board']
+            self.seq = msg['seq']
+            # Quien llega con la partida empezada sólo mira
+            self.spectator = msg['at'] is not None
+            if msg['chart']:
+                self.chart_path = self.save_chart(base64.b64decode(msg['chart']))
+            self.connected = True
+        elif kind == 'end':
+            self.ended = True
+    
+    def save_chart(self, data):
+        # La partitura compilada del servidor, guardada por su hash
+        path = os.path.join(self.chart_dir, hashlib.sha1(data).hexdigest()[:16] + '.rrc')
+        if not os.path.exists(path):
+            os.makedirs(self.chart_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return path
+    
+    def write(self, msg):
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(encode(msg))
+    
+    def send_input(self, lane, song_time):
+        """Envía una pulsación; se puede llamar desde cualquier hilo."""
+        msg = {'type': 'in', 'l': lane, 't': song_time}
+        if self.loop is None:
+            return
+        if threading.current_thread() is self.thread:
+            self.write(msg)
+        else:
+            self.loop.call_soon_threadsafe(self.write, msg)
+    
+    # === CONEXIÓN ===
+    async def connect(self):
+        self.loop = asyncio.get_running_loop()
+        self.thread = threading.current_thread()
+        reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE)
+        self.write({'type': 'hello', 'name': self.name})
+        return reader
+    
+    async def sync_clock(self):
+        for _ in range(self.PINGS):
+            self.write({'type': 'ping', 'c': self.clock.now()})
+            await asyncio.sleep(0.02)
+    
+    async def listen(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            self.handle(json.loads(line))
+            if self.ended:
+                break
+    
+    async def main(self):
+        try:
+            reader = await self.connect()
+            await asyncio.gather(self.listen(reader), self.sync_clock())
+        except (OSError, ValueError) as exc:
+            self.error = str(exc)
+        finally:
+            self.ended = True
+            if self.writer is not None:
+                self.writer.close()
+    
+    def start_thread(self):
+        thread = threading.Thread(target=asyncio.run, args=(self.main(),), name='classroom', daemon=True)
+        thread.start()
+        return thread
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(':')
+    if not host or not port.isdigit():
+        return text, DEFAULT_PORT
+    return host, int(port)
+
+
+# === PRUEBA DE CARGA ===
+async def play_bot(host, port, index, profile):
+    """Un jugador automático: juega en local, envía sus pulsaciones y compara con el servidor."""
+    from .autoplay import Bot
+    from .chart import load_chart
+    
+    client = ClassroomClient(host, port, name=f"bot {index}")
+    task = asyncio.create_task(client.main())
+    while not client.ended and client.start_at is None:
+        await asyncio.sleep(0.05)
+    if client.start_at is None:
+        await task
+        return None
+    chart = load_chart(client.chart_path) if client.chart_path else None
+    sim = Simulation(client.seed, chart=chart)
+    bot = Bot.from_profile(profile, seed=client.seed ^ index)
+    start = client.song_start()
+    while not client.ended:
+        target = client.clock.now() - start
+        if client.duration is not None:
+            target = min(target, client.duration)
+        while sim.time + sim.dt <= target:
+            presses = bot.presses(sim)
+            for lane, t in presses:
+                client.send_input(lane, t)
+            sim.step(presses)
+            sim.events.clear()
+        await asyncio.sleep(SIM_STEP)
+    await task
+    server = client.board.get(str(client.id), {})
+    return client.id, sim.score, server.get('s'), client.rtt
+
+
+async def run_bots(host, port, count, profile):
+    results = await asyncio.gather(*(play_bot(host, port, i, profile) for i in range(count)))
+    return [result for result in results if result is not None]
+
+
+# === LÍNEA DE ÓRDENES ===
+async def serve(args):
+    server = ClassroomServer(seed=args.seed, chart_path=args.chart, duration=args.duration,
+                             players=args.players, wait=args.wait, countdown=args.countdown,
+                             rate=args.rate)
+    await server.start(args.host, args.port)
+    print(f"escuchando en {args.host}:{server.port} (semilla {server.seed})", file=sys.stderr)
+    await server.done.wait()
+    elapsed = server.song_time()
+    print(f"{len(server.results)} jugadores, {server.steps} pasos en {server.step_time:.2f} s de cálculo "
+          f"({100 * server.step_time / max(elapsed, 1e-9):.1f}% de un núcleo)", file=sys.stderr)
+    for rank, (score, name, max_combo, rejected) in enumerate(server.results, 1):
+        print(f"{rank:3d}. {name:24} {score:8d}  combo máximo {max_combo}"
+              + (f"  ({rejected} pulsaciones rechazadas)" if rejected else ''))
+    await server.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ritmo_runner.classroom',
+                                     description="Modo clase de Ritmo Runner en la red local")
+    commands = parser.add_subparsers(dest='command', required=True)
+    server = commands.add_parser('serve', help="abrir una partida para la clase")
+    server.add_argument('--host', default='0.0.0.0')
+    server.add_argument('--port', type=int, default=DEFAULT_PORT)
+    server.add_argument('--chart', help="partitura que toca toda la clase (.chart o .rrc)")
+    server.add_argument('--seed', type=int, help="semilla de las notas aleatorias (sin partitura)")
+    server.add_argument('--duration', type=float,
+                        help=f"segundos de partida (por defecto {DEFAULT_DURATION:.0f} sin partitura, o hasta su final)")
+    server.add_argument('--players', type=int, help="empezar en cuanto se conecten tantos jugadores")
+    server.add_argument('--wait', type=float, default=30.0, help="segundos de espera desde el primer jugador")
+    server.add_argument('--countdown', type=float, default=5.0, help="cuenta atrás antes de empezar")
+    server.add_argument('--rate', type=float, default=BOARD_RATE, help="actualizaciones de clasificación por segundo")
+    bots = commands.add_parser('bots', help="conectar jugadores automáticos (prueba de carga)")
+    bots.add_argument('count', type=int)
+    bots.add_argument('--server', default=f'127.0.0.1:{DEFAULT_PORT}', help="HOST[:PUERTO]")
+    bots.add_argument('--profile', default='experto', help="perfil de autoplay")
+    args = parser.parse_args(argv)
+    
+    if args.command == 'serve':
+        return asyncio.run(serve(args))
+    
+    host, port = parse_address(args.server)
+    results = asyncio.run(run_bots(host, port, args.count, args.profile))
+    mismatched = [r for r in results if r[1] != r[2]]
+    rtts = [r[3] for r in results if r[3] is not None]
+    print(f"{len(results)} bots jugaron; {len(mismatched)} con puntuación local distinta de la del servidor; "
+          f"ida y vuelta mínima {1000 * min(rtts, default=0):.1f} ms")
+    return 1 if mismatched or not results else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Constantes del juego: pantalla, colores, ritmo, figuras y niveles.
+
+Este módulo no importa pygame para que la lógica pueda reutilizarse sin
+abrir ventana ni cargar SDL.
+"""
+
+# === PANTALLA Y AUDIO ===
+WIDTH, HEIGHT = 1200, 700
+CAPTION = "Ritmo Runner - Aprende Ritmos con Música 🎵"
+SAMPLE_RATE = 44100
+AUDIO_BUFFER = 512
+# Fracción de la resolución de la ventana a la que se dibuja (``--quality``)
+QUALITY_PRESETS = {'baja': 0.5, 'media': 0.75, 'alta': 1.0}
+
+# === COLORES ===
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (220, 50, 50)
+GREEN = (50, 220, 50)
+BLUE = (50, 120, 220)
+YELLOW = (255, 220, 50)
+PURPLE = (180, 50, 255)
+ORANGE = (255, 150, 50)
+CYAN = (50, 220, 220)
+GOLD = (255, 215, 0)
+DARK_GRAY = (40, 40, 40)
+LIGHT_GRAY = (200, 200, 200)
+
+# === CONFIGURACIÓN RÍTMICA ===
+BPM = 120
+BEAT_DURATION = 60 / BPM
+HIT_WINDOW_PERFECT = 0.08
+HIT_WINDOW_GOOD = 0.15
+HIT_WINDOW_OK = 0.25
+
+# === TECLAS Y NOTAS ===
+KEYS = [ord('a'), ord('s'), ord('d'), ord('f')]  # pygame.K_a, K_s, K_d, K_f
+KEY_NAMES = ['A', 'S', 'D', 'F']
+NOTE_PITCHES = [60, 62, 64, 65]  # C4, D4, E4, F4
+LANE_COLORS = [(255, 100, 100), (100, 255, 100), (100, 100, 255), (255, 255, 100)]
+
+# === FIGURAS RÍTMICAS ===
+FIGURES = {
+    'redonda': {'duration': 4.0, 'color': (255, 50, 50), 'name': 'Redonda'},
+    'blanca': {'duration': 2.0, 'color': (100, 150, 255), 'name': 'Blanca'},
+    'negra': {'duration': 1.0, 'color': (255, 200, 50), 'name': 'Negra'},
+    'corchea': {'duration': 0.5, 'color': (50, 255, 150), 'name': 'Corchea'},
+    'semicorchea': {'duration': 0.25, 'color': (255, 100, 255), 'name': 'Semicorchea'},
+}
+
+# === NIVELES ===
+# Se sube de nivel al pasar de LEVEL_POINTS * (nivel + 1) puntos
+LEVEL_POINTS = 2000
+LEVELS = [
+    {
+        'name': 'Principiante',
+        'figures': ['negra', 'blanca', 'corchea'],
+        'speed': 300,
+        'spawn_rate': 2.5,
+        'bg_color': (135, 206, 235)
+    },
+    {
+        'name': 'Intermedio',
+        'figures': ['negra', 'blanca', 'corchea', 'redonda'],
+        'speed': 380,
+        'spawn_rate': 2.0,
+        'bg_color': (100, 149, 237)
+    },
+    {
+        'name': 'Avanzado',
+        'figures': ['negra', 'blanca', 'corchea', 'semicorchea', 'redonda'],
+        'speed': 450,
+        'spawn_rate': 1.5,
+        'bg_color': (75, 0, 130)
+    },
+]
+
+# === ESTADOS ===
+MENU, TUTORIAL, PLAYING, PAUSED, GAMEOVER, CALIBRATION = 0, 1, 2, 3, 4, 5
@@ -0,0 +1,864 @@
+"""Bucle del juego: estados de menú, dibujo y conexión con la simulación."""
+import math
+import os
+import random
+import time
+
+import pygame
+from pygame.locals import (
+    K_ESCAPE, K_F3, K_SPACE, K_c, K_m, K_r, K_t, KEYDOWN, QUIT, VIDEOEXPOSE, WINDOWEXPOSED,
+)
+
+from .audio import SoundBank
+from .autoplay import Bot
+from .calibration import Calibration, CalibrationSession
+from .chart import load_chart
+from .config import (
+    BEAT_DURATION, BLACK, CALIBRATION, CYAN, DARK_GRAY, FIGURES, GAMEOVER, GOLD, GREEN, HEIGHT,
+    KEY_NAMES, KEYS, LEVELS, LIGHT_GRAY, MENU, ORANGE, PAUSED, PLAYING,
+    RED, TUTORIAL, WHITE, WIDTH, YELLOW,
+)
+from .inputs import InputQueue
+from .pacing import FramePacer
+from .particles import ParticleSystem
+from .prefetch import LEVEL_UP_COLOR, LevelPrefetcher, level_label
+from .profiler import OVERLAY_RECT, draw_overlay, profiler
+from .replay import ReplayRecorder
+from .telemetry import SUFFIX as TELEMETRY_SUFFIX, TelemetryWriter, default_telemetry_dir
+from .render import (
+    BackgroundRenderer, DirtyRects, draw_note, draw_player, get_fonts, init_display,
+    lane_sprites, note_bounds, note_sprites, player_bounds, set_scale, text_cache,
+)
+from .simulation import Simulation, WallClock
+from .viewport import AutoQuality, Canvas, make_viewport
+
+# Zonas fijas de la pantalla de juego
+HUD_RECT = pygame.Rect(0, 0, WIDTH, 120)
+LANES_RECT = pygame.Rect(0, 320, WIDTH, 240)
+BEAT_RECT = pygame.Rect(WIDTH - 82, HEIGHT - 82, 64, 64)
+BOARD_RECT = pygame.Rect(10, 130, 260, 160)
+
+
+# === CLASE JUEGO ===
+class Game:
+    # Bucle de paso fijo: como mucho MAX_STEPS_PER_UPDATE pasos por actualización;
+    # si aún queda atraso se saltan hasta MAX_FRAME_SKIP dibujados seguidos, y
+    # sólo si el atraso supera MAX_LAG se descarta tiempo de simulación.
+    MAX_STEPS_PER_UPDATE = 8
+    MAX_FRAME_SKIP = 5
+    MAX_LAG = 0.25
+    
+    def __init__(self, viewport=None, clock=None, seed=None, chart_path=None, fps=60,
+                 dirty_rects=False, replay_dir=None, record_replays=True, telemetry_dir=None,
+                 record_telemetry=True, player='', trace_path=None, audio=None, autoplay=None,
+                 classroom=None, power_report=False, auto_quality=False):
+        # Se dibuja en coordenadas lógicas sobre ``self.screen``, el lienzo
+        # del objetivo interno de ``viewport`` (ver ``viewport``)
+        self.viewport = viewport if viewport is not None else make_viewport(init_display())
+        self.screen = self.viewport.canvas
+        set_scale(self.screen.scale)
+        self.fonts = get_fonts()
+        # Con calidad automática se baja la resolución interna si los frames no caben
+        self.auto_quality = AutoQuality(1 / (fps or 60), self.viewport.quality) if auto_quality else None
+        self.present_time = 0.0
+        self.fps = fps
+        self.clock = clock if clock is not None else WallClock()
+        self.inputs = InputQueue(self.clock)
+        # Ritmo de frames por estado: en las pantallas quietas el bucle duerme
+        self.pacer = FramePacer(fps, self.inputs, report=power_report)
+        self.calibration = Calibration.load()
+        self.calibration_session = None
+        self.seed = seed
+        self.chart_path = chart_path
+        self.replay_dir = replay_dir
+        self.record_replays = record_replays
+        self.telemetry_dir = telemetry_dir
+        self.record_telemetry = record_telemetry
+        self.player = player
+        # Perfil de ``autoplay`` con el que juega el bot, o None
+        self.autoplay = autoplay
+        # Cliente del modo clase (``ClassroomClient``): la partida la arranca el servidor
+        self.classroom = classroom
+        self.classroom_start = None
+        self.telemetry = None
+        self.trace_path = trace_path
+        if trace_path:
+            profiler.enable(trace=True)
+        self.particles = ParticleSystem()
+        self.particles.set_scale(self.screen.scale)
+        self.background = BackgroundRenderer()
+        self.background.set_scale(self.screen.scale)
+        # Sólo lo del primer nivel: el resto se precarga al acercarse a cada umbral
+        self.background.prebake(LEVELS[:1], self.screen)
+        note_sprites.prebake(LEVELS[0]['figures'])
+        self.layers = {}
+        # Modo de rectángulos sucios: sólo se repinta y presenta lo que cambió
+        self.dirty = DirtyRects(self.screen.get_size()) if dirty_rects else None
+        self.drawn = {}
+        self.overlay = None
+        # Motor de audio propio (metrónomo y pista de fondo); sin él, pygame.mixer
+        self.audio = audio
+        self.reset()
+        
+        # Los sonidos se preparan en segundo plano; el menú no los espera
+        self.sounds = SoundBank(engine=audio)
+        self.sounds.prefetch()
+        self.prefetcher = LevelPrefetcher(self.background, self.sounds, self.particles,
+                                          self.screen.surface.get_size(), self.fonts, self.screen.scale)
+    
+    def set_quality(self, quality):
+        """Cambia la resolución interna; lo horneado a la escala anterior se rehace."""
+        self.screen = self.viewport.set_quality(quality)
+        scale = self.screen.scale
+        set_scale(scale)
+        self.fonts = get_fonts()
+        self.background.set_scale(scale)
+        self.particles.set_scale(scale)
+        self.layers.clear()
+        self.drawn.clear()
+        if self.dirty is not None:
+            self.dirty.invalidate()
+        level = self.sim.current_level
+        self.prefetcher.rescale(self.fonts, self.screen.surface.get_size(), scale, level)
+        self.background.prebake(LEVELS[level:level + 1], self.screen)
+        note_sprites.prebake(FIGURES if self.sim.chart is not None else LEVELS[level]['figures'])
+    
+    def reset(self):
+        self.close_telemetry()
+        self.stop_song()
+        self.state = MENU
+        chart = load_chart(self.chart_path) if self.chart_path else None
+        if chart is not None:
+            # Una partitura puede usar cualquier figura desde el principio
+            note_sprites.prebake(FIGURES)
+        # Sin semilla fija se elige una al azar, para poder grabar la repetición
+        seed = self.seed if self.seed is not None else random.randrange(2**62)
+        self.sim = Simulation(seed, chart=chart)
+        self.recorder = ReplayRecorder(self.sim, self.chart_path)
+        self.bot = Bot.from_profile(self.autoplay, seed=seed) if self.autoplay else None
+        self.particles.clear()
+        self.start_time = 0
+        self.pause_time = 0
+        self.pending_inputs = []
+        self.alpha = 1.0
+        self.skip_render = False
+        self.frames_skipped = 0
+        self.steps_dropped = 0
+    
+    def add_particles(self, x, y, color, count):
+        self.particles.burst(x, y, color, count)
+    
+    def add_streak_effect(self):
+        player = self.sim.player
+        self.particles.ring(player.x, player.y - 20, GOLD, 20, 6)
+    
+    def apply_events(self, events):
+        # Sonidos y partículas pedidos por la simulación
+        player = self.sim.player
+        for event in events:
+            kind = event[0]
+            if kind == 'hit':
+                _, lane, note_type, color = event
+                with profiler.scope('audio'):
+                    self.sounds.play(note_type, lane)
+                self.add_particles(player.x, player.y - 20, color, 15)
+            elif kind == 'streak':
+                self.add_streak_effect()
+            elif kind == 'miss':
+                self.add_particles(player.x, player.y - 20, RED, 8)
+            elif kind == 'level_up':
+                self.prefetcher.install(event[1], self.sim.levels)
+                self.add_particles(WIDTH//2, HEIGHT//2, LEVEL_UP_COLOR, 30)
+            elif kind == 'finished':
+                self.game_over()
+    
+    def open_telemetry(self):
+        # Las partidas del bot no son de ningún jugador
+        if not self.record_telemetry or self.bot is not None:
+            return
+        directory = self.telemetry_dir or default_telemetry_dir()
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.sim.seed % 0x10000:04x}{TELEMETRY_SUFFIX}"
+        try:
+            self.telemetry = TelemetryWriter(os.path.join(directory, name), self.sim.seed, self.player)
+        except OSError:
+            self.telemetry = None
+    
+    def close_telemetry(self):
+        # Vuelca lo pendiente y espera al hilo escritor
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
+    
+    def start_song(self):
+        # Metrónomo y pista de fondo alineados con el inicio de la canción
+        if self.audio is not None:
+            self.audio.start_song(self.start_time, self.calibration.audio_offset, self.sim.tempo)
+    
+    def stop_song(self):
+        if self.audio is not None:
+            self.audio.stop_song()
+    
+    def game_over(self):
+        self.state = GAMEOVER
+        self.stop_song()
+        self.close_telemetry()
+        if self.record_replays:
+            try:
+                self.recorder.save(self.replay_dir)
+            except OSError:
+                pass
+    
+    def update(self, dt):
+        self.skip_render = False
+        if self.classroom is not None:
+            self.update_classroom()
+        if self.state == MENU:
+            self.sim.scroll_x += 60 * dt
+            self.sim.prev_scroll_x = self.sim.scroll_x
+            self.alpha = 1.0
+        elif self.state == CALIBRATION:
+            self.update_calibration()
+        elif self.state == PLAYING:
+            self.advance_simulation()
+    
+    def update_classroom(self):
+        # La partida empieza a la hora anunciada por el servidor y acaba con él
+        room = self.classroom
+        start = room.song_start()
+        if start is not None and start != self.classroom_start and not room.ended:
+            self.classroom_start = start
+            self.seed = room.seed
+            self.chart_path = room.chart_path
+            self.start_game()
+            self.start_time = start
+            self.start_song()
+        elif self.state == PLAYING and room.ended:
+            self.game_over()
+    
+    def classroom_status(self):
+        room = self.classroom
+        if room.error:
+            return f"Sin conexión: {room.error}", RED
+        if not room.connected:
+            return "Conectando con el servidor...", WHITE
+        if room.ended:
+            return "La partida de la clase terminó", WHITE
+        if room.spectator:
+            return "La partida ya empezó: mirando la clasificación", WHITE
+        start = room.song_start()
+        if start is None:
+            return f"Esperando a la clase ({len(room.board)} conectados)", GREEN
+        return f"Empieza en {max(0, math.ceil(start - self.clock.now()))}...", GREEN
+    
+    def advance_simulation(self):
+        # La simulación alcanza al reloj en pasos fijos; cada paso recibe
+        # las pulsaciones ocurridas hasta su final
+        sim = self.sim
+        target = self.clock.now() - self.start_time
+        steps = 0
+        while sim.time + sim.dt <= target and steps < self.MAX_STEPS_PER_UPDATE:
+            step_end = sim.time + sim.dt
+            pending = self.pending_inputs
+            ready = 0
+            while ready < len(pending) and pending[ready][1] <= step_end:
+                ready += 1
+            inputs = pending[:ready]
+            del pending[:ready]
+            if self.bot is not None:
+                presses = self.bot.presses(sim)
+                if self.classroom is not None:
+                    for lane, t in presses:
+                        self.classroom.send_input(lane, t)
+                inputs = sorted(inputs + presses, key=lambda press: press[1])
+            self.recorder.record(inputs)
+            with profiler.scope('update.sim'):
+                sim.step(inputs)
+            events = sim.drain_events()
+            self.recorder.observe(events)
+            if self.telemetry is not None:
+                self.telemetry.observe(events)
+            with profiler.scope('update.effects'):
+                self.apply_events(events)
+            
+            # Update particles
+            with profiler.scope('update.particles'):
+                self.particles.update()
+            steps += 1
+        self.prefetcher.update(sim)
+        
+        # Atrasados: primero se sacrifican dibujados, nunca pasos
+        lag = target - sim.time
+        if lag >= sim.dt:
+            if self.frames_skipped < self.MAX_FRAME_SKIP:
+                self.skip_render = True
+                self.frames_skipped += 1
+                return
+            if lag > self.MAX_LAG:
+                # Último recurso (p. ej. la ventana estuvo congelada): se
+                # descarta el atraso en vez de acelerar la partida
+                dropped = lag - sim.dt
+                self.start_time += dropped
+                self.steps_dropped += int(dropped / sim.dt)
+                lag = sim.dt
+        self.frames_skipped = 0
+        self.alpha = min(lag / sim.dt, 1.0)
+    
+    def render_time(self):
+        # Tiempo de canción que se está mostrando (interpolado entre pasos)
+        return self.sim.time + (self.alpha - 1) * self.sim.dt
+    
+    def layer(self, name, size, color):
+        # Capas translúcidas de color liso, creadas una sola vez
+        surf = self.layers.get(name)
+        if surf is None:
+            surf = pygame.Surface(self.screen.scaled_size(size), pygame.SRCALPHA)
+            profiler.count('surfaces')
+            surf.fill(color)
+            self.layers[name] = surf
+        return surf
+    
+    def draw_background(self):
+        bg_color = LEVELS[self.sim.current_level]['bg_color']
+        scroll_x = self.sim.prev_scroll_x + (self.sim.scroll_x - self.sim.prev_scroll_x) * self.alpha
+        self.background.draw(self.screen, bg_color, scroll_x)
+    
+    def draw_lanes(self):
+        # Líneas de carriles con efectos
+        lane_y_start = 350
+        clip = self.screen.get_clip()
+        for i in range(4):
+            lane_y = lane_y_start + i * 60
+            if not clip.colliderect((0, lane_y - 30, WIDTH, 60)):
+                continue
+            
+            # Flash effect
+            flash = self.sim.lane_flash[i]
+            alpha = int(100 + flash * 155)
+            
+            # Línea del carril
+            self.screen.blit(lane_sprites.line(i, alpha), (0, lane_y))
+            
+            # Zona de hit (en la posición del jugador)
+            hit_zone_surf = lane_sprites.hit_zone(i, 80 + int(flash * 100))
+            self.screen.blit(hit_zone_surf, (self.sim.player.x - 40, lane_y - 30))
+            
+            # Etiqueta de tecla
+            key_text = text_cache.render(self.fonts.small_font, KEY_NAMES[i], WHITE)
+            self.screen.blit(key_text, center=(self.sim.player.x, lane_y))
+    
+    def draw_hud(self):
+        # Panel superior con sombra
+        self.screen.blit(self.layer('hud', (WIDTH, 120), (0, 0, 0, 150)), (0, 0))
+        
+        # Score
+        score_label = text_cache.render(self.fonts.font, "PUNTOS: ", GOLD)
+        self.screen.blit(score_label, (20, 15))
+        text_cache.draw_glyphs(self.screen, self.fonts.font, str(self.sim.score), GOLD, (20 + self.screen.width(score_label), 15))
+        
+        # Combo
+        combo_color = GOLD if self.sim.combo > 20 else YELLOW if self.sim.combo > 10 else WHITE
+        combo_label = text_cache.render(self.fonts.font, "COMBO: ", combo_color)
+        self.screen.blit(combo_label, (20, 65))
+        text_cache.draw_glyphs(self.screen, self.fonts.font, f"{self.sim.combo}x", combo_color, (20 + self.screen.width(combo_label), 65))
+        
+        # Nivel
+        level_text = text_cache.render(self.fonts.small_font, level_label(LEVELS[self.sim.current_level]), ORANGE)
+        self.screen.blit(level_text, (WIDTH - 300, 20))
+        
+        # Barra de progreso al siguiente nivel
+        if self.sim.current_level < len(LEVELS) - 1:
+            progress = min(self.sim.score / self.sim.level_threshold(), 1.0)
+            bar_width = 250
+            bar_height = 20
+            bar_x = WIDTH - 300
+            bar_y = 60
+            
+            # Fondo
+            self.screen.rect(DARK_GRAY, (bar_x, bar_y, bar_width, bar_height), border_radius=10)
+            # Progreso
+            self.screen.rect(GREEN, (bar_x, bar_y, int(bar_width * progress), bar_height), border_radius=10)
+            # Borde
+            self.screen.rect(WHITE, (bar_x, bar_y, bar_width, bar_height), 2, border_radius=10)
+            
+            text_cache.draw_glyphs(self.screen, self.fonts.tiny_font, f"{int(progress*100)}%", WHITE, (bar_x + bar_width//2 - 20, bar_y + 2))
+    
+    def draw_leaderboard(self):
+        # Los cinco primeros de la clase y, si no está entre ellos, el propio jugador
+        self.screen.blit(self.layer('board', BOARD_RECT.size, (0, 0, 0, 150)), BOARD_RECT.topleft)
+        room = self.classroom
+        ranking = room.ranking()
+        rows = [(rank, entry) for rank, entry in enumerate(ranking, 1) if rank <= 5 or entry[2] == room.id]
+        y = BOARD_RECT.top + 8
+        for rank, (score, name, player_id) in rows[:6]:
+            color = GOLD if player_id == room.id else WHITE
+            text_cache.draw_glyphs(self.screen, self.fonts.tiny_font, f"{rank}. {name[:14]}", color,
+                                   (BOARD_RECT.left + 10, y))
+            text_cache.draw_glyphs(self.screen, self.fonts.tiny_font, str(score), color,
+                                   (BOARD_RECT.right - 80, y))
+            y += 24
+    
+    def draw_ui(self):
+        # Con recorte (modo de rectángulos sucios) se omite lo que queda fuera
+        clip = self.screen.get_clip()
+        if clip.colliderect(HUD_RECT):
+            self.draw_hud()
+        if self.classroom is not None and clip.colliderect(BOARD_RECT):
+            self.draw_leaderboard()
+        
+        # Feedback
+        if self.sim.feedback_timer > 0:
+            alpha = int(255 * self.sim.feedback_timer)
+            feedback_surf = text_cache.render(self.fonts.font, self.sim.feedback_text, WHITE)
+            feedback_surf.set_alpha(alpha)
+            self.screen.blit(feedback_surf, center=(WIDTH//2, 200))
+        
+        # Beat indicator
+        if not clip.colliderect(BEAT_RECT):
+            return
+        beat_size = self.beat_size()
+        self.screen.circle(RED, (WIDTH - 50, HEIGHT - 50), beat_size)
+        self.screen.circle(WHITE, (WIDTH - 50, HEIGHT - 50), beat_size, 3)
+    
+    def beat_size(self):
+        current_beat = self.sim.tempo.beat(max(self.render_time(), 0))
+        beat_pulse = abs(math.sin(current_beat * math.pi))
+        return 15 + int(beat_pulse * 15)
+    
+    def menu_circles(self):
+        # Fondo animado
+        for i in range(10):
+            x = (i * 150 + self.sim.scroll_x) % (WIDTH + 100)
+            y = 300 + math.sin(self.sim.scroll_x * 0.01 + i) * 50
+            size = 30 + math.sin(self.sim.scroll_x * 0.02 + i) * 10
+            color = FIGURES[list(FIGURES.keys())[i % len(FIGURES)]]['color']
+            yield color, (int(x), int(y)), int(size)
+    
+    def draw_menu(self):
+        for color, center, size in self.menu_circles():
+            self.screen.circle(color, center, size)
+        
+        # Título
+        title = text_cache.render(self.fonts.title_font, "RITMO RUNNER", GOLD)
+        title_shadow = text_cache.render(self.fonts.title_font, "RITMO RUNNER", BLACK)
+        self.screen.blit(title_shadow, midtop=(WIDTH//2 + 5, 105))
+        self.screen.blit(title, midtop=(WIDTH//2, 100))
+        
+        # Subtítulo
+        subtitle = text_cache.render(self.fonts.small_font, "🎵 Aprende Ritmos con Música 🎵", WHITE)
+        self.screen.blit(subtitle, midtop=(WIDTH//2, 200))
+        
+        # Opciones (en el modo clase la partida la arranca el servidor)
+        options = [
+            ("ESPACIO - Jugar", GREEN) if self.classroom is None else self.classroom_status(),
+            ("T - Tutorial", CYAN),
+            ("C - Calibrar", ORANGE),
+            ("ESC - Salir", RED)
+        ]
+        
+        for i, (text, color) in enumerate(options):
+            opt = text_cache.render(self.fonts.small_font, text, color)
+            self.screen.blit(opt, midtop=(WIDTH//2, 320 + i * 60))
+        
+        # Best score
+        if self.sim.max_combo > 0:
+            best = text_cache.render(self.fonts.tiny_font, f"Mejor Combo: {self.sim.max_combo}x | Puntuación: {self.sim.score}", YELLOW)
+            self.screen.blit(best, midtop=(WIDTH//2, 550))
+    
+    def draw_tutorial(self):
+        # Panel
+        panel_w, panel_h = 800, 500
+        panel_x = (WIDTH - panel_w) // 2
+        panel_y = (HEIGHT - panel_h) // 2
+        
+        panel_surf = self.layers.get('tutorial')
+        if panel_surf is None:
+            panel_surf = pygame.Surface(self.screen.scaled_size((panel_w, panel_h)), pygame.SRCALPHA)
+            profiler.count('surfaces')
+            panel = Canvas(panel_surf, self.screen.scale, (panel_w, panel_h))
+            panel.rect((0, 0, 0, 200), (0, 0, panel_w, panel_h), border_radius=20)
+            panel.rect(GOLD, (0, 0, panel_w, panel_h), 5, border_radius=20)
+            self.layers['tutorial'] = panel_surf
+        self.screen.blit(panel_surf, (panel_x, panel_y))
+        
+        # Título
+        title = text_cache.render(self.fonts.font, "TUTORIAL", GOLD)
+        self.screen.blit(title, midtop=(WIDTH//2, panel_y + 30))
+        
+        # Instrucciones
+        instructions = [
+            "🎹 Presiona A, S, D, F cuando las notas lleguen a la zona",
+            "⏱️ Timing PERFECTO = Más puntos",
+            "🔥 Mantén combos para multiplicadores",
+            "📈 Completa niveles para desbloquear nuevas figuras",
+            "⏸️ ESPACIO = Pausa | R = Reiniciar"
+        ]
+        
+        for i, line in enumerate(instructions):
+            text = text_cache.render(self.fonts.tiny_font, line, WHITE)
+            self.screen.blit(text, (panel_x + 50, panel_y + 110 + i * 40))
+        
+        # Figuras rítmicas
+        for i, (fig_name, fig_data) in enumerate(FIGURES.items()):
+            x = panel_x + 90 + i * 155
+            y = panel_y + 350
+            self.screen.circle(fig_data['color'], (x, y), 25)
+            self.screen.circle(WHITE, (x, y), 25, 3)
+            name = text_cache.render(self.fonts.tiny_font, fig_data['name'], WHITE)
+            self.screen.blit(name, midtop=(x, y + 35))
+            beats = text_cache.render(self.fonts.tiny_font, f"{fig_data['duration']} t", LIGHT_GRAY)
+            self.screen.blit(beats, midtop=(x, y + 60))
+        
+        # Volver
+        back = text_cache.render(self.fonts.tiny_font, "ESPACIO - Jugar | ESC - Menú", GREEN)
+        self.screen.blit(back, midtop=(WIDTH//2, panel_y + panel_h - 40))
+    
+    def draw_paused(self):
+        self.screen.blit(self.layer('paused', (WIDTH, HEIGHT), (0, 0, 0, 150)), (0, 0))
+        
+        text = text_cache.render(self.fonts.title_font, "PAUSA", WHITE)
+        self.screen.blit(text, midtop=(WIDTH//2, HEIGHT//2 - 80))
+        hint = text_cache.render(self.fonts.small_font, "ESPACIO - Continuar | R - Reiniciar", LIGHT_GRAY)
+        self.screen.blit(hint, midtop=(WIDTH//2, HEIGHT//2 + 20))
+    
+    def draw_gameover(self):
+        self.screen.blit(self.layer('gameover', (WIDTH, HEIGHT), (0, 0, 0, 200)), (0, 0))
+        
+        title = text_cache.render(self.fonts.title_font, "FIN DEL JUEGO", RED)
+        self.screen.blit(title, midtop=(WIDTH//2, 100))
+        
+        score = text_cache.render(self.fonts.font, f"Puntuación: {self.sim.score}", GOLD)
+        self.screen.blit(score, midtop=(WIDTH//2, 220))
+        combo = text_cache.render(self.fonts.small_font, f"Mejor Combo: {self.sim.max_combo}x", YELLOW)
+        self.screen.blit(combo, midtop=(WIDTH//2, 290))
+        
+        # Estadísticas
+        for i, (name, color) in enumerate([('perfect', GOLD), ('good', GREEN), ('ok', YELLOW), ('miss', RED)]):
+            text = text_cache.render(self.fonts.small_font, f"{name.upper()}: {self.sim.stats[name]}", color)
+            self.screen.blit(text, midtop=(WIDTH//2, 350 + i * 45))
+        
+        hint = text_cache.render(self.fonts.small_font, "R - Reiniciar | ESC - Menú", WHITE)
+        self.screen.blit(hint, midtop=(WIDTH//2, 560))
+    
+    def start_calibration(self):
+        self.state = CALIBRATION
+        self.calibration_session = CalibrationSession(self.clock.now())
+        self.calibration_beat = -1
+    
+    def update_calibration(self):
+        session = self.calibration_session
+        now = self.clock.now()
+        session.update(now)
+        if session.done:
+            result = session.result()
+            if result is not None:
+                self.calibration = result
+                try:
+                    result.save()
+                except OSError:
+                    pass
+            return
+        
+        # Clic en cada pulso de la fase de audio; con el motor propio el del
+        # pulso siguiente se programa por adelantado y suena en su muestra exacta
+        beat = int(session.beat_position(now))
+        if beat != self.calibration_beat:
+            self.calibration_beat = beat
+            if session.phase == 'audio':
+                if self.audio is not None:
+                    if beat == 0:
+                        self.sounds.play_click()
+                    self.sounds.play_click(at=session.phase_start + (beat + 1) * BEAT_DURATION)
+                else:
+                    self.sounds.play_click()
+    
+    def draw_calibration(self):
+        session = self.calibration_session
+        title = text_cache.render(self.fonts.font, "CALIBRACIÓN", GOLD)
+        self.screen.blit(title, midtop=(WIDTH//2, 80))
+        
+        if session.done:
+            result = session.result()
+            if result is None:
+                lines = ["No hubo suficientes golpes a tiempo", "C - Repetir | ESC - Menú"]
+            else:
+                lines = [f"Entrada: {result.input_offset * 1000:+.0f} ms",
+                         f"Audio: {result.audio_offset * 1000:+.0f} ms",
+                         "Guardado. C - Repetir | ESC - Menú"]
+        else:
+            if session.phase == 'visual':
+                lines = ["Pulsa ESPACIO cuando el círculo se ilumine"]
+                position = session.beat_position(self.clock.now())
+                pulse = max(0.0, 1 - (position - math.floor(position)) * 4)
+                radius = 40 + int(pulse * 30)
+                color = GOLD if pulse > 0 else DARK_GRAY
+                self.screen.circle(color, (WIDTH//2, HEIGHT//2 + 40), radius)
+                self.screen.circle(WHITE, (WIDTH//2, HEIGHT//2 + 40), radius, 3)
+            else:
+                lines = ["Cierra los ojos y pulsa ESPACIO con cada clic"]
+            lines.append(f"Golpes: {session.taps()}/{session.TAPS}")
+        
+        for i, line in enumerate(lines):
+            text = text_cache.render(self.fonts.small_font, line, WHITE)
+            self.screen.blit(text, midtop=(WIDTH//2, 170 + i * 50))
+    
+    def start_game(self):
+        self.reset()
+        self.state = PLAYING
+        self.open_telemetry()
+        self.start_time = self.clock.now()
+        self.start_song()
+    
+    def song_time(self, timestamp):
+        # Tiempo de canción de una pulsación, descontando el retraso de entrada
+        return timestamp - self.start_time - self.calibration.input_offset
+    
+    def handle_event(self, event, timestamp=None):
+        if event.type == QUIT:
+            return False
+        if event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+            self.viewport.invalidate()
+            if self.dirty is not None:
+                self.dirty.invalidate()
+        if event.type != KEYDOWN:
+            return True
+        if event.key == K_F3:
+            profiler.toggle_overlay()
+            return True
+        if event.key == K_m and self.audio is not None:
+            self.audio.metronome = not self.audio.metronome
+            return True
+        if timestamp is None:
+            timestamp = self.clock.now()
+        
+        solo = self.classroom is None
+        if self.state == MENU:
+            if event.key == K_SPACE and solo:
+                self.start_game()
+            elif event.key == K_t:
+                self.state = TUTORIAL
+            elif event.key == K_c:
+                self.start_calibration()
+            elif event.key == K_ESCAPE:
+                return False
+        elif self.state == CALIBRATION:
+            if event.key == K_SPACE:
+                self.calibration_session.record_tap(timestamp)
+            elif event.key == K_c and self.calibration_session.done:
+                self.start_calibration()
+            elif event.key == K_ESCAPE:
+                self.state = MENU
+        elif self.state == TUTORIAL:
+            if event.key == K_SPACE and solo:
+                self.start_game()
+            elif event.key == K_ESCAPE:
+                self.state = MENU
+        elif self.state == PLAYING:
+            if event.key in KEYS:
+                lane, t = KEYS.index(event.key), self.song_time(timestamp)
+                self.pending_inputs.append((lane, t))
+                if not solo:
+                    self.classroom.send_input(lane, t)
+            elif event.key == K_SPACE and solo:
+                self.state = PAUSED
+                self.pause_time = self.clock.now()
+                self.stop_song()
+            elif event.key == K_r and solo:
+                self.start_game()
+            elif event.key == K_ESCAPE:
+                self.game_over()
+        elif self.state == PAUSED:
+            if event.key == K_SPACE:
+                # Compensar el tiempo en pausa
+                self.start_time += self.clock.now() - self.pause_time
+                self.state = PLAYING
+                self.start_song()
+            elif event.key == K_r:
+                self.start_game()
+            elif event.key == K_ESCAPE:
+                self.game_over()
+        elif self.state == GAMEOVER:
+            if event.key == K_r and solo:
+                self.start_game()
+            elif event.key == K_ESCAPE:
+                self.state = MENU
+        return True
+    
+    def draw_scene(self):
+        if self.state == MENU:
+            self.draw_background()
+            self.draw_menu()
+        elif self.state == TUTORIAL:
+            self.draw_background()
+            self.draw_tutorial()
+        elif self.state == CALIBRATION:
+            self.draw_background()
+            self.draw_calibration()
+        else:
+            clip = self.screen.get_clip()
+            with profiler.scope('draw.background'):
+                self.draw_background()
+            with profiler.scope('draw.lanes'):
+                self.draw_lanes()
+            lane_y_start = 350
+            if clip.colliderect(LANES_RECT):
+                with profiler.scope('draw.notes'):
+                    t = self.render_time()
+                    for note in self.sim.notes:
+                        draw_note(self.screen, note, self.sim.note_x(note, t), lane_y_start + note.lane * 60, t)
+            if clip.colliderect(player_bounds(self.sim.player, self.alpha)):
+                with profiler.scope('draw.player'):
+                    draw_player(self.screen, self.sim.player, self.alpha)
+            particles = self.particles.bounds()
+            if particles is not None and clip.colliderect(particles):
+                with profiler.scope('draw.particles'):
+                    self.particles.draw(self.screen)
+            with profiler.scope('draw.ui'):
+                self.draw_ui()
+                if self.state == PAUSED:
+                    self.draw_paused()
+                elif self.state == GAMEOVER:
+                    self.draw_gameover()
+    
+    def mark_changed(self, name, value, rect):
+        # Marca ``rect`` sólo si el valor mostrado cambió desde el último frame
+        if self.drawn.get(name) != value:
+            self.drawn[name] = value
+            self.dirty.mark(rect)
+    
+    def mark_dirty(self):
+        """Marca las regiones que cambian en este frame según el estado."""
+        dirty = self.dirty
+        sim = self.sim
+        # Overlay pintado sobre la ventana: lo que tapa se repinta cada frame
+        overlay = self.viewport.overlay_rect(OVERLAY_RECT.topleft, OVERLAY_RECT.size) if profiler.overlay else None
+        # Otro estado u otro nivel (o el overlay se quita): cambia el fondo completo
+        self.mark_changed('screen', (self.state, sim.current_level, overlay is not None), dirty.bounds)
+        if overlay is not None:
+            dirty.mark(overlay)
+        
+        if self.state in (MENU, PLAYING):
+            scroll_x = sim.prev_scroll_x + (sim.scroll_x - sim.prev_scroll_x) * self.alpha
+            for rect in self.background.cloud_rects(self.screen.get_size(), scroll_x):
+                dirty.mark(rect)
+        
+        if self.state == MENU:
+            for _color, (x, y), size in self.menu_circles():
+                dirty.mark((x - size - 1, y - size - 1, 2 * size + 2, 2 * size + 2))
+            if self.classroom is not None:
+                self.mark_changed('classroom', self.classroom_status(), (0, 310, WIDTH, 60))
+        elif self.state == CALIBRATION:
+            session = self.calibration_session
+            self.mark_changed('calibration', (session.phase, session.taps(), session.done),
+                              (0, 160, WIDTH, 160))
+            if not session.done and session.phase == 'visual':
+                dirty.mark((WIDTH//2 - 72, HEIGHT//2 - 32, 144, 144))
+        elif self.state == PLAYING:
+            lane_y_start = 350
+            for i, flash in enumerate(sim.lane_flash):
+                lane_y = lane_y_start + i * 60
+                key = (int(100 + flash * 155), int(flash * 100))
+                self.mark_changed(f'lane{i}', key, (0, lane_y - 30, WIDTH, 60))
+            t = self.render_time()
+            for note in sim.notes:
+                if not (note.hit or note.missed):
+                    dirty.mark(note_bounds(note, sim.note_x(note, t), lane_y_start + note.lane * 60, t))
+            dirty.mark(player_bounds(sim.player, self.alpha))
+            particles = self.particles.bounds()
+            if particles is not None:
+                dirty.mark(particles)
+            
+            # HUD: sólo los campos cuyo valor cambió
+            if self.classroom is not None:
+                self.mark_changed('board', (self.classroom.seq, len(self.classroom.board)), BOARD_RECT)
+            self.mark_changed('score', sim.score, (0, 10, WIDTH - 320, 50))
+            self.mark_changed('combo', sim.combo, (0, 60, WIDTH - 320, 55))
+            if sim.current_level < len(LEVELS) - 1:
+                progress = min(sim.score / sim.level_threshold(), 1.0)
+                self.mark_changed('progress', (int(progress * 250), int(progress * 100)), (WIDTH - 302, 58, 254, 24))
+            if sim.feedback_timer > 0:
+                feedback_surf = text_cache.render(self.fonts.font, sim.feedback_text, WHITE)
+                dirty.mark(self.screen.place(feedback_surf, center=(WIDTH//2, 200)))
+            self.mark_changed('beat', self.beat_size(), BEAT_RECT)
+    
+    def render_overlay(self):
+        # En píxeles de la ventana y aparte: la GPU lo pone encima de la escena
+        surf = self.overlay
+        if surf is None:
+            surf = self.overlay = pygame.Surface(OVERLAY_RECT.size, pygame.SRCALPHA)
+            profiler.count('surfaces')
+        surf.fill((0, 0, 0, 0))
+        draw_overlay(surf, (0, 0))
+        return surf
+    
+    def draw(self):
+        with profiler.scope('draw'):
+            if self.dirty is None:
+                rects = None
+                self.draw_scene()
+            else:
+                # Se repinta la escena recortada a cada región sucia
+                self.mark_dirty()
+                rects = self.dirty.collect()
+                for rect in rects:
+                    self.screen.set_clip(rect)
+                    self.draw_scene()
+                self.screen.set_clip(None)
+        with profiler.scope('present.upload'):
+            changed = self.viewport.compose(rects)
+        overlay = None
+        if profiler.overlay:
+            with profiler.scope('draw.overlay'):
+                overlay = self.render_overlay()
+        # Últimos eventos antes de presentar (``present`` puede esperar al vsync)
+        self.inputs.poll()
+        with profiler.scope('present'):
+            start = time.perf_counter()
+            self.viewport.present(changed, overlay, OVERLAY_RECT.topleft)
+            self.present_time = time.perf_counter() - start
+    
+    def run(self):
+        running = True
+        while running:
+            # Sin límite de fps mientras se recupera atraso; el overlay siempre se mueve
+            dt = self.pacer.tick(self.state, animating=profiler.overlay, catch_up=self.skip_render)
+            profiler.begin_frame()
+            with profiler.scope('events'):
+                self.inputs.poll()
+                for timestamp, event in self.inputs.drain():
+                    if not self.handle_event(event, timestamp):
+                        running = False
+                        break
+            
+            with profiler.scope('update'):
+                self.update(dt)
+            if not self.skip_render:
+                self.inputs.poll()
+                self.draw()
+                if self.auto_quality is not None and self.state == PLAYING:
+                    # Sin la espera de ``present``: con vsync ocuparía todo el presupuesto
+                    busy = time.perf_counter() - self.pacer.last_tick - self.present_time
+                    quality = self.auto_quality.observe(busy)
+                    if quality is not None:
+                        self.set_quality(quality)
+            profiler.gauge('notes', len(self.sim.notes))
+            profiler.gauge('particles', len(self.particles))
+            profiler.end_frame()
+        
+        if self.trace_path:
+            try:
+                profiler.write_trace(self.trace_path)
+            except OSError:
+                pass
+        self.shutdown()
+        pygame.quit()
+        self.pacer.print_report()
+    
+    def shutdown(self):
+        """Cierra la telemetría, los hilos de fondo, el audio y la ventana."""
+        self.close_telemetry()
+        self.prefetcher.shutdown()
+        self.sounds.shutdown()
+        if self.audio is not None:
+            self.audio.close()
+        self.viewport.close()
+
@@ -0,0 +1,47 @@
+"""Entrada con marca de tiempo.
+
+pygame no guarda cuándo se pulsó una tecla, así que la cola vacía el buffer
+de eventos de SDL varias veces por frame (antes de actualizar, después y
+justo antes de presentar) y sella cada evento con el reloj del juego en ese
+momento. El juicio usa ese sello, no el instante en que se procesa el evento.
+En reposo, ``wait`` duerme en la cola hasta que llega algo.
+"""
+import time
+from collections import deque
+
+import pygame
+
+
+class InputQueue:
+    # Eventos que se encolan pero no despiertan una espera
+    QUIET = frozenset((pygame.MOUSEMOTION,))
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.events = deque()
+    
+    def poll(self):
+        events = pygame.event.get()
+        if events:
+            now = self.clock.now()
+            self.events.extend((now, event) for event in events)
+    
+    def wait(self, timeout):
+        """Duerme hasta el siguiente evento (como mucho ``timeout`` segundos) y lo encola."""
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            event = pygame.event.wait(max(1, int(remaining * 1000)))
+            if event.type == pygame.NOEVENT:
+                return
+            self.events.append((self.clock.now(), event))
+            if event.type not in self.QUIET:
+                self.poll()
+                return
+    
+    def drain(self):
+        events = self.events
+        while events:
+            yield events.popleft()
@@ -0,0 +1,107 @@
+"""Ritmo de frames según el estado: a tope jugando, casi nada en reposo.
+
+Jugando y calibrando el bucle va al límite del juego (``--fps``). El menú
+anima unos círculos lentos y le basta ``STATE_FPS[MENU]``. Tutorial, pausa y
+fin de partida no se mueven: el bucle duerme bloqueado en la cola de eventos
+de SDL y sólo dibuja al llegar una tecla (o cada ``IDLE_TIMEOUT``, por si
+cambia algo de fuera, como la clasificación del modo clase). El menú también
+espera en la cola entre sus frames: en ambos casos una tecla se atiende al
+instante y el cambio de estado sube al ritmo completo en el mismo frame.
+
+Con ``report`` se acumula por estado el tiempo de CPU del proceso (todos sus
+hilos, audio incluido), el tiempo real y los frames; ``print_report`` lo
+muestra al salir.
+"""
+import sys
+import time
+
+import pygame
+
+from .config import CALIBRATION, GAMEOVER, MENU, PAUSED, PLAYING, TUTORIAL
+
+# fps de cada estado: None es el límite del juego y 0, reposo (esperar eventos)
+STATE_FPS = {
+    MENU: 30,
+    TUTORIAL: 0,
+    PLAYING: None,
+    PAUSED: 0,
+    GAMEOVER: 0,
+    CALIBRATION: None,
+}
+STATE_NAMES = {
+    MENU: 'menú',
+    TUTORIAL: 'tutorial',
+    PLAYING: 'jugando',
+    PAUSED: 'pausa',
+    GAMEOVER: 'fin',
+    CALIBRATION: 'calibración',
+}
+# Segundos máximos dormido en reposo
+IDLE_TIMEOUT = 0.5
+
+
+class FramePacer:
+    """Espera entre frames según el estado y, opcionalmente, mide la CPU de cada uno."""
+    def __init__(self, fps, inputs, report=False):
+        self.fps = fps
+        self.inputs = inputs
+        self.clock = pygame.time.Clock()
+        self.last_tick = time.perf_counter()
+        # estado -> [segundos de CPU, segundos reales, frames]
+        self.usage = {} if report else None
+        self.cpu_mark = time.process_time()
+        self.wall_mark = time.perf_counter()
+    
+    def rate(self, state):
+        """fps de ``state`` (0 = reposo), sin pasar nunca del límite del juego."""
+        fps = STATE_FPS.get(state)
+        if fps is None:
+            return self.fps
+        if fps and self.fps:
+            return min(fps, self.fps)
+        return fps
+    
+    def tick(self, state, animating=False, catch_up=False):
+        """Espera al siguiente frame de ``state`` y devuelve los segundos transcurridos.
+    
+        ``animating`` fuerza el ritmo completo (p. ej. con el overlay de F3) y
+        ``catch_up`` no espera nada mientras la simulación recupera atraso.
+        """
+        fps = self.rate(state)
+        if catch_up or animating or STATE_FPS.get(state) is None:
+            dt = self.clock.tick(0 if catch_up else self.fps) / 1000.0
+        else:
+            # Ritmo reducido o reposo: se duerme en la cola de eventos, así que
+            # una tecla despierta al bucle al instante en vez de esperar al tick
+            if fps:
+                self.inputs.wait(1 / fps - (time.perf_counter() - self.last_tick))
+            else:
+                self.inputs.wait(IDLE_TIMEOUT)
+            dt = self.clock.tick() / 1000.0
+            if not fps:
+                # Nada avanza en reposo: el tiempo dormido no cuenta
+                dt = 0.0
+        self.last_tick = time.perf_counter()
+        if self.usage is not None:
+            self.account(state)
+        return dt
+    
+    # === MEDICIÓN ===
+    def account(self, state):
+        # Lo ocurrido desde la última marca (frame y espera) se carga a ``state``
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        usage = self.usage.setdefault(state, [0.0, 0.0, 0])
+        usage[0] += cpu - self.cpu_mark
+        usage[1] += wall - self.wall_mark
+        usage[2] += 1
+        self.cpu_mark = cpu
+        self.wall_mark = wall
+    
+    def print_report(self, out=sys.stdout):
+        if not self.usage:
+            return
+        print(f"{'estado':12} {'CPU s':>8} {'real s':>8} {'CPU %':>6} {'frames':>7} {'fps':>6}", file=out)
+        for state, (cpu, wall, frames) in sorted(self.usage.items()):
+            print(f"{STATE_NAMES.get(state, state):12} {cpu:8.2f} {wall:8.2f} "
+                  f"{100 * cpu / max(wall, 1e-9):6.1f} {frames:7d} {frames / max(wall, 1e-9):6.1f}", file=out)
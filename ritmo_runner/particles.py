@@ -0,0 +1,174 @@
+"""Sistema de partículas vectorizado con NumPy."""
+import math
+
+import numpy as np
+import pygame
+
+from .profiler import profiler
+
+
+# === SISTEMA DE PARTÍCULAS ===
+class ParticleSystem:
+    """Partículas en arreglos NumPy de capacidad fija (estructura de arreglos).
+    
+    Las partículas vivas ocupan siempre las primeras ``count`` posiciones; la
+    física se aplica en un solo paso vectorizado y el dibujo reutiliza sprites
+    de círculo pre-renderizados por (color, tamaño, nivel de alfa). Posiciones
+    y tamaños son lógicos; los sprites se hornean a ``scale``.
+    """
+    MAX_LIFE = 60
+    GRAVITY = 0.2
+    FRICTION = 0.98
+    ALPHA_BUCKETS = 32
+    SIZES = (3, 9)
+    
+    def __init__(self, capacity=4096, rng=None):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros(capacity, dtype=np.int16)
+        self.palette = []
+        self.palette_index = {}
+        self.sprites = {}
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.set_scale(1.0)
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        self.count = 0
+    
+    def set_scale(self, scale):
+        self.scale = scale
+        self.sprites.clear()
+        # Radio en píxeles de cada tamaño lógico
+        self.radii = np.maximum(np.rint(np.arange(self.SIZES[1]) * scale), 1).astype(np.int32)
+    
+    def _color_id(self, color):
+        color = tuple(color)
+        idx = self.palette_index.get(color)
+        if idx is None:
+            idx = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = idx
+        return idx
+    
+    def emit(self, x, y, color, vx, vy):
+        # Si no hay espacio se descartan las partículas sobrantes
+        n = min(len(vx), self.capacity - self.count)
+        if n <= 0:
+            return
+        start, end = self.count, self.count + n
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = vx[:n]
+        self.vy[start:end] = vy[:n]
+        self.life[start:end] = self.MAX_LIFE
+        self.size[start:end] = self.rng.integers(*self.SIZES, n)
+        self.color[start:end] = self._color_id(color)
+        self.count = end
+    
+    def burst(self, x, y, color, count):
+        vx = self.rng.uniform(-4, 4, count)
+        vy = self.rng.uniform(-6, -2, count)
+        self.emit(x, y, color, vx, vy)
+    
+    def ring(self, x, y, color, count, speed):
+        angles = np.arange(count) / count * math.pi * 2
+        self.emit(x, y, color, np.cos(angles) * speed, np.sin(angles) * speed)
+    
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += self.GRAVITY  # Gravedad
+        self.vx[:n] *= self.FRICTION  # Fricción
+        self.life[:n] -= 1
+        
+        # Compactar: las vivas vuelven al principio de los arreglos
+        alive = self.life[:n] > 0
+        live = int(np.count_nonzero(alive))
+        if live < n:
+            for arr in (self.x, self.y, self.vx, self.vy, self.life, self.size, self.color):
+                arr[:live] = arr[:n][alive]
+            self.count = live
+    
+    def bounds(self):
+        """Rectángulo que cubre todas las partículas vivas, o ``None``."""
+        n = self.count
+        if n == 0:
+            return None
+        margin = int(self.size[:n].max()) + 1
+        x0, x1 = int(self.x[:n].min()) - margin, int(self.x[:n].max()) + margin
+        y0, y1 = int(self.y[:n].min()) - margin, int(self.y[:n].max()) + margin
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+    
+    def bake_sprite(self, color, size, bucket):
+        alpha = 255 * bucket // (self.ALPHA_BUCKETS - 1)
+        radius = int(self.radii[size])
+        sprite = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+        profiler.count('surfaces')
+        pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+        return sprite
+    
+    def sprite(self, color_id, size, bucket):
+        key = (color_id, size, bucket)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.bake_sprite(self.palette[color_id], size, bucket)
+            self.sprites[key] = sprite
+        return sprite
+    
+    def bake_color(self, color):
+        """Todos los sprites que puede usar una partícula de ``color``, sin guardarlos.
+        
+        No modifica el sistema, así que se puede llamar desde otro hilo; los
+        resultados se añaden con ``install_color``.
+        """
+        color = tuple(color)
+        color_id = self.palette_index.get(color)
+        # Los mismos tamaños y niveles de alfa que calcula ``draw`` durante la vida
+        keys = set()
+        for start_size in range(*self.SIZES):
+            for life in range(1, self.MAX_LIFE + 1):
+                ratio = life / self.MAX_LIFE
+                size = int(start_size * ratio)
+                if size > 0:
+                    keys.add((size, round(ratio * (self.ALPHA_BUCKETS - 1))))
+        return {key: self.bake_sprite(color, *key) for key in keys
+                if (color_id, *key) not in self.sprites}
+    
+    def install_color(self, color, sprites):
+        color_id = self._color_id(color)
+        for (size, bucket), sprite in sprites.items():
+            self.sprites.setdefault((color_id, size, bucket), sprite)
+    
+    def draw(self, canvas):
+        n = self.count
+        if n == 0:
+            return
+        ratio = self.life[:n] / self.MAX_LIFE
+        sizes = (self.size[:n] * ratio).astype(np.int32)
+        visible = sizes > 0
+        sizes = sizes[visible]
+        buckets = np.rint(ratio[visible] * (self.ALPHA_BUCKETS - 1)).astype(np.int32)
+        xs, ys = self.x[:n][visible], self.y[:n][visible]
+        if self.scale != 1:
+            xs, ys = xs * self.scale, ys * self.scale
+        radii = self.radii[sizes]
+        xs = (xs - radii).astype(np.int32)
+        ys = (ys - radii).astype(np.int32)
+        colors = self.color[:n][visible]
+        
+        sprite = self.sprite
+        canvas.surface.blits([(sprite(c, size, b), (x, y)) for c, size, b, x, y
+                              in zip(colors.tolist(), sizes.tolist(), buckets.tolist(),
+                                     xs.tolist(), ys.tolist())], doreturn=False)
@@ -0,0 +1,93 @@
+"""Precarga del siguiente nivel en segundo plano.
+
+Al subir de nivel el frame siguiente necesita otro degradado de fondo,
+sprites de figuras nuevas, el rótulo del HUD, sus sonidos y las partículas
+de la celebración. ``LevelPrefetcher``
+los prepara en un hilo cuando los puntos se acercan al umbral
+(``PREFETCH_AT``) y los instala de una vez en el frame de la subida, así que
+ese frame cuesta lo mismo que cualquier otro.
+
+El hilo sólo crea objetos nuevos y lee las cachés; nunca las modifica. Usa
+su propia copia de las fuentes porque una fuente de SDL_ttf no se puede usar
+desde dos hilos a la vez.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import ORANGE, PURPLE
+from .render import Fonts, note_sprites, text_cache
+
+# Fracción del umbral de puntos a partir de la cual se prepara el nivel siguiente
+PREFETCH_AT = 0.75
+# Color de la explosión de partículas con que ``Game`` celebra la subida
+LEVEL_UP_COLOR = PURPLE
+
+
+def level_label(level_data):
+    return f"Nivel: {level_data['name']}"
+
+
+class LevelPrefetcher:
+    """Prepara en un hilo los recursos de un nivel y los instala al llegar a él."""
+    def __init__(self, background, sounds, particles, screen_size, fonts, scale=1.0):
+        self.background = background
+        self.sounds = sounds
+        self.particles = particles
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.jobs = {}
+        self.rescale(fonts, screen_size, scale)
+    
+    def rescale(self, fonts, screen_size, scale, level=0):
+        """Nueva resolución interna: lo preparado a la anterior ya no sirve.
+    
+        ``screen_size`` es el tamaño en píxeles del objetivo y ``level`` el
+        nivel en curso, que ``Game`` ya tiene horneado.
+        """
+        for job in self.jobs.values():
+            job.cancel()
+        self.jobs = {}
+        self.installed = set(range(level + 1))
+        self.screen_size = screen_size
+        # ``fonts`` son las del juego (claves de ``text_cache``); el hilo dibuja con las suyas
+        self.fonts = fonts
+        self.worker_fonts = Fonts(scale)
+    
+    def bake(self, level_data):
+        # Corre en el hilo: todo lo que devuelve es nuevo
+        gradient = None
+        if tuple(level_data['bg_color']) not in self.background.gradients:
+            gradient = self.background.bake_gradient(tuple(level_data['bg_color']), self.screen_size)
+        label = self.worker_fonts.small_font.render(level_label(level_data), True, ORANGE)
+        return {
+            'gradient': gradient,
+            'sprites': note_sprites.bake_missing(level_data['figures'], self.worker_fonts.tiny_font),
+            'label': label,
+            'sounds': self.sounds.prepare(level_data['figures']),
+            'particles': self.particles.bake_color(LEVEL_UP_COLOR),
+        }
+    
+    def request(self, level, levels):
+        if level < len(levels) and level not in self.installed and level not in self.jobs:
+            self.jobs[level] = self.executor.submit(self.bake, levels[level])
+    
+    def update(self, sim):
+        """Encola el nivel siguiente si los puntos ya están cerca de su umbral."""
+        if sim.score >= PREFETCH_AT * sim.level_threshold():
+            self.request(sim.current_level + 1, sim.levels)
+    
+    def install(self, level, levels):
+        """Instala los recursos de ``level``; si el hilo no ha terminado, los espera."""
+        if level in self.installed:
+            return
+        self.request(level, levels)
+        assets = self.jobs.pop(level).result()
+        level_data = levels[level]
+        if assets['gradient'] is not None:
+            self.background.install_gradient(level_data['bg_color'], self.screen_size, assets['gradient'])
+        note_sprites.install(assets['sprites'])
+        text_cache.install(self.fonts.small_font, level_label(level_data), ORANGE, assets['label'])
+        self.sounds.install(assets['sounds'])
+        self.particles.install_color(LEVEL_UP_COLOR, assets['particles'])
+        self.installed.add(level)
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,204 @@
+"""Perfilador de frames: temporizadores por fase, contadores, overlay y traza.
+
+``profiler`` es la instancia única del juego. Apagado (lo normal), ``scope``
+devuelve un contexto vacío compartido y ``count`` sólo mira una bandera, así
+que la instrumentación puede quedarse en el código. Encendido acumula el
+tiempo de cada fase por frame, guarda un historial para el overlay (F3) y,
+con ``--trace``, eventos en formato Chrome trace (``chrome://tracing`` o
+Perfetto).
+"""
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import pygame
+
+from .config import GREEN, RED, WHITE, WIDTH, YELLOW
+
+_NULL_SCOPE = nullcontext()
+
+
+class _Scope:
+    __slots__ = ('profiler', 'name', 'start')
+    
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler.add_time(self.name, self.start, end)
+        return False
+
+
+class FrameProfiler:
+    """Tiempos por fase y contadores de cada frame, con historial circular."""
+    HISTORY = 240
+    MAX_TRACE_EVENTS = 1_000_000
+    
+    def __init__(self):
+        self.enabled = False
+        self.overlay = False
+        self.tracing = False
+        self.origin = time.perf_counter()
+        self.trace = []
+        self.trace_dropped = 0
+        self.frame_start = None
+        self.frame_times = deque(maxlen=self.HISTORY)
+        self.phases = {}
+        self.phase_history = {}
+        self.counters = {}
+        self.last_counters = {}
+        self.gauges = {}
+        self.frames = 0
+    
+    def enable(self, overlay=None, trace=None):
+        self.enabled = True
+        if overlay is not None:
+            self.overlay = overlay
+        if trace is not None:
+            self.tracing = trace
+    
+    def toggle_overlay(self):
+        # F3: muestra el overlay y enciende la medición mientras se ve
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.tracing
+    
+    # === MEDICIÓN ===
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+    
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+    
+    def gauge(self, name, value):
+        if self.enabled:
+            self.gauges[name] = value
+    
+    def add_time(self, name, start, end):
+        self.phases[name] = self.phases.get(name, 0.0) + (end - start)
+        if self.tracing:
+            self._trace({'name': name, 'ph': 'X', 'ts': (start - self.origin) * 1e6,
+                         'dur': (end - start) * 1e6, 'pid': 0, 'tid': 0})
+    
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+    
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        end = time.perf_counter()
+        self.frame_times.append(end - self.frame_start)
+        for name in self.phase_history.keys() | self.phases.keys():
+            history = self.phase_history.get(name)
+            if history is None:
+                history = self.phase_history[name] = deque(maxlen=self.HISTORY)
+            history.append(self.phases.get(name, 0.0))
+        if self.tracing:
+            self._trace({'name': 'frame', 'ph': 'X', 'ts': (self.frame_start - self.origin) * 1e6,
+                         'dur': (end - self.frame_start) * 1e6, 'pid': 0, 'tid': 0})
+            if self.counters or self.gauges:
+                self._trace({'name': 'counters', 'ph': 'C', 'ts': (end - self.origin) * 1e6,
+                             'pid': 0, 'args': {**self.gauges, **self.counters}})
+        self.frames += 1
+        self.last_counters = self.counters
+        self.phases = {}
+        self.counters = {}
+        self.frame_start = None
+    
+    # === TRAZA ===
+    def _trace(self, event):
+        if len(self.trace) < self.MAX_TRACE_EVENTS:
+            self.trace.append(event)
+        else:
+            self.trace_dropped += 1
+    
+    def write_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': self.trace_dropped}}, f)
+    
+    # === OVERLAY ===
+    def averages(self):
+        """Media en ms de cada fase sobre el historial, de mayor a menor."""
+        rows = [(name, 1000 * sum(history) / len(history))
+                for name, history in self.phase_history.items() if history]
+        return sorted(rows, key=lambda row: -row[1])
+
+
+profiler = FrameProfiler()
+
+
+OVERLAY_RECT = pygame.Rect(WIDTH - 310, 128, 300, 185)
+GRAPH_HEIGHT = 60
+BUDGET = 1 / 60
+TEXT_REFRESH = 15
+_overlay = {}
+
+
+def _overlay_assets(size):
+    # Panel y fuente del overlay, creados al primer uso
+    if not _overlay:
+        panel = pygame.Surface(size, pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        _overlay['panel'] = panel
+        _overlay['font'] = pygame.font.Font(None, 18)
+        _overlay['lines'] = []
+        _overlay['frame'] = -TEXT_REFRESH
+    return _overlay['panel'], _overlay['font']
+
+
+def overlay_lines():
+    times = profiler.frame_times
+    lines = []
+    if times:
+        lines.append(f"frame {1000 * sum(times) / len(times):5.2f} ms  max {1000 * max(times):5.2f} ms")
+    for name, ms in profiler.averages()[:6]:
+        lines.append(f"{name:14} {ms:6.2f} ms")
+    counters = sorted({**profiler.gauges, **profiler.last_counters}.items())
+    for i in range(0, len(counters), 2):
+        lines.append('   '.join(f"{name} {value}" for name, value in counters[i:i + 2]))
+    return lines
+
+
+def draw_overlay(surface, topleft=None):
+    """Gráfico de tiempos de frame, fases más costosas y contadores.
+    
+    Se dibuja en píxeles de ``surface`` (una capa con la resolución de la
+    ventana, sin escalar), con la esquina en ``topleft`` o en la de
+    ``OVERLAY_RECT``.
+    """
+    rect = OVERLAY_RECT if topleft is None else pygame.Rect(topleft, OVERLAY_RECT.size)
+    panel, font = _overlay_assets(rect.size)
+    surface.blit(panel, rect.topleft)
+    
+    # Barras de los últimos frames; la línea marca el presupuesto de 60 fps
+    times = profiler.frame_times
+    graph_top = rect.top + 8
+    scale = GRAPH_HEIGHT / (2 * BUDGET)
+    x = rect.right - 8 - len(times)
+    for frame_time in times:
+        h = min(int(frame_time * scale), GRAPH_HEIGHT)
+        color = GREEN if frame_time < BUDGET * 0.5 else YELLOW if frame_time < BUDGET else RED
+        pygame.draw.line(surface, color, (x, graph_top + GRAPH_HEIGHT), (x, graph_top + GRAPH_HEIGHT - h))
+        x += 1
+    budget_y = graph_top + GRAPH_HEIGHT - int(BUDGET * scale)
+    pygame.draw.line(surface, WHITE, (rect.left + 8, budget_y), (rect.right - 8, budget_y))
+    
+    # El texto se vuelve a rasterizar sólo cada TEXT_REFRESH frames
+    if profiler.frames - _overlay['frame'] >= TEXT_REFRESH:
+        _overlay['frame'] = profiler.frames
+        _overlay['lines'] = [font.render(line, True, WHITE) for line in overlay_lines()]
+    y = graph_top + GRAPH_HEIGHT + 6
+    for text in _overlay['lines']:
+        surface.blit(text, (rect.left + 8, y))
+        y += font.get_linesize()
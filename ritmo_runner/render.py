@@ -0,0 +1,590 @@
+"""Renderizado: pantalla y fuentes diferidas, cachés de sprites y texto, fondo.
+
+Las posiciones son lógicas (``WIDTH`` × ``HEIGHT``); fuentes y sprites se
+hornean a la escala de la resolución interna (``set_scale``) y se dibujan
+sobre un ``Canvas`` de ``viewport``.
+"""
+import math
+from collections import OrderedDict
+
+import pygame
+
+from .config import BLACK, BLUE, CAPTION, FIGURES, HEIGHT, LANE_COLORS, WHITE, WIDTH
+from .profiler import profiler
+from .viewport import Canvas, logical_rect, video
+
+
+# === INICIALIZACIÓN ===
+def init_display(size=(WIDTH, HEIGHT), vsync=False, fullscreen=False, gpu=False):
+    """Abre la ventana del juego; se llama sólo cuando hace falta dibujar.
+    
+    Con ``gpu`` (hay que escalar a la ventana) es una ventana de
+    ``pygame._sdl2.video`` sin superficie propia, que presenta
+    ``viewport.GpuViewport`` con un ``Renderer`` (que también hace el vsync).
+    Si no, o si pygame no trae ese módulo, es la de ``pygame.display``: con
+    ``vsync`` se abre ``SCALED`` (SDL sólo lo permite así) y a pantalla
+    completa se usa la resolución del escritorio.
+    """
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if gpu and video is not None:
+        return video.Window(CAPTION, size, fullscreen_desktop=fullscreen)
+    flags = pygame.FULLSCREEN if fullscreen else 0
+    if vsync:
+        screen = pygame.display.set_mode(size, pygame.SCALED | flags, vsync=1)
+    elif fullscreen:
+        screen = pygame.display.set_mode((0, 0), flags)
+    else:
+        screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(CAPTION)
+    return screen
+
+
+class Fonts:
+    """Las fuentes del juego a la escala ``scale``, cargadas una sola vez al primer uso."""
+    def __init__(self, scale=1.0):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        
+        def size(points):
+            return max(1, round(points * scale))
+    
+        # Fuentes mejoradas
+        try:
+            self.font = pygame.font.SysFont('arial', size(48), bold=True)
+            self.small_font = pygame.font.SysFont('arial', size(32))
+            self.tiny_font = pygame.font.SysFont('arial', size(24))
+            self.title_font = pygame.font.SysFont('arial', size(72), bold=True)
+        except Exception:
+            self.font = pygame.font.Font(None, size(48))
+            self.small_font = pygame.font.Font(None, size(32))
+            self.tiny_font = pygame.font.Font(None, size(24))
+            self.title_font = pygame.font.Font(None, size(72))
+
+
+# Fuentes por escala (cambiar de calidad y volver no las carga otra vez)
+_fonts = {}
+_scale = 1.0
+
+
+def get_fonts():
+    fonts = _fonts.get(_scale)
+    if fonts is None:
+        fonts = _fonts[_scale] = Fonts(_scale)
+    return fonts
+
+
+def set_scale(scale):
+    """Cambia la escala de la resolución interna: fuentes y sprites se hornean de nuevo."""
+    global _scale
+    if scale == _scale:
+        return
+    _scale = scale
+    text_cache.clear()
+    note_sprites.set_scale(scale)
+    lane_sprites.set_scale(scale)
+    player_sprites.set_scale(scale)
+
+
+# === CACHÉ DE RENDERIZADO ===
+class TextCache:
+    """Textos rasterizados reutilizables.
+    
+    Las etiquetas completas se memorizan con desalojo LRU; los valores que
+    cambian a menudo (puntos, combo, porcentajes) se componen con glifos
+    sueltos que se rasterizan una única vez por (fuente, carácter, color).
+    """
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.labels = OrderedDict()
+        self.glyphs = {}
+    
+    def clear(self):
+        self.labels.clear()
+        self.glyphs.clear()
+    
+    def render(self, text_font, text, color):
+        key = (id(text_font), text, color)
+        surf = self.labels.get(key)
+        if surf is not None:
+            self.labels.move_to_end(key)
+            return surf
+        surf = text_font.render(text, True, color)
+        profiler.count('fonts')
+        self.labels[key] = surf
+        if len(self.labels) > self.capacity:
+            self.labels.popitem(last=False)
+        return surf
+    
+    def install(self, text_font, text, color, surf):
+        """Guarda un texto rasterizado en otra parte (p. ej. con otra copia de la fuente)."""
+        self.labels[(id(text_font), text, color)] = surf
+        if len(self.labels) > self.capacity:
+            self.labels.popitem(last=False)
+    
+    def glyph(self, text_font, char, color):
+        key = (id(text_font), char, color)
+        surf = self.glyphs.get(key)
+        if surf is None:
+            surf = text_font.render(char, True, color)
+            profiler.count('fonts')
+            self.glyphs[key] = surf
+        return surf
+    
+    def draw_glyphs(self, canvas, text_font, text, color, pos):
+        """Compone ``text`` glifo a glifo en ``pos``; devuelve el ancho lógico."""
+        surface = canvas.surface
+        x, y = start, _ = canvas.point(pos)
+        for char in text:
+            surf = self.glyph(text_font, char, color)
+            surface.blit(surf, (x, y))
+            x += surf.get_width()
+        return (x - start) / canvas.scale
+
+
+class NoteSpriteCache:
+    """Sprites de nota (sombra, círculo, borde y etiqueta) por figura y tamaño de pulso."""
+    PULSE_STEPS = 4
+    
+    def __init__(self):
+        self.sprites = {}
+        self.scale = 1.0
+    
+    def set_scale(self, scale):
+        self.scale = scale
+        self.sprites.clear()
+    
+    def bake(self, note_type, pulse_step, font=None):
+        s = self.scale
+        size = (40 + 3 * pulse_step / (self.PULSE_STEPS - 1)) * s
+        radius = int(size/2)
+        center = radius + round(2 * s)
+        side = 2 * center + round(6 * s)
+        sprite = pygame.Surface((side, side), pygame.SRCALPHA)
+        profiler.count('surfaces')
+        
+        # Sombra
+        shadow = round(5 * s)
+        pygame.draw.circle(sprite, (0, 0, 0, 100), (center + shadow, center + shadow), radius)
+        
+        # Nota principal
+        pygame.draw.circle(sprite, FIGURES[note_type]['color'], (center, center), radius)
+        pygame.draw.circle(sprite, WHITE, (center, center), radius, max(1, round(3 * s)))
+        
+        # Letra del tipo
+        text = (font or get_fonts().tiny_font).render(FIGURES[note_type]['name'][:3], True, BLACK)
+        profiler.count('fonts')
+        sprite.blit(text, text.get_rect(center=(center, center)))
+        return sprite, center
+    
+    def get(self, note_type, pulse):
+        step = round(abs(math.sin(pulse)) * (self.PULSE_STEPS - 1))
+        key = (note_type, step)
+        entry = self.sprites.get(key)
+        if entry is None:
+            entry = self.bake(note_type, step)
+            self.sprites[key] = entry
+        return entry
+    
+    def bake_missing(self, figures, font=None):
+        """Sprites que faltan para ``figures``, sin guardarlos (se puede llamar desde otro hilo)."""
+        return {(note_type, step): self.bake(note_type, step, font)
+                for note_type in figures for step in range(self.PULSE_STEPS)
+                if (note_type, step) not in self.sprites}
+    
+    def install(self, sprites):
+        for key, entry in sprites.items():
+            self.sprites.setdefault(key, entry)
+    
+    def prebake(self, figures):
+        self.sprites.update(self.bake_missing(figures))
+
+
+class LaneSprites:
+    """Línea y zona de golpe de cada carril, por nivel de brillo (LRU)."""
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.sprites = OrderedDict()
+        self.scale = 1.0
+    
+    def set_scale(self, scale):
+        self.scale = scale
+        self.sprites.clear()
+    
+    def _lookup(self, key, bake):
+        surf = self.sprites.get(key)
+        if surf is not None:
+            self.sprites.move_to_end(key)
+            return surf
+        surf = bake()
+        profiler.count('surfaces')
+        self.sprites[key] = surf
+        if len(self.sprites) > self.capacity:
+            self.sprites.popitem(last=False)
+        return surf
+    
+    def line(self, lane, alpha, width=WIDTH):
+        def bake():
+            surf = pygame.Surface((round(width * self.scale), max(1, round(4 * self.scale))), pygame.SRCALPHA)
+            surf.fill((*LANE_COLORS[lane], alpha))
+            return surf
+        return self._lookup(('line', lane, alpha, width), bake)
+    
+    def hit_zone(self, lane, alpha):
+        def bake():
+            surf = pygame.Surface((round(80 * self.scale), round(60 * self.scale)), pygame.SRCALPHA)
+            canvas = Canvas(surf, self.scale, (80, 60))
+            canvas.rect((*LANE_COLORS[lane], alpha), (0, 0, 80, 60), border_radius=10)
+            canvas.rect(WHITE, (0, 0, 80, 60), 3, border_radius=10)
+            return surf
+        return self._lookup(('zone', lane, alpha), bake)
+
+
+text_cache = TextCache()
+note_sprites = NoteSpriteCache()
+lane_sprites = LaneSprites()
+
+
+def lerp(a, b, alpha):
+    return a + (b - a) * alpha
+
+
+def note_pulse(note, t):
+    # Fase de la animación de la nota en el tiempo de canción ``t``
+    return (t - note.time) * 5
+
+
+def draw_note(canvas, note, x, lane_y, t):
+    """Dibuja ``note`` en ``x`` (ver ``Simulation.note_x``) en el tiempo ``t``."""
+    if note.hit or note.missed:
+        return
+    
+    sprite, center = note_sprites.get(note.type, note_pulse(note, t))
+    s = canvas.scale
+    canvas.surface.blit(sprite, (int(x * s) - center, int(lane_y * s) - center))
+
+
+def note_bounds(note, x, lane_y, t):
+    sprite, center = note_sprites.get(note.type, note_pulse(note, t))
+    s = note_sprites.scale
+    return logical_rect((int(x * s) - center, int(lane_y * s) - center, sprite.get_width(), sprite.get_height()), s)
+
+
+# === DIBUJO DEL JUGADOR ===
+def player_bounds(player, alpha=1.0):
+    """Rectángulo que cubre todo lo que ``draw_player`` puede pintar."""
+    scale = max(player.scale, player.prev_scale)
+    half = int(23 * scale) + 3
+    top = int(player.y - 30 - 5 - 15 * scale) - 2
+    bottom = int(player.y + 25 + 10 + 8) + 4
+    return pygame.Rect(int(player.x) - half, top, 2 * half, bottom - top)
+
+
+def draw_player_shapes(surface, x, y, frame, scale, zoom=1.0):
+    """Primitivas del jugador con los pies en ``(x, y)``, en la pose ``frame`` y ``scale``.
+    
+    ``zoom`` es la escala de la resolución interna: ``(x, y)`` ya están en
+    píxeles y todas las medidas se multiplican por ella.
+    """
+    z = zoom
+    
+    def width(value):
+        return max(1, round(value * z))
+    
+    # Animación de caminar
+    bob = math.sin(frame) * 5
+    
+    # Sombra (sobre la pantalla, sin canal alfa, siempre se ha visto negra)
+    pygame.draw.ellipse(surface, BLACK, 
+                      (x - 20*z, y + 20*z, 40*z, 10*z))
+    
+    # Cabeza
+    head_y = y - 30*z + bob*z
+    pygame.draw.circle(surface, (255, 200, 150), 
+                     (int(x), int(head_y)), int(15 * scale * z))
+    pygame.draw.circle(surface, BLACK, 
+                     (int(x), int(head_y)), int(15 * scale * z), width(2))
+    
+    # Ojos
+    eye_offset = int(5 * scale * z)
+    pygame.draw.circle(surface, BLACK, 
+                     (int(x - eye_offset), int(head_y - 2*z)), width(3))
+    pygame.draw.circle(surface, BLACK, 
+                     (int(x + eye_offset), int(head_y - 2*z)), width(3))
+    
+    # Sonrisa
+    pygame.draw.arc(surface, BLACK, 
+                   (int(x - 8*scale*z), int(head_y - 5*z), int(16*scale*z), int(12*scale*z)),
+                   3.14, 6.28, width(2))
+    
+    # Cuerpo
+    body_rect = pygame.Rect(int(x - 10*scale*z), int(y - 15*z + bob*z), 
+                           int(20*scale*z), int(25*scale*z))
+    pygame.draw.rect(surface, BLUE, body_rect, border_radius=width(5))
+    
+    # Brazos
+    arm_wave = math.sin(frame * 2) * 10
+    pygame.draw.line(surface, (255, 200, 150), 
+                    (int(x - 10*scale*z), int(y - 5*z + bob*z)),
+                    (int(x - 20*scale*z), int(y + 5*z + bob*z + arm_wave*z)), width(5))
+    pygame.draw.line(surface, (255, 200, 150), 
+                    (int(x + 10*scale*z), int(y - 5*z + bob*z)),
+                    (int(x + 20*scale*z), int(y + 5*z + bob*z - arm_wave*z)), width(5))
+    
+    # Piernas
+    leg_offset = math.sin(frame * 2) * 8
+    pygame.draw.line(surface, BLACK, 
+                    (int(x - 5*scale*z), int(y + 10*z + bob*z)),
+                    (int(x - 8*scale*z), int(y + 25*z + leg_offset*z)), width(6))
+    pygame.draw.line(surface, BLACK, 
+                    (int(x + 5*scale*z), int(y + 10*z + bob*z)),
+                    (int(x + 8*scale*z), int(y + 25*z - leg_offset*z)), width(6))
+
+
+class PlayerSprites:
+    """Hoja de sprites del jugador: fase del paso × escala del salto, cuantizadas.
+    
+    La pose se repite cada ``2π`` de ``Player.frame`` y la escala va de 1 a 1.3
+    (``jump_animation``). Las celdas se apilan en vertical en una sola
+    superficie, cada una contigua en memoria (en una hoja ancha cada blit
+    saltaría de página en cada línea); se hornean con ``draw_player_shapes``
+    la primera vez que se piden y dibujar al jugador es un único blit de la
+    celda más cercana. Con el ancla en un píxel entero la celda es idéntica
+    a dibujar las primitivas en pantalla. Todos sus colores son opacos, así
+    que basta un color clave para el fondo (se copia más rápido que el alfa
+    por píxel). Las celdas se hornean a la escala de la resolución interna
+    (``zoom``); cambiarla descarta la hoja.
+    """
+    PHASES = 48
+    SCALE_MIN = 1.0
+    SCALE_MAX = 1.3
+    SCALE_STEP = 0.05
+    COLORKEY = (255, 0, 255)
+    # Ancla (pies) dentro de la celda y tamaño de la celda, para la escala máxima
+    HALF = int(23 * SCALE_MAX) + 3
+    TOP = int(35 + 15 * SCALE_MAX) + 2
+    BOTTOM = 25 + 10 + 8 + 4
+    
+    def __init__(self):
+        self.sheet = None
+        self.baked = set()
+        self.steps = round((self.SCALE_MAX - self.SCALE_MIN) / self.SCALE_STEP)
+        self.set_scale(1.0)
+    
+    def set_scale(self, zoom):
+        self.zoom = zoom
+        self.half = math.ceil(self.HALF * zoom)
+        self.top = math.ceil(self.TOP * zoom)
+        self.bottom = math.ceil(self.BOTTOM * zoom)
+        self.sheet = None
+        self.baked.clear()
+    
+    def key(self, frame, scale):
+        phase = round(frame % math.tau / math.tau * self.PHASES) % self.PHASES
+        scale = min(max(scale, self.SCALE_MIN), self.SCALE_MAX)
+        return phase, round((scale - self.SCALE_MIN) / self.SCALE_STEP)
+    
+    def cell(self, phase, step):
+        """``(hoja, área)`` de una pose, horneándola si hace falta."""
+        width, height = 2 * self.half, self.top + self.bottom
+        sheet = self.sheet
+        if sheet is None:
+            # Mismo formato que el objetivo interno, también una ``Surface`` sin alfa
+            sheet = pygame.Surface((width, height * self.PHASES * (self.steps + 1)))
+            sheet.fill(self.COLORKEY)
+            sheet.set_colorkey(self.COLORKEY)
+            profiler.count('surfaces')
+            self.sheet = sheet
+        area = pygame.Rect(0, (step * self.PHASES + phase) * height, width, height)
+        if (phase, step) not in self.baked:
+            sheet.set_clip(area)
+            draw_player_shapes(sheet, area.x + self.half, area.y + self.top, math.tau * phase / self.PHASES,
+                               self.SCALE_MIN + step * self.SCALE_STEP, self.zoom)
+            sheet.set_clip(None)
+            self.baked.add((phase, step))
+        return sheet, area
+    
+    def draw(self, canvas, x, y, frame, scale):
+        sheet, area = self.cell(*self.key(frame, scale))
+        z = self.zoom
+        canvas.surface.blit(sheet, (int(x * z) - self.half, int(y * z) - self.top), area)
+
+
+player_sprites = PlayerSprites()
+
+
+def draw_player(canvas, player, alpha=1.0):
+    frame = lerp(player.prev_frame, player.frame, alpha)
+    scale = lerp(player.prev_scale, player.scale, alpha)
+    player_sprites.draw(canvas, player.x, player.y, frame, scale)
+
+
+# === FONDO EN CACHÉ ===
+class BackgroundRenderer:
+    """Fondo por capas: gradiente horneado por nivel y capa de nubes en mosaico.
+    
+    El gradiente se calcula una sola vez por (bg_color, tamaño) y las nubes se
+    pre-renderizan en una franja que se desplaza con ``scroll_x``, así que cada
+    frame cuesta un blit del cielo y dos de la franja de nubes. El degradado
+    se hornea al tamaño en píxeles del objetivo y las nubes a ``scale``; la
+    geometría (``cloud_rects``) es lógica.
+    """
+    CLOUD_COUNT = 5
+    CLOUD_MARGIN = 100
+    
+    def __init__(self):
+        self.size = None
+        self.scale = 1.0
+        self.gradients = {}
+        self.cloud_tile = None
+        self.cloud_top = 0
+        self.cloud_period = 0
+    
+    def set_scale(self, scale):
+        self.scale = scale
+        self.size = None
+        self.gradients.clear()
+        self.cloud_tile = None
+    
+    def _check_size(self, size):
+        # Un cambio de tamaño invalida todas las capas
+        if size != self.size:
+            self.size = size
+            self.gradients.clear()
+            self.cloud_tile = None
+    
+    def bake_gradient(self, bg_color, size):
+        width, height = size
+        column = pygame.Surface((1, height))
+        profiler.count('surfaces')
+        for y in range(height):
+            ratio = y / height
+            r = int(bg_color[0] * (1 - ratio) + 30 * ratio)
+            g = int(bg_color[1] * (1 - ratio) + 30 * ratio)
+            b = int(bg_color[2] * (1 - ratio) + 50 * ratio)
+            column.set_at((0, y), (r, g, b))
+        return pygame.transform.scale(column, (width, height))
+    
+    def bake_clouds(self, size):
+        """Franja de nubes para una pantalla lógica de ``size``."""
+        width = size[0]
+        margin = self.CLOUD_MARGIN
+        self.cloud_period = width + 200
+        self.cloud_top = 80 - 50
+        band_height = 80 + (self.CLOUD_COUNT - 1) * 40 + 50 - self.cloud_top
+        
+        def px(value):
+            return round(value * self.scale)
+    
+        # Franja con margen a ambos lados para las nubes que asoman del borde
+        tile = pygame.Surface((px(self.cloud_period + 2 * margin), px(band_height)))
+        profiler.count('surfaces')
+        tile.fill(BLACK)
+        tile.set_colorkey(BLACK, pygame.RLEACCEL)
+        for i in range(self.CLOUD_COUNT):
+            x = margin + i * 300
+            y = 80 + i * 40 - self.cloud_top
+            pygame.draw.circle(tile, WHITE, (px(x), px(y)), px(40))
+            pygame.draw.circle(tile, WHITE, (px(x + 30), px(y)), px(50))
+            pygame.draw.circle(tile, WHITE, (px(x + 60), px(y)), px(35))
+        self.cloud_tile = tile
+    
+    def gradient_for(self, bg_color, size):
+        self._check_size(size)
+        key = tuple(bg_color)
+        gradient = self.gradients.get(key)
+        if gradient is None:
+            gradient = self.bake_gradient(key, size)
+            self.gradients[key] = gradient
+        return gradient
+    
+    def install_gradient(self, bg_color, size, gradient):
+        """Añade un degradado horneado fuera (ver ``prefetch``) si sigue valiendo el tamaño."""
+        self._check_size(size)
+        if gradient.get_size() == size:
+            self.gradients.setdefault(tuple(bg_color), gradient)
+    
+    def prebake(self, levels, canvas):
+        for level_data in levels:
+            self.gradient_for(level_data['bg_color'], canvas.surface.get_size())
+        if self.cloud_tile is None:
+            self.bake_clouds(canvas.get_size())
+    
+    def cloud_rects(self, size, scroll_x):
+        """Rectángulos de pantalla que ocupan las nubes con este desplazamiento."""
+        if self.cloud_tile is None:
+            self.bake_clouds(size)
+        shift = int((scroll_x * 0.3) % self.cloud_period) - 100
+        # A otra escala el redondeo puede mover las nubes un par de píxeles
+        pad = 0 if self.scale == 1 else math.ceil(Canvas.MARGIN / self.scale)
+        rects = []
+        for copy in (shift, shift - self.cloud_period):
+            for i in range(self.CLOUD_COUNT):
+                x = copy + i * 300
+                y = 80 + i * 40
+                rect = pygame.Rect(x - 40 - pad, y - 50 - pad, 135 + 2 * pad, 100 + 2 * pad)
+                if rect.right > 0 and rect.left < size[0]:
+                    rects.append(rect)
+        return rects
+    
+    def draw(self, canvas, bg_color, scroll_x):
+        surface = canvas.surface
+        surface.blit(self.gradient_for(bg_color, surface.get_size()), (0, 0))
+        
+        if self.cloud_tile is None:
+            self.bake_clouds(canvas.get_size())
+        # Dos copias de la franja cubren el desplazamiento circular
+        shift = int((scroll_x * 0.3) % self.cloud_period) - 100 - self.CLOUD_MARGIN
+        canvas.blit(self.cloud_tile, (shift, self.cloud_top))
+        canvas.blit(self.cloud_tile, (shift - self.cloud_period, self.cloud_top))
+
+
+# === RECTÁNGULOS SUCIOS ===
+class DirtyRects:
+    """Regiones de pantalla a repintar y presentar en el próximo frame.
+    
+    Cada frame se marcan los rectángulos que ocupa el contenido que cambia;
+    se repintan esos y los del frame anterior (para borrar lo que se movió).
+    Si la zona sucia es demasiado grande conviene repintar todo.
+    """
+    FULL_RATIO = 0.6
+    MAX_RECTS = 48
+    
+    def __init__(self, size):
+        self.bounds = pygame.Rect((0, 0), size)
+        self.previous = []
+        self.current = []
+        self.full = True
+    
+    def invalidate(self):
+        self.full = True
+    
+    def mark(self, rect):
+        rect = self.bounds.clip(rect)
+        if rect.width and rect.height:
+            self.current.append(rect)
+    
+    def collect(self):
+        """Devuelve los rectángulos a repintar y empieza el frame siguiente."""
+        full, rects = self.full, self.previous + self.current
+        self.previous, self.current, self.full = self.current, [], False
+        if full:
+            return [self.bounds.copy()]
+        rects = merge_rects(rects)
+        area = sum(rect.width * rect.height for rect in rects)
+        if len(rects) > self.MAX_RECTS or area > self.FULL_RATIO * self.bounds.width * self.bounds.height:
+            return [self.bounds.copy()]
+        return rects
+
+
+def merge_rects(rects):
+    """Une los rectángulos que se solapan para no repintar dos veces la misma zona."""
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
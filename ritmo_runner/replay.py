@@ -0,0 +1,261 @@
+"""Repeticiones: grabación de partidas y verificación en paralelo.
+
+Una repetición guarda la semilla, el paso de simulación, la partitura (si la
+hubo), las subidas de nivel y cada pulsación con el paso en que se juzgó y
+su tiempo de canción, más el resultado declarado. Como la simulación es
+determinista, volver a simularla sin ventana reproduce la partida exacta y
+permite comprobar puntuaciones o depurar juicios de ``check_hit``.
+
+Uso::
+
+    python -m ritmo_runner.replay verify partidas/*.rrp --jobs 8
+    python -m ritmo_runner.replay info partida.rrp
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from .simulation import SIM_STEP, Simulation
+
+MAGIC = b'RRRP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHqdIIIQI4IH')
+LEVEL_RECORD = struct.Struct('<IB')
+INPUT_RECORD = struct.Struct('<IBd')
+STAT_NAMES = ('perfect', 'good', 'ok', 'miss')
+SUFFIX = '.rrp'
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def default_replay_dir():
+    base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'ritmo_runner', 'replays')
+
+
+# === FORMATO ===
+class Replay:
+    """Una partida grabada: entradas por paso y resultado declarado."""
+    def __init__(self, seed, dt=SIM_STEP, chart=None, steps=0, inputs=None, levels=None,
+                 score=0, max_combo=0, stats=None):
+        self.seed = seed
+        self.dt = dt
+        self.chart = chart
+        self.steps = steps
+        # (paso, carril, tiempo de canción), en el orden en que se juzgaron
+        self.inputs = inputs if inputs is not None else []
+        # (paso, nivel) de cada subida de nivel
+        self.levels = levels if levels is not None else []
+        self.score = score
+        self.max_combo = max_combo
+        self.stats = dict(stats) if stats is not None else dict.fromkeys(STAT_NAMES, 0)
+    
+    def to_bytes(self):
+        chart = (self.chart or '').encode('utf-8')
+        header = HEADER.pack(MAGIC, VERSION, 0, self.seed, self.dt, self.steps,
+                             len(self.inputs), len(self.levels), self.score, self.max_combo,
+                             *(self.stats[name] for name in STAT_NAMES), len(chart))
+        body = b''.join([
+            b''.join(LEVEL_RECORD.pack(step, level) for step, level in self.levels),
+            b''.join(INPUT_RECORD.pack(step, lane, t) for step, lane, t in self.inputs),
+        ])
+        return header + chart + zlib.compress(body, 9)
+    
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ReplayError("archivo demasiado corto")
+        (magic, version, _flags, seed, dt, steps, n_inputs, n_levels, score, max_combo,
+         *stats, chart_len) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("no es una repetición")
+        if version != VERSION:
+            raise ReplayError(f"versión {version} no soportada")
+        offset = HEADER.size
+        chart = data[offset:offset + chart_len].decode('utf-8') or None
+        try:
+            body = zlib.decompress(data[offset + chart_len:])
+        except zlib.error as exc:
+            raise ReplayError(f"datos dañados: {exc}") from None
+        levels_size = n_levels * LEVEL_RECORD.size
+        if len(body) != levels_size + n_inputs * INPUT_RECORD.size:
+            raise ReplayError("datos truncados")
+        levels = list(LEVEL_RECORD.iter_unpack(body[:levels_size]))
+        inputs = list(INPUT_RECORD.iter_unpack(body[levels_size:]))
+        return cls(seed, dt, chart, steps, inputs, levels, score, max_combo,
+                   dict(zip(STAT_NAMES, stats)))
+    
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+    
+    # === RE-SIMULACIÓN ===
+    def simulate(self, chart_path=None):
+        """Vuelve a jugar la partida sin ventana y devuelve ``(sim, niveles)``."""
+        chart = None
+        if self.chart:
+            from .chart import load_chart
+            chart = load_chart(chart_path or self.chart)
+        sim = Simulation(self.seed, dt=self.dt, chart=chart)
+        levels = []
+        inputs = self.inputs
+        i, n = 0, len(inputs)
+        for step in range(self.steps):
+            presses = ()
+            if i < n and inputs[i][0] == step:
+                start = i
+                while i < n and inputs[i][0] == step:
+                    i += 1
+                presses = [(lane, t) for _step, lane, t in inputs[start:i]]
+            sim.step(presses)
+            if sim.events:
+                for event in sim.drain_events():
+                    if event[0] == 'level_up':
+                        levels.append((step, event[1]))
+        return sim, levels
+    
+    def verify(self, chart_path=None):
+        """Lista de discrepancias entre el resultado declarado y el re-simulado."""
+        sim, levels = self.simulate(chart_path)
+        mismatches = []
+        if sim.score != self.score:
+            mismatches.append(('score', self.score, sim.score))
+        if sim.max_combo != self.max_combo:
+            mismatches.append(('max_combo', self.max_combo, sim.max_combo))
+        for name in STAT_NAMES:
+            if sim.stats[name] != self.stats[name]:
+                mismatches.append((name, self.stats[name], sim.stats[name]))
+        if levels != self.levels:
+            mismatches.append(('levels', self.levels, levels))
+        return mismatches
+
+
+class ReplayRecorder:
+    """Graba lo que recibe una ``Simulation`` mientras se juega."""
+    def __init__(self, sim, chart=None):
+        self.sim = sim
+        self.replay = Replay(sim.seed, sim.dt, chart)
+    
+    def record(self, inputs):
+        # Llamar justo antes de ``sim.step(inputs)``
+        step = self.sim.frame
+        for lane, t in inputs:
+            self.replay.inputs.append((step, lane, t))
+    
+    def observe(self, events):
+        # Llamar con los eventos del paso recién simulado
+        for event in events:
+            if event[0] == 'level_up':
+                self.replay.levels.append((self.sim.frame - 1, event[1]))
+    
+    def finish(self):
+        replay, sim = self.replay, self.sim
+        replay.steps = sim.frame
+        replay.score = sim.score
+        replay.max_combo = sim.max_combo
+        replay.stats = dict(sim.stats)
+        return replay
+    
+    def save(self, directory=None):
+        replay = self.finish()
+        directory = directory or default_replay_dir()
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{replay.score}-{replay.seed % 0x10000:04x}{SUFFIX}"
+        path = os.path.join(directory, name)
+        replay.save(path)
+        return path
+
+
+# === VERIFICACIÓN ===
+def verify_file(path, chart_dir=None):
+    """Devuelve ``(ruta, discrepancias, error)``; pensado para correr en un proceso hijo."""
+    try:
+        replay = Replay.load(path)
+        chart_path = None
+        if replay.chart and chart_dir:
+            chart_path = os.path.join(chart_dir, os.path.basename(replay.chart))
+        return path, replay.verify(chart_path), None
+    except (OSError, ValueError) as exc:
+        return path, [], str(exc)
+
+
+def verify_many(paths, jobs=None, chart_dir=None):
+    """Verifica muchas repeticiones repartiéndolas entre ``jobs`` procesos."""
+    paths = list(paths)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < 2:
+        return [verify_file(path, chart_dir) for path in paths]
+    # Lotes grandes: cada tarea es corta y el envío entre procesos cuesta
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(verify_file, paths, [chart_dir] * len(paths), chunksize=chunksize))
+
+
+def expand_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(SUFFIX):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ritmo_runner.replay',
+                                     description="Repeticiones de Ritmo Runner")
+    commands = parser.add_subparsers(dest='command', required=True)
+    verify = commands.add_parser('verify', help="re-simular y comprobar resultados declarados")
+    verify.add_argument('paths', nargs='+', help="repeticiones (.rrp) o carpetas que las contienen")
+    verify.add_argument('--jobs', '-j', type=int, help="procesos en paralelo (por defecto, uno por núcleo)")
+    verify.add_argument('--charts', help="carpeta donde buscar las partituras de las repeticiones")
+    verify.add_argument('--quiet', '-q', action='store_true', help="mostrar sólo las que fallan")
+    info = commands.add_parser('info', help="mostrar el contenido de una repetición")
+    info.add_argument('path')
+    args = parser.parse_args(argv)
+    
+    if args.command == 'info':
+        try:
+            replay = Replay.load(args.path)
+        except (OSError, ReplayError) as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        print(f"semilla: {replay.seed}\npartitura: {replay.chart or '-'}\n"
+              f"duración: {replay.steps * replay.dt:.1f} s ({replay.steps} pasos)\n"
+              f"pulsaciones: {len(replay.inputs)}\nniveles: {replay.levels}\n"
+              f"puntos: {replay.score}  combo máximo: {replay.max_combo}  {replay.stats}")
+        return 0
+    
+    start = time.perf_counter()
+    results = verify_many(expand_paths(args.paths), args.jobs, args.charts)
+    failed = 0
+    for path, mismatches, error in results:
+        if error:
+            failed += 1
+            print(f"ERROR {path}: {error}")
+        elif mismatches:
+            failed += 1
+            detail = ', '.join(f"{name} declarado {claimed} real {actual}" for name, claimed, actual in mismatches)
+            print(f"FALLA {path}: {detail}")
+        elif not args.quiet:
+            print(f"ok    {path}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(results) - failed}/{len(results)} válidas en {elapsed:.2f} s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""Lógica de juego sin pantalla: notas, jugador, relojes y ``Simulation``.
+
+No depende de pygame ni de NumPy, así que importarlo es barato y sirve para
+pruebas, repeticiones y simulaciones por lotes.
+"""
+import random
+import time
+from collections import deque
+
+from .config import (
+    GOLD, GREEN, HEIGHT, HIT_WINDOW_GOOD, HIT_WINDOW_OK,
+    HIT_WINDOW_PERFECT, FIGURES, KEYS, LEVEL_POINTS, LEVELS, WIDTH, YELLOW,
+)
+from .tempo import TempoMap
+
+
+# === CLASE NOTA MEJORADA ===
+class Note:
+    # La posición no se guarda: sale de ``time`` al dibujar (``Simulation.note_x``)
+    __slots__ = ('type', 'lane', 'beat_time', 'time', 'duration', 'y', 'hit', 'missed', 'level', 'color')
+    
+    def __init__(self, note_type, lane, beat_time, level, time):
+        self.type = note_type
+        self.lane = lane
+        self.beat_time = beat_time
+        # Segundo de canción en que hay que tocarla (``beat_time`` por el mapa de tempo)
+        self.time = time
+        self.duration = FIGURES[note_type]['duration']
+        self.y = 0
+        self.hit = False
+        self.missed = False
+        self.level = level
+        self.color = FIGURES[note_type]['color']
+
+
+# === ÍNDICE DE NOTAS POR CARRIL ===
+class NoteStore:
+    """Notas activas más una cola por carril ordenada por ``time``.
+    
+    El juicio de un golpe sólo mira la cabeza de la cola de su carril (y las
+    notas siguientes que aún caen dentro de la ventana), y las notas falladas
+    se detectan sacando cabezas vencidas, así que el coste no crece con el
+    número de notas en cola. Las notas no se mueven paso a paso (su posición
+    sale del tiempo al dibujar): ``update`` sólo retira las que ya salieron.
+    """
+    def __init__(self, lanes=4):
+        self.active = deque()
+        self.lanes = [deque() for _ in range(lanes)]
+    
+    def __len__(self):
+        return len(self.active)
+    
+    def __iter__(self):
+        return iter(self.active)
+    
+    def pending(self):
+        return sum(len(queue) for queue in self.lanes)
+    
+    def add(self, note):
+        self.active.append(note)
+        queue = self.lanes[note.lane]
+        # Las notas llegan casi en orden: se inserta buscando desde el final
+        i = len(queue)
+        while i > 0 and queue[i - 1].time > note.time:
+            i -= 1
+        if i == len(queue):
+            queue.append(note)
+        else:
+            queue.insert(i, note)
+    
+    def judge(self, lane, current_time, window):
+        """Saca y devuelve ``(nota, diferencia)`` de la nota más cercana, o ``(None, inf)``."""
+        best_note = None
+        best_diff = float('inf')
+        for note in self.lanes[lane]:
+            offset = current_time - note.time
+            if offset <= -window:
+                break
+            diff = abs(offset)
+            if diff < best_diff and diff < window:
+                best_diff = diff
+                best_note = note
+        if best_note is not None:
+            queue = self.lanes[lane]
+            if queue[0] is best_note:
+                queue.popleft()
+            else:
+                queue.remove(best_note)
+        return best_note, best_diff
+    
+    def expire(self, current_time, window):
+        """Saca las notas cuya ventana de golpe ya pasó."""
+        expired = []
+        for queue in self.lanes:
+            while queue and current_time - queue[0].time > window:
+                expired.append(queue.popleft())
+        return expired
+    
+    def update(self, gone):
+        """Retira las notas con ``time <= gone``, que ya salieron por la izquierda."""
+        # Llegan en orden de tiempo: las que salen están al principio
+        active = self.active
+        while active and active[0].time <= gone:
+            active.popleft()
+
+
+# === CLASE JUGADOR ===
+class Player:
+    def __init__(self):
+        self.x = 150
+        self.y = HEIGHT - 180
+        self.frame = 0
+        self.scale = 1.0
+        self.target_scale = 1.0
+        self.prev_frame = self.frame
+        self.prev_scale = self.scale
+    
+    def update(self, dt):
+        # Estado anterior, para interpolar al dibujar entre dos pasos
+        self.prev_frame = self.frame
+        self.prev_scale = self.scale
+        self.frame += dt * 12
+        self.scale += (self.target_scale - self.scale) * 0.2
+    
+    def jump_animation(self):
+        self.target_scale = 1.3
+    
+    def reset_scale(self):
+        self.target_scale = 1.0
+
+
+# === SIMULACIÓN ===
+SIM_STEP = 1 / 60
+
+
+class WallClock:
+    """Reloj real monotónico."""
+    def now(self):
+        return time.perf_counter()
+
+
+class ManualClock:
+    """Reloj controlado a mano, para pruebas y simulaciones sin ventana."""
+    def __init__(self, start=0.0):
+        self.time = start
+    
+    def now(self):
+        return self.time
+    
+    def advance(self, dt):
+        self.time += dt
+
+
+class Simulation:
+    """Lógica de juego sin pantalla ni sonido.
+    
+    El tiempo avanza sólo con ``step``, en pasos fijos de ``dt`` segundos, y las
+    notas salen de un generador aleatorio con semilla (o de ``chart``, una
+    partitura con método ``feed``), así que la misma secuencia de entradas
+    reproduce siempre la misma partida. Los efectos que necesitan pantalla o
+    audio se publican en ``events`` para quien renderice, y cada juicio como
+    ``('judgment', tiempo, carril, figura, desfase, grado, combo)``,
+    con ``grado`` en ``'perfect'``, ``'good'``, ``'ok'`` o ``'miss'``.
+    
+    ``levels`` y ``level_points`` sustituyen a ``LEVELS`` y ``LEVEL_POINTS``
+    (por ejemplo, para probar otros ajustes de dificultad sin ventana).
+    
+    Los pulsos pasan a segundos con ``tempo`` (un ``TempoMap``): el de la
+    partitura si la hay y, si no, el tempo fijo de ``BPM``.
+    """
+    def __init__(self, seed=None, dt=SIM_STEP, chart=None, levels=None, level_points=LEVEL_POINTS):
+        self.seed = seed
+        self.chart = chart
+        self.tempo = chart.tempo if chart is not None else TempoMap()
+        # La canción sólo avanza: las conversiones usan un cursor
+        self.tempo_cursor = self.tempo.cursor()
+        self.levels = levels if levels is not None else LEVELS
+        self.level_points = level_points
+        self.finished = False
+        self.rng = random.Random(seed)
+        self.dt = dt
+        self.time = 0.0
+        self.frame = 0
+        self.score = 0
+        self.combo = 0
+        self.max_combo = 0
+        self.current_level = 0
+        self.notes = NoteStore(len(KEYS))
+        self.player = Player()
+        self.scroll_x = 0
+        self.prev_scroll_x = 0
+        self.beat_timer = 0
+        self.feedback_text = None
+        self.feedback_timer = 0
+        self.stats = {'perfect': 0, 'good': 0, 'ok': 0, 'miss': 0}
+        self.lane_flash = [0, 0, 0, 0]
+        self.events = []
+    
+    @property
+    def speed(self):
+        return self.levels[self.current_level]['speed']
+    
+    def lookahead(self):
+        """Segundos que tarda una nota en llegar del borde derecho a la zona de golpe."""
+        return (WIDTH + 100 - self.player.x) / self.speed
+    
+    def note_x(self, note, t=None):
+        """Posición de ``note`` en el tiempo ``t`` (por defecto, el actual).
+        
+        Llega a la zona de golpe justo en ``note.time``: se calcula desde el
+        tiempo y no sumando el avance de cada paso, así que sigue cuadrando
+        con el juicio aunque cambie la velocidad.
+        """
+        return self.player.x + self.speed * (note.time - (self.time if t is None else t))
+    
+    def drain_events(self):
+        events, self.events = self.events, []
+        return events
+    
+    def spawn_note(self):
+        level_data = self.levels[self.current_level]
+        fig = self.rng.choice(level_data['figures'])
+        lane = self.rng.randint(0, 3)
+        # Entra por la derecha hasta dos pulsos después de aparecer
+        entry_beat = self.tempo_cursor.beat(self.time + self.lookahead())
+        beat_time = entry_beat + self.rng.uniform(0, 2)
+        
+        note = Note(fig, lane, beat_time, self.current_level, self.tempo_cursor.time(beat_time))
+        self.notes.add(note)
+    
+    def check_hit(self, lane, press_time=None):
+        # Se juzga en el instante de la pulsación, no en el del paso
+        current_time = self.time if press_time is None else press_time
+        
+        # Encontrar nota más cercana en el carril
+        best_note, best_diff = self.notes.judge(lane, current_time, HIT_WINDOW_OK)
+        
+        if best_note:
+            best_note.hit = True
+            accuracy = 1 - (best_diff / HIT_WINDOW_OK)
+            
+            # Clasificar hit
+            if best_diff < HIT_WINDOW_PERFECT:
+                hit_type = 'PERFECT!'
+                grade = 'perfect'
+                color = GOLD
+                multiplier = 1.5
+            elif best_diff < HIT_WINDOW_GOOD:
+                hit_type = 'GOOD'
+                grade = 'good'
+                color = GREEN
+                multiplier = 1.2
+            else:
+                hit_type = 'OK'
+                grade = 'ok'
+                color = YELLOW
+                multiplier = 1.0
+            self.stats[grade] += 1
+            
+            # Puntuación
+            base_points = int(100 * accuracy)
+            combo_bonus = self.combo * 10
+            points = int((base_points + combo_bonus) * multiplier)
+            self.score += points
+            self.combo += 1
+            self.max_combo = max(self.max_combo, self.combo)
+            
+            # Feedback
+            self.feedback_text = f"{hit_type} +{points}"
+            self.feedback_timer = 1.0
+            
+            # Efectos
+            self.player.jump_animation()
+            self.lane_flash[lane] = 1.0
+            self.events.append(('hit', lane, best_note.type, color))
+            # Desfase con signo: positivo si la pulsación llegó tarde
+            offset = current_time - best_note.time
+            self.events.append(('judgment', current_time, lane, best_note.type, offset, grade, self.combo))
+            
+            # Streak particles
+            if self.combo > 0 and self.combo % 10 == 0:
+                self.events.append(('streak',))
+            
+            return True
+        
+        # Miss
+        self.combo = 0
+        self.feedback_text = "MISS"
+        self.feedback_timer = 0.5
+        self.events.append(('miss', lane))
+        self.events.append(('judgment', current_time, lane, None, None, 'miss', 0))
+        return False
+    
+    def step(self, inputs=()):
+        """Avanza un paso fijo.
+        
+        ``inputs`` son las pulsaciones de este paso, en orden: un carril, que se
+        juzga al final del paso, o ``(carril, tiempo)`` con el tiempo de canción
+        en que se pulsó la tecla.
+        """
+        dt = self.dt
+        self.time += dt
+        self.frame += 1
+        
+        for press in inputs:
+            if isinstance(press, tuple):
+                self.check_hit(*press)
+            else:
+                self.check_hit(press)
+        
+        # Scroll
+        self.prev_scroll_x = self.scroll_x
+        speed = self.levels[self.current_level]['speed']
+        self.scroll_x += speed * dt * 0.5
+        
+        # Player
+        self.player.update(dt)
+        self.player.reset_scale()
+        
+        # Spawn notes
+        if self.chart is not None:
+            self.chart.feed(self)
+        else:
+            self.beat_timer += dt
+            spawn_rate = self.levels[self.current_level]['spawn_rate']
+            if self.beat_timer > spawn_rate:
+                self.spawn_note()
+                self.beat_timer = 0
+        
+        # Notas que ya salieron por la izquierda (x <= -100)
+        self.notes.update(self.time - (self.player.x + 100) / speed)
+        
+        # Check misses
+        for note in self.notes.expire(self.time, HIT_WINDOW_OK):
+            note.missed = True
+            self.combo = 0
+            self.stats['miss'] += 1
+            self.events.append(('judgment', self.time, note.lane, note.type, None, 'miss', 0))
+        
+        # Lane flash decay
+        for i in range(4):
+            self.lane_flash[i] *= 0.9
+        
+        # Feedback timer
+        if self.feedback_timer > 0:
+            self.feedback_timer -= dt
+        
+        # Level up
+        if self.score > self.level_threshold() and self.current_level < len(self.levels) - 1:
+            self.current_level += 1
+            self.events.append(('level_up', self.current_level))
+        
+        # Fin de la partitura
+        if self.chart is not None and not self.finished and self.chart.done and not self.notes.pending():
+            self.finished = True
+            self.events.append(('finished',))
+    
+    def level_threshold(self):
+        """Puntos a superar para pasar al siguiente nivel."""
+        return self.level_points * (self.current_level + 1)
+    
+    def run(self, duration, inputs=None):
+        """Simula ``duration`` segundos; ``inputs(sim)`` devuelve los carriles de cada paso."""
+        steps = int(round(duration / self.dt))
+        for _ in range(steps):
+            self.step(inputs(self) if inputs else ())
+        return self
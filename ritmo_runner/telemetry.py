@@ -0,0 +1,301 @@
+"""Telemetría de sesión: cada juicio a un archivo columnar, y su análisis.
+
+Durante la partida los juicios de ``check_hit`` (tiempo, carril, figura,
+desfase con signo, nota y combo) se copian a un búfer circular preasignado;
+un hilo en segundo plano vuelca los tramos llenos a disco sin frenar el
+bucle de frames. El archivo (``.rrt``) es una cabecera seguida de bloques, y
+cada bloque guarda sus columnas contiguas, así que leer miles de sesiones
+es concatenar arreglos.
+
+Uso::
+
+    python -m ritmo_runner.telemetry ~/.local/share/ritmo_runner/telemetry
+    python -m ritmo_runner.telemetry sesiones/ --player ana --json
+"""
+import argparse
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .config import FIGURES, HIT_WINDOW_OK
+
+MAGIC = b'RRTL'
+VERSION = 1
+HEADER = struct.Struct('<4sHHdq32s')
+BLOCK = struct.Struct('<I')
+RECORD = np.dtype([
+    ('time', '<f8'),
+    ('offset', '<f4'),
+    ('combo', '<u4'),
+    ('lane', 'u1'),
+    ('figure', 'u1'),
+    ('grade', 'u1'),
+])
+FIGURE_CODES = list(FIGURES)
+NO_FIGURE = 255
+GRADES = ('perfect', 'good', 'ok', 'miss')
+SUFFIX = '.rrt'
+
+
+def default_telemetry_dir():
+    base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'ritmo_runner', 'telemetry')
+
+
+# === ESCRITURA ===
+class TelemetryWriter:
+    """Búfer circular de juicios con volcado asíncrono a un archivo columnar.
+    
+    ``record`` nunca bloquea: si el hilo escritor se atrasa tanto que el búfer
+    se llena, el juicio se descarta y se cuenta en ``dropped``.
+    """
+    def __init__(self, path, seed=0, player='', capacity=8192, batch=512):
+        self.path = path
+        self.capacity = capacity
+        self.batch = batch
+        self.ring = np.zeros(capacity, dtype=RECORD)
+        # Contadores crecientes: escritos por el juego, enviados y ya en disco
+        self.written = 0
+        self.submitted = 0
+        self.persisted = 0
+        self.dropped = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, time.time(), seed,
+                                    player.encode('utf-8')[:32]))
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self.thread.start()
+    
+    def record(self, t, lane, figure, offset, grade, combo):
+        if self.written - self.persisted >= self.capacity:
+            self.dropped += 1
+            return
+        self.ring[self.written % self.capacity] = (
+            t, np.nan if offset is None else offset, combo, lane,
+            NO_FIGURE if figure is None else FIGURE_CODES.index(figure), GRADES.index(grade))
+        self.written += 1
+        if self.written - self.submitted >= self.batch:
+            self.flush()
+    
+    def observe(self, events):
+        for event in events:
+            if event[0] == 'judgment':
+                self.record(*event[1:])
+    
+    def flush(self):
+        if self.written > self.submitted:
+            self.queue.put((self.submitted, self.written))
+            self.submitted = self.written
+    
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+    
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            start, end = item
+            a, b = start % self.capacity, end % self.capacity
+            if a < b:
+                records = self.ring[a:b].copy()
+            else:
+                records = np.concatenate([self.ring[a:], self.ring[:b]])
+            self._write_block(records)
+            self.persisted = end
+    
+    def _write_block(self, records):
+        parts = [BLOCK.pack(len(records))]
+        parts.extend(np.ascontiguousarray(records[name]).tobytes() for name in RECORD.names)
+        self.file.write(b''.join(parts))
+        self.file.flush()
+
+
+# === LECTURA ===
+class Session:
+    """Una sesión leída: metadatos y columnas completas."""
+    def __init__(self, path, started, seed, player, columns):
+        self.path = path
+        self.started = started
+        self.seed = seed
+        self.player = player
+        self.columns = columns
+    
+    def __len__(self):
+        return len(self.columns['time'])
+
+
+def read_session(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: archivo demasiado corto")
+    magic, version, _flags, started, seed, player = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: no es un archivo de telemetría")
+    chunks = {name: [] for name in RECORD.names}
+    offset = HEADER.size
+    while offset + BLOCK.size <= len(data):
+        (count,) = BLOCK.unpack_from(data, offset)
+        offset += BLOCK.size
+        size = count * RECORD.itemsize
+        if offset + size > len(data):
+            break  # Bloque a medio escribir: la sesión se cortó
+        for name in RECORD.names:
+            dtype = RECORD.fields[name][0]
+            chunks[name].append(np.frombuffer(data, dtype, count, offset))
+            offset += count * dtype.itemsize
+    columns = {name: np.concatenate(parts) if parts else np.zeros(0, RECORD.fields[name][0])
+               for name, parts in chunks.items()}
+    return Session(path, started, seed, player.rstrip(b'\0').decode('utf-8', 'replace'), columns)
+
+
+def find_sessions(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith(SUFFIX):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+# === ANÁLISIS ===
+def load_sessions(paths, player=None):
+    """Une todas las sesiones en columnas con un índice de sesión por juicio."""
+    sessions = []
+    for path in find_sessions(paths):
+        try:
+            session = read_session(path)
+        except (OSError, ValueError) as exc:
+            print(f"aviso: {exc}", file=sys.stderr)
+            continue
+        if player is None or session.player == player:
+            sessions.append(session)
+    sessions.sort(key=lambda session: session.started)
+    columns = {name: np.concatenate([s.columns[name] for s in sessions]) if sessions
+               else np.zeros(0, RECORD.fields[name][0]) for name in RECORD.names}
+    columns['session'] = np.repeat(np.arange(len(sessions)), [len(s) for s in sessions])
+    return sessions, columns
+
+
+def slope(values):
+    # Pendiente de la recta de mínimos cuadrados, ignorando sesiones vacías
+    valid = ~np.isnan(values)
+    if valid.sum() < 2:
+        return 0.0
+    return float(np.polyfit(np.arange(len(values))[valid], values[valid], 1)[0])
+
+
+def analyze(sessions, columns, bin_ms=10):
+    """Histogramas por figura, sesgo temprano/tardío y tendencia de precisión."""
+    window_ms = HIT_WINDOW_OK * 1000
+    edges = np.arange(-window_ms, window_ms + bin_ms, bin_ms)
+    offset_ms = columns['offset'].astype(np.float64) * 1000
+    judged = ~np.isnan(offset_ms)
+    figure = columns['figure']
+    grade = columns['grade']
+    
+    per_figure = {}
+    for code, name in enumerate(FIGURE_CODES):
+        of_figure = figure == code
+        offsets = offset_ms[of_figure & judged]
+        total = int(np.count_nonzero(of_figure))
+        if total == 0:
+            continue
+        hist, _ = np.histogram(offsets, bins=edges)
+        per_figure[name] = {
+            'notes': total,
+            'hits': int(len(offsets)),
+            'hit_rate': len(offsets) / total,
+            'mean_offset_ms': float(offsets.mean()) if len(offsets) else 0.0,
+            'median_offset_ms': float(np.median(offsets)) if len(offsets) else 0.0,
+            'std_ms': float(offsets.std()) if len(offsets) else 0.0,
+            'early': int(np.count_nonzero(offsets < 0)),
+            'late': int(np.count_nonzero(offsets > 0)),
+            'histogram': hist.tolist(),
+        }
+    
+    # Precisión por sesión: aciertos sobre notas (los golpes al aire no cuentan)
+    n = len(sessions)
+    session = columns['session']
+    notes = figure != NO_FIGURE
+    totals = np.bincount(session[notes], minlength=n)
+    hits = np.bincount(session[notes & judged], minlength=n)
+    abs_sum = np.bincount(session[judged], weights=np.abs(offset_ms[judged]), minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        accuracy = np.where(totals > 0, hits / totals, np.nan)
+        mean_abs = np.where(hits > 0, abs_sum / np.maximum(hits, 1), np.nan)
+    trend = slope(accuracy)
+    timing_trend = slope(mean_abs)
+    
+    offsets = offset_ms[judged]
+    return {
+        'sessions': n,
+        'judgments': int(len(figure)),
+        'stray_presses': int(np.count_nonzero((figure == NO_FIGURE) & (grade == GRADES.index('miss')))),
+        'bias_ms': float(offsets.mean()) if len(offsets) else 0.0,
+        'early_ratio': float(np.mean(offsets < 0)) if len(offsets) else 0.0,
+        'grades': {name: int(np.count_nonzero(notes & (grade == i))) for i, name in enumerate(GRADES)},
+        'bin_edges_ms': edges.tolist(),
+        'figures': per_figure,
+        'accuracy_by_session': [None if np.isnan(a) else float(a) for a in accuracy],
+        'mean_abs_offset_by_session_ms': [None if np.isnan(m) else float(m) for m in mean_abs],
+        'accuracy_trend_per_session': trend,
+        'mean_abs_offset_trend_ms_per_session': timing_trend,
+    }
+
+
+def print_report(report, out=sys.stdout):
+    print(f"sesiones: {report['sessions']}  juicios: {report['judgments']}  "
+          f"golpes al aire: {report['stray_presses']}", file=out)
+    bias = report['bias_ms']
+    print(f"sesgo: {bias:+.1f} ms ({'tarde' if bias > 0 else 'temprano'}), "
+          f"{report['early_ratio'] * 100:.0f}% de golpes antes de tiempo", file=out)
+    print(f"tendencia de precisión: {report['accuracy_trend_per_session'] * 100:+.2f} puntos por sesión, "
+          f"{report['mean_abs_offset_trend_ms_per_session']:+.2f} ms de desfase medio por sesión", file=out)
+    print(f"\n{'figura':12} {'notas':>7} {'acierto':>8} {'media':>8} {'desv':>7}  histograma", file=out)
+    bars = ' ▁▂▃▄▅▆▇█'
+    for name, data in report['figures'].items():
+        hist = np.array(data['histogram'])
+        scaled = (hist * (len(bars) - 1) // max(hist.max(), 1)).tolist()
+        graph = ''.join(bars[v] for v in scaled)
+        print(f"{FIGURES[name]['name']:12} {data['notes']:7d} {data['hit_rate'] * 100:7.1f}% "
+              f"{data['mean_offset_ms']:+7.1f} {data['std_ms']:7.1f}  {graph}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ritmo_runner.telemetry',
+                                     description="Análisis de la telemetría de sesiones de Ritmo Runner")
+    parser.add_argument('paths', nargs='*', help="archivos .rrt o carpetas (por defecto, la de telemetría)")
+    parser.add_argument('--player', help="sólo las sesiones de este jugador")
+    parser.add_argument('--bin-ms', type=int, default=10, help="ancho de cada barra del histograma")
+    parser.add_argument('--json', action='store_true', help="salida en JSON")
+    args = parser.parse_args(argv)
+    
+    sessions, columns = load_sessions(args.paths or [default_telemetry_dir()], args.player)
+    if not sessions:
+        print("no hay sesiones", file=sys.stderr)
+        return 1
+    report = analyze(sessions, columns, args.bin_ms)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
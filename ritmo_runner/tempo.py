@@ -0,0 +1,126 @@
+"""Mapa de tempo: cambios de BPM y de compás, conversión pulso ↔ segundos.
+
+Los pulsos son negras, como en las partituras. ``TempoMap`` guarda tablas
+acumuladas por tramo (pulso y segundo en que empieza, segundos por pulso;
+y para los compases, pulso y número de compás en que empieza cada uno), así
+que ``time``, ``beat`` y ``bar`` son una búsqueda binaria: O(log n) aunque
+haya miles de cambios. ``TempoCursor`` recuerda el último tramo usado y, si
+los valores avanzan (la canción sonando), cuesta O(1) amortizado.
+
+Como ``simulation``, no depende de pygame ni de NumPy.
+"""
+from bisect import bisect_right
+
+from .config import BPM
+
+
+class TempoMap:
+    """Tempo por tramos y compases; sin cambios es un tempo fijo de ``bpm`` en 4/4.
+    
+    ``changes`` son pares ``(pulso, bpm)`` y ``meters`` ternas
+    ``(pulso, numerador, denominador)``; el tempo y el compás iniciales
+    (pulso 0) son ``bpm`` y 4/4 salvo que se cambien en el pulso 0.
+    """
+    def __init__(self, bpm=BPM, changes=(), meters=()):
+        tempos = {0.0: float(bpm)}
+        for beat, value in changes:
+            if beat < 0 or value <= 0:
+                raise ValueError(f"cambio de tempo inválido: {value} bpm en el pulso {beat}")
+            tempos[float(beat)] = float(value)
+        self.beats = sorted(tempos)
+        self.bpms = [tempos[beat] for beat in self.beats]
+        self.spb = [60 / value for value in self.bpms]
+        # Segundo en que empieza cada tramo
+        self.seconds = [0.0]
+        for i in range(1, len(self.beats)):
+            self.seconds.append(self.seconds[-1] + (self.beats[i] - self.beats[i - 1]) * self.spb[i - 1])
+    
+        signatures = {0.0: (4, 4)}
+        for beat, numerator, denominator in meters:
+            if beat < 0 or numerator <= 0 or denominator not in (1, 2, 4, 8, 16, 32):
+                raise ValueError(f"compás inválido: {numerator}/{denominator} en el pulso {beat}")
+            signatures[float(beat)] = (int(numerator), int(denominator))
+        self.meter_beats = sorted(signatures)
+        self.meters = [signatures[beat] for beat in self.meter_beats]
+        # Pulsos por compás y número del compás en que empieza cada tramo; un
+        # cambio a mitad de compás cuenta el trozo anterior como compás entero
+        self.bar_beats = [numerator * 4 / denominator for numerator, denominator in self.meters]
+        self.meter_bars = [0]
+        for i in range(1, len(self.meter_beats)):
+            length = (self.meter_beats[i] - self.meter_beats[i - 1]) / self.bar_beats[i - 1]
+            self.meter_bars.append(self.meter_bars[-1] + int(-(-length // 1)))
+    
+    def __len__(self):
+        return len(self.beats)
+    
+    @property
+    def bpm(self):
+        """Tempo inicial."""
+        return self.bpms[0]
+    
+    def changes(self):
+        """Cambios de tempo posteriores al inicial, como ``(pulso, bpm)``."""
+        return list(zip(self.beats[1:], self.bpms[1:]))
+    
+    def meter_changes(self):
+        """Cambios de compás distintos del 4/4 inicial, como ``(pulso, numerador, denominador)``."""
+        return [(beat, *meter) for beat, meter in zip(self.meter_beats, self.meters)
+                if beat > 0 or meter != (4, 4)]
+    
+    # === CONVERSIÓN ===
+    def time(self, beat):
+        """Segundos desde el pulso 0 hasta ``beat``."""
+        i = max(bisect_right(self.beats, beat) - 1, 0)
+        return self.seconds[i] + (beat - self.beats[i]) * self.spb[i]
+    
+    def beat(self, seconds):
+        """Pulso que suena a los ``seconds`` segundos."""
+        i = max(bisect_right(self.seconds, seconds) - 1, 0)
+        return self.beats[i] + (seconds - self.seconds[i]) / self.spb[i]
+    
+    def bpm_at(self, beat):
+        return self.bpms[max(bisect_right(self.beats, beat) - 1, 0)]
+    
+    def bar(self, beat):
+        """``(compás, pulso dentro del compás)`` de ``beat``, ambos desde 0."""
+        i = max(bisect_right(self.meter_beats, beat) - 1, 0)
+        bars, within = divmod(beat - self.meter_beats[i], self.bar_beats[i])
+        return self.meter_bars[i] + int(bars), within
+    
+    def cursor(self):
+        return TempoCursor(self)
+
+
+class TempoCursor:
+    """Conversiones sobre un ``TempoMap`` que recuerdan el último tramo.
+    
+    Con valores crecientes sólo se mira el tramo siguiente; los saltos largos
+    o hacia atrás caen en la búsqueda binaria.
+    """
+    __slots__ = ('tempo', 'beat_index', 'time_index')
+    
+    def __init__(self, tempo):
+        self.tempo = tempo
+        self.beat_index = 0
+        self.time_index = 0
+    
+    @staticmethod
+    def seek(starts, value, i):
+        if value < starts[i]:
+            return max(bisect_right(starts, value, 0, i) - 1, 0)
+        last = len(starts) - 1
+        if i < last and value >= starts[i + 1]:
+            if i + 1 < last and value >= starts[i + 2]:
+                return bisect_right(starts, value, i + 2) - 1
+            return i + 1
+        return i
+    
+    def time(self, beat):
+        tempo = self.tempo
+        i = self.beat_index = self.seek(tempo.beats, beat, self.beat_index)
+        return tempo.seconds[i] + (beat - tempo.beats[i]) * tempo.spb[i]
+    
+    def beat(self, seconds):
+        tempo = self.tempo
+        i = self.time_index = self.seek(tempo.seconds, seconds, self.time_index)
+        return tempo.beats[i] + (seconds - tempo.seconds[i]) / tempo.spb[i]
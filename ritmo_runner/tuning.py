@@ -0,0 +1,199 @@
+"""Ajuste de dificultad por lotes: muchas partidas automáticas sin ventana.
+
+Para cada combinación de la rejilla (escala de velocidad, escala de
+``spawn_rate``, ``LEVEL_POINTS`` y perfil de jugador de ``autoplay``) se
+juegan ``--sessions`` partidas con semillas distintas repartidas entre
+procesos, y se resume puntuación, combo, precisión, cuándo se alcanza cada
+nivel, notas por segundo de cada nivel y curvas de densidad de notas y de
+puntuación a lo largo de la partida.
+
+Uso::
+
+    python -m ritmo_runner.tuning --sessions 200 --duration 180
+    python -m ritmo_runner.tuning --speed 0.8,1,1.2 --spawn 0.8,1 --level-points 1500,2000 \\
+        --profiles intermedio,principiante --json rejilla.json
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .autoplay import PROFILES, Bot
+from .config import LEVEL_POINTS, LEVELS
+from .simulation import SIM_STEP, Simulation
+
+
+def scaled_levels(speed=1.0, spawn=1.0):
+    """Copia de ``LEVELS`` con la velocidad y el intervalo entre notas escalados."""
+    return [{**level, 'speed': level['speed'] * speed, 'spawn_rate': level['spawn_rate'] * spawn}
+            for level in LEVELS]
+
+
+# === UNA PARTIDA ===
+def play_session(task):
+    """Juega una partida automática; pensado para correr en un proceso hijo."""
+    cell, seed, duration, bin_seconds = task
+    levels = scaled_levels(cell['speed'], cell['spawn'])
+    sim = Simulation(seed, levels=levels, level_points=cell['level_points'])
+    bot = Bot.from_profile(cell['profile'], seed=seed ^ 0x5EED)
+    bins = int(np.ceil(duration / bin_seconds))
+    density = np.zeros(bins)
+    score_curve = np.zeros(bins)
+    level_times = [0.0] + [None] * (len(levels) - 1)
+    notes_by_level = np.zeros(len(levels))
+    time_in_level = np.zeros(len(levels))
+    
+    steps = int(round(duration / sim.dt))
+    for _ in range(steps):
+        # Cada nota nueva cuenta en el intervalo de su llegada a la zona de golpe
+        for note in bot.observe(sim):
+            b = int(note.time / bin_seconds)
+            if b < bins:
+                density[b] += 1
+            notes_by_level[note.level] += 1
+        sim.step(bot.presses(sim))
+        time_in_level[sim.current_level] += sim.dt
+        for event in sim.drain_events():
+            if event[0] == 'level_up':
+                level_times[event[1]] = sim.time
+        b = min(int(sim.time / bin_seconds), bins - 1)
+        score_curve[b] = sim.score
+    
+    judged = sum(sim.stats[name] for name in ('perfect', 'good', 'ok'))
+    total = judged + sim.stats['miss']
+    return {
+        'score': sim.score,
+        'max_combo': sim.max_combo,
+        'accuracy': judged / total if total else 0.0,
+        'stats': dict(sim.stats),
+        'level_times': level_times,
+        'notes_per_second': np.divide(notes_by_level, time_in_level, out=np.zeros(len(levels)),
+                                      where=time_in_level > 0).tolist(),
+        'time_in_level': time_in_level.tolist(),
+        'density': (density / bin_seconds).tolist(),
+        'score_curve': score_curve.tolist(),
+    }
+
+
+# === REJILLA ===
+def grid(speeds, spawns, level_points, profiles):
+    for speed, spawn, points, profile in itertools.product(speeds, spawns, level_points, profiles):
+        yield {'speed': speed, 'spawn': spawn, 'level_points': points, 'profile': profile}
+
+
+def summarize(cell, sessions):
+    scores = np.array([s['score'] for s in sessions], dtype=float)
+    combos = np.array([s['max_combo'] for s in sessions], dtype=float)
+    accuracy = np.array([s['accuracy'] for s in sessions])
+    levels = []
+    for level in range(len(LEVELS)):
+        times = [s['level_times'][level] for s in sessions if s['level_times'][level] is not None]
+        in_level = [s['notes_per_second'][level] for s in sessions if s['time_in_level'][level] > 0]
+        levels.append({
+            'reached': len(times) / len(sessions),
+            'mean_reach_time': float(np.mean(times)) if times else None,
+            'median_reach_time': float(np.median(times)) if times else None,
+            'notes_per_second': float(np.mean(in_level)) if in_level else None,
+        })
+    p10, p50, p90 = np.percentile(scores, [10, 50, 90])
+    return {
+        **cell,
+        'sessions': len(sessions),
+        'score_mean': float(scores.mean()),
+        'score_p10': float(p10),
+        'score_p50': float(p50),
+        'score_p90': float(p90),
+        'max_combo_mean': float(combos.mean()),
+        'accuracy_mean': float(accuracy.mean()),
+        'levels': levels,
+        'density_curve': np.mean([s['density'] for s in sessions], axis=0).tolist(),
+        'score_curve': np.mean([s['score_curve'] for s in sessions], axis=0).tolist(),
+    }
+
+
+def run_grid(cells, sessions=100, duration=180.0, bin_seconds=10.0, jobs=None, seed=0):
+    """Juega ``sessions`` partidas por celda en ``jobs`` procesos y resume cada celda."""
+    cells = list(cells)
+    tasks = [(cell, seed + i, duration, bin_seconds) for cell in cells for i in range(sessions)]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        results = [play_session(task) for task in tasks]
+    else:
+        # Las tareas son parecidas: lotes grandes para repartir poco entre procesos
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(play_session, tasks, chunksize=chunksize))
+    return [summarize(cell, results[i * sessions:(i + 1) * sessions]) for i, cell in enumerate(cells)]
+
+
+# === SALIDA ===
+def format_level(level):
+    # Cuándo se llega (media), a qué fracción de partidas y cuántas notas por segundo trae
+    if level['mean_reach_time'] is None:
+        return f"{'-':>18}"
+    return (f"{level['mean_reach_time']:4.0f}s {level['reached'] * 100:3.0f}% "
+            f"{level['notes_per_second'] or 0:4.2f}/s")
+
+
+def print_report(summaries, out=sys.stdout):
+    names = ' '.join(f"{'nivel ' + str(i + 1):>18}" for i in range(len(LEVELS)))
+    print(f"{'vel':>4} {'notas':>5} {'puntos':>6} {'perfil':12} {'media':>8} {'p10':>7} {'p90':>7} "
+          f"{'combo':>6} {'acierto':>7} {names}", file=out)
+    for s in summaries:
+        levels = ' '.join(format_level(level) for level in s['levels'])
+        print(f"{s['speed']:4.2f} {s['spawn']:5.2f} {s['level_points']:6d} {s['profile']:12} "
+              f"{s['score_mean']:8.0f} {s['score_p10']:7.0f} {s['score_p90']:7.0f} "
+              f"{s['max_combo_mean']:6.1f} {s['accuracy_mean'] * 100:6.1f}%  {levels}", file=out)
+
+
+def parse_floats(text):
+    return [float(value) for value in text.split(',')]
+
+
+def parse_ints(text):
+    return [int(value) for value in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ritmo_runner.tuning',
+                                     description="Partidas automáticas por lotes para ajustar la dificultad")
+    parser.add_argument('--speed', type=parse_floats, default=[1.0], help="escalas de velocidad, separadas por comas")
+    parser.add_argument('--spawn', type=parse_floats, default=[1.0],
+                        help="escalas del intervalo entre notas (spawn_rate), separadas por comas")
+    parser.add_argument('--level-points', type=parse_ints, default=[LEVEL_POINTS],
+                        help="puntos por nivel para subir, separados por comas")
+    parser.add_argument('--profiles', default='experto,intermedio,principiante',
+                        help=f"perfiles de jugador ({', '.join(PROFILES)})")
+    parser.add_argument('--sessions', type=int, default=100, help="partidas por combinación")
+    parser.add_argument('--duration', type=float, default=180.0, help="segundos de cada partida")
+    parser.add_argument('--bin', type=float, default=10.0, help="segundos por punto de las curvas")
+    parser.add_argument('--jobs', '-j', type=int, help="procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument('--seed', type=int, default=0, help="primera semilla")
+    parser.add_argument('--json', metavar='ARCHIVO', help="guardar los resúmenes (con las curvas) en JSON")
+    args = parser.parse_args(argv)
+    
+    profiles = args.profiles.split(',')
+    unknown = [name for name in profiles if name not in PROFILES]
+    if unknown:
+        parser.error(f"perfil desconocido: {', '.join(unknown)}")
+    cells = list(grid(args.speed, args.spawn, args.level_points, profiles))
+    start = time.perf_counter()
+    summaries = run_grid(cells, args.sessions, args.duration, args.bin, args.jobs, args.seed)
+    elapsed = time.perf_counter() - start
+    print_report(summaries)
+    print(f"{len(cells) * args.sessions} partidas de {args.duration:.0f} s en {elapsed:.1f} s "
+          f"({len(cells) * args.sessions * args.duration / SIM_STEP / elapsed:,.0f} pasos/s)",
+          file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'duration': args.duration, 'bin_seconds': args.bin, 'cells': summaries}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+"""Resolución independiente de la ventana: lienzo lógico, objetivo interno y escalado.
+
+El juego dibuja siempre en coordenadas lógicas (``WIDTH`` × ``HEIGHT``) sobre
+un ``Canvas``, que las pasa a los píxeles de su superficie. ``Viewport``
+elige esa superficie: la zona de la ventana con la proporción del juego (con
+bandas negras si la ventana tiene otra, p. ej. a pantalla completa) por la
+calidad (``QUALITY_PRESETS``). Por debajo de calidad 1 hay menos píxeles que
+rellenar y mezclar en la CPU. Cuando hay que escalar, ``GpuViewport`` sube
+la superficie a una textura y la GPU la escala a la ventana de una sola
+pasada al presentar; sin escalado (o sin ``pygame._sdl2``), ``Viewport``
+presenta con ``pygame.display`` y sólo las zonas que cambiaron.
+
+Con calidad ``auto``, ``AutoQuality`` baja la resolución interna cuando los
+frames no caben en el presupuesto y la vuelve a subir cuando sobra tiempo.
+"""
+import ctypes
+import functools
+import math
+from collections import deque
+from contextlib import contextmanager
+
+import pygame
+
+try:
+    from pygame._sdl2 import video
+except ImportError:
+    # API privada de pygame: sin ella se presenta con ``pygame.display``
+    video = None
+
+from .config import BLACK, HEIGHT, QUALITY_PRESETS, WIDTH
+
+QUALITY_LEVELS = tuple(sorted(QUALITY_PRESETS.values()))
+SCALE_QUALITY_HINT = b'SDL_RENDER_SCALE_QUALITY'
+
+
+def logical_rect(rect, scale):
+    """Rectángulo lógico que cubre un rectángulo en píxeles a la escala ``scale``."""
+    rect = pygame.Rect(rect)
+    if scale == 1:
+        return rect
+    left, top = math.floor(rect.left / scale), math.floor(rect.top / scale)
+    return pygame.Rect(left, top, math.ceil(rect.right / scale) - left, math.ceil(rect.bottom / scale) - top)
+
+
+class Canvas:
+    """Dibujo en coordenadas lógicas sobre ``surface``, que mide ``size`` × ``scale`` píxeles.
+    
+    Imita lo que el juego usa de ``pygame.Surface`` y ``pygame.draw``; los
+    sprites que recibe ``blit`` ya están horneados a la escala. Con escala 1
+    pasa las coordenadas tal cual, así que el resultado es idéntico a dibujar
+    directamente en la superficie.
+    """
+    # Píxeles que el redondeo puede desplazar lo dibujado fuera de su rectángulo lógico
+    MARGIN = 2
+    
+    def __init__(self, surface, scale=1.0, size=(WIDTH, HEIGHT)):
+        self.surface = surface
+        self.scale = scale
+        self.size = size
+    
+    def get_size(self):
+        return self.size
+    
+    # === CONVERSIÓN ===
+    def point(self, pos):
+        s = self.scale
+        if s == 1:
+            return pos
+        return round(pos[0] * s), round(pos[1] * s)
+    
+    def length(self, value):
+        """Grosor de línea o radio de borde a la escala (nunca menos de 1 si no es 0)."""
+        if self.scale == 1 or not value:
+            return value
+        return max(1, round(value * self.scale))
+    
+    def scaled_size(self, size):
+        if self.scale == 1:
+            return size
+        return max(1, round(size[0] * self.scale)), max(1, round(size[1] * self.scale))
+    
+    def target_rect(self, rect):
+        """Rectángulo lógico en píxeles, redondeando los bordes (para dibujar)."""
+        s = self.scale
+        if s == 1:
+            return rect
+        rect = pygame.Rect(rect)
+        left, top = round(rect.left * s), round(rect.top * s)
+        return pygame.Rect(left, top, round(rect.right * s) - left, round(rect.bottom * s) - top)
+    
+    def cover(self, rect):
+        """Píxeles que puede tocar lo dibujado en un rectángulo lógico (recortes y presentación)."""
+        rect = pygame.Rect(rect)
+        s = self.scale
+        if s == 1:
+            return rect
+        left, top = math.floor(rect.left * s) - self.MARGIN, math.floor(rect.top * s) - self.MARGIN
+        return pygame.Rect(left, top, math.ceil(rect.right * s) + self.MARGIN - left,
+                           math.ceil(rect.bottom * s) + self.MARGIN - top)
+    
+    def logical(self, rect):
+        return logical_rect(rect, self.scale)
+    
+    def width(self, source):
+        """Ancho lógico de un sprite (para maquetar texto)."""
+        if self.scale == 1:
+            return source.get_width()
+        return source.get_width() / self.scale
+    
+    def anchored(self, source, anchor):
+        # ``anchor`` es un único punto con nombre de ``pygame.Rect`` (center, midtop...)
+        (name, pos), = anchor.items()
+        return source.get_rect(**{name: self.point(pos)})
+    
+    def place(self, source, **anchor):
+        """Rectángulo lógico que ocupa ``source`` colocado con ``anchor`` (p. ej. ``center=``)."""
+        return self.logical(self.anchored(source, anchor))
+    
+    # === DIBUJO ===
+    def blit(self, source, dest=(0, 0), area=None, **anchor):
+        """Copia ``source`` con su esquina en ``dest`` o con un punto de anclaje (``center=...``)."""
+        if anchor:
+            self.surface.blit(source, self.anchored(source, anchor), area)
+        else:
+            self.surface.blit(source, self.point(dest), area)
+    
+    def fill(self, color, rect=None):
+        self.surface.fill(color, None if rect is None else self.target_rect(rect))
+    
+    def circle(self, color, center, radius, width=0):
+        if self.scale != 1:
+            radius = max(1, round(radius * self.scale))
+        pygame.draw.circle(self.surface, color, self.point(center), radius, self.length(width))
+    
+    def rect(self, color, rect, width=0, border_radius=0):
+        pygame.draw.rect(self.surface, color, self.target_rect(rect), self.length(width),
+                         border_radius=self.length(border_radius))
+    
+    # === RECORTE ===
+    def get_clip(self):
+        return self.logical(self.surface.get_clip())
+    
+    def set_clip(self, rect):
+        self.surface.set_clip(None if rect is None else self.cover(rect))
+
+
+class Viewport:
+    """La ventana del juego y el objetivo interno en el que se dibuja.
+    
+    Es la presentación con ``pygame.display``: a calidad 1 se dibuja
+    directamente en la zona del juego de la ventana y se presentan sólo los
+    rectángulos que cambiaron; si no, se dibuja en una superficie más
+    pequeña y ``compose`` la escala a la ventana en la CPU, de una sola
+    pasada. Sin ventana (benchmarks) se dibuja igual en un objetivo para una
+    ventana de ``size`` píxeles, pero no se presenta nada.
+    """
+    def __init__(self, window=None, quality=1.0, size=(WIDTH, HEIGHT)):
+        self.window = window
+        self.size = window.get_size() if window is not None else size
+        self.quality = quality
+        self.resize()
+    
+    def resize(self):
+        """Recalcula la zona del juego dentro de la ventana (proporción fija, centrada)."""
+        width, height = self.size
+        self.window_scale = min(width / WIDTH, height / HEIGHT)
+        self.area = pygame.Rect(0, 0, round(WIDTH * self.window_scale), round(HEIGHT * self.window_scale))
+        self.area.center = (width // 2, height // 2)
+        self.set_quality(self.quality)
+    
+    def set_quality(self, quality):
+        """Crea el objetivo interno para ``quality``; devuelve su ``Canvas``."""
+        self.quality = quality
+        scale = self.window_scale * quality
+        size = (round(WIDTH * scale), round(HEIGHT * scale))
+        # Sin escalado que hacer se dibuja en la propia ventana
+        self.direct = self.window is not None and size == self.area.size
+        if self.direct:
+            target = self.window.subsurface(self.area)
+        else:
+            target = pygame.Surface(size)
+            if self.window is not None:
+                target = target.convert()
+        self.canvas = Canvas(target, scale)
+        self.invalidate()
+        return self.canvas
+    
+    def invalidate(self):
+        # La próxima presentación repinta la ventana entera (bandas incluidas)
+        self.full = True
+    
+    def fill_bands(self):
+        # Lo que queda fuera de la zona del juego, en negro
+        width, height = self.size
+        area = self.area
+        for band in ((0, 0, width, area.top), (0, area.bottom, width, height - area.bottom),
+                     (0, area.top, area.left, area.height), (area.right, area.top, width - area.right, area.height)):
+            self.window.fill(BLACK, band)
+    
+    # === PRESENTACIÓN ===
+    def compose(self, rects=None):
+        """Lleva lo dibujado a la ventana; devuelve lo que hay que pasar a ``present``.
+        
+        ``rects`` son las zonas lógicas que cambiaron (``None``: todo). El
+        resultado es ``None`` para presentar la ventana entera o una lista
+        de rectángulos de la ventana (vacía si no hay nada nuevo).
+        """
+        if self.window is None:
+            return []
+        full, self.full = self.full, False
+        if full:
+            self.fill_bands()
+        if self.direct:
+            if full or rects is None:
+                return None
+            return [self.canvas.cover(rect).move(self.area.topleft) for rect in rects]
+        if not full and rects is not None and not rects:
+            return []
+        # Un solo escalado de todo el objetivo: escalar trozos sueltos dejaría costuras
+        pygame.transform.scale(self.canvas.surface, self.area.size, self.window.subsurface(self.area))
+        return None if full else [self.area.copy()]
+    
+    def present(self, updates, overlay=None, topleft=(0, 0)):
+        """Presenta ``updates`` (lo que devolvió ``compose``) y, encima, ``overlay``.
+        
+        ``overlay`` es una superficie en píxeles de la ventana (con alfa) que
+        se pone en el punto lógico ``topleft``. Se pinta sobre la ventana: la
+        zona que tapa (``overlay_rect``) hay que volver a dibujarla en el
+        frame siguiente.
+        """
+        if self.window is None:
+            return
+        if overlay is not None:
+            rect = self.window.blit(overlay, self.window_point(topleft))
+            if updates is not None:
+                updates = updates + [rect]
+        if updates is None:
+            pygame.display.flip()
+        elif updates:
+            pygame.display.update(updates)
+    
+    # === OVERLAY ===
+    def window_point(self, pos):
+        """Punto de la ventana que corresponde a un punto lógico."""
+        return (self.area.left + round(pos[0] * self.window_scale),
+                self.area.top + round(pos[1] * self.window_scale))
+    
+    def overlay_rect(self, topleft, size):
+        """Zona lógica que estropea un overlay de ``size`` píxeles de la ventana, o ``None``."""
+        return pygame.Rect(topleft, (math.ceil(size[0] / self.window_scale), math.ceil(size[1] / self.window_scale)))
+    
+    def close(self):
+        # La ventana de ``pygame.display`` se cierra con ``pygame.quit``
+        self.window = None
+
+
+class GpuViewport(Viewport):
+    """Presentación con ``pygame._sdl2.video``: la GPU escala a la ventana.
+    
+    Lo dibujado se sube a una textura (sólo las zonas que cambiaron) y el
+    ``Renderer`` la escala a la zona del juego, con bandas negras alrededor;
+    el overlay es otra textura encima. Cada presentación repinta la ventana
+    entera, así que los rectángulos sucios sólo ahorran la subida.
+    """
+    def __init__(self, window, quality=1.0, vsync=False):
+        self.renderer = video.Renderer(window, vsync=vsync)
+        self.renderer.draw_color = pygame.Color(BLACK)
+        self.texture = None
+        self.overlay = None
+        self.overlaid = False
+        self.window = window
+        self.size = window.size
+        self.quality = quality
+        self.resize()
+    
+    def set_quality(self, quality):
+        self.quality = quality
+        scale = self.window_scale * quality
+        size = (round(WIDTH * scale), round(HEIGHT * scale))
+        self.direct = False
+        self.canvas = Canvas(pygame.Surface(size), scale)
+        with scale_quality('nearest' if size == self.area.size else 'linear'):
+            self.texture = video.Texture(self.renderer, size, streaming=True)
+        self.invalidate()
+        return self.canvas
+    
+    def compose(self, rects=None):
+        """Sube lo dibujado a la textura; devuelve si hay algo nuevo que presentar."""
+        full, self.full = self.full, False
+        target = self.canvas.surface
+        if full or rects is None:
+            self.texture.update(target)
+            return True
+        bounds = target.get_rect()
+        for rect in rects:
+            rect = self.canvas.cover(rect).clip(bounds)
+            if rect:
+                self.texture.update(target.subsurface(rect), rect)
+        return bool(rects)
+    
+    def present(self, changed, overlay=None, topleft=(0, 0)):
+        # Sin cambios ni overlay que quitar no se presenta nada
+        if not (changed or overlay is not None or self.overlaid):
+            return
+        renderer = self.renderer
+        renderer.clear()
+        self.texture.draw(dstrect=self.area)
+        self.overlaid = overlay is not None
+        if overlay is not None:
+            self.overlay_texture(overlay.get_size()).update(overlay)
+            self.overlay.draw(dstrect=(self.window_point(topleft), overlay.get_size()))
+        renderer.present()
+    
+    def overlay_texture(self, size):
+        # Una sola textura para el overlay; sólo se rehace si cambia de tamaño
+        texture = self.overlay
+        if texture is None or (texture.width, texture.height) != size:
+            # ARGB8888, como las superficies con alfa de pygame
+            texture = self.overlay = video.Texture(self.renderer, size, streaming=True)
+            texture.blend_mode = pygame.BLENDMODE_BLEND
+        return texture
+    
+    def overlay_rect(self, topleft, size):
+        # El overlay es otra textura: no estropea nada de lo dibujado
+        return None
+    
+    def close(self):
+        # Texturas y renderer antes que la ventana, que se los llevaría consigo
+        self.texture = self.overlay = None
+        self.renderer = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+
+def make_viewport(window, quality=1.0, vsync=False):
+    """``GpuViewport`` para una ventana de ``pygame._sdl2``; si no, ``Viewport``.
+    
+    Con ``pygame.display`` el vsync lo pide ``init_display`` al abrir la ventana.
+    """
+    if video is not None and isinstance(window, video.Window):
+        return GpuViewport(window, quality, vsync)
+    return Viewport(window, quality)
+
+
+@contextmanager
+def scale_quality(value):
+    """``SDL_RENDER_SCALE_QUALITY`` sólo mientras dura el bloque (SDL la lee al crear texturas)."""
+    sdl = sdl_hints()
+    if sdl is None:
+        yield
+        return
+    previous = sdl.SDL_GetHint(SCALE_QUALITY_HINT)
+    sdl.SDL_SetHint(SCALE_QUALITY_HINT, value.encode())
+    try:
+        yield
+    finally:
+        sdl.SDL_SetHint(SCALE_QUALITY_HINT, previous)
+
+
+@functools.lru_cache(maxsize=None)
+def sdl_hints():
+    # La copia de SDL de pygame, para sus pistas; sin ella, el filtro por defecto
+    try:
+        lib = ctypes.CDLL(video.__file__)
+        lib.SDL_GetHint.argtypes = [ctypes.c_char_p]
+        lib.SDL_GetHint.restype = ctypes.c_char_p
+        lib.SDL_SetHint.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    except (OSError, AttributeError):
+        return None
+    return lib
+
+
+class AutoQuality:
+    """Elige la calidad según el tiempo que tardan los frames.
+    
+    Si la media de los últimos ``WINDOW`` frames pasa de ``HIGH`` veces el
+    presupuesto se baja un escalón. Se sube uno si, con el coste escalado por
+    el área (el cuadrado de la calidad), la media seguiría por debajo de
+    ``LOW`` veces el presupuesto. Tras cada cambio se descartan ``SETTLE``
+    frames, que cuestan de más mientras se vuelven a hornear los sprites.
+    """
+    WINDOW = 90
+    SETTLE = 30
+    HIGH = 0.85
+    LOW = 0.6
+    
+    def __init__(self, budget, quality=1.0, levels=QUALITY_LEVELS):
+        self.budget = budget
+        self.levels = levels
+        self.level = min(range(len(levels)), key=lambda i: abs(levels[i] - quality))
+        self.times = deque(maxlen=self.WINDOW)
+        self.settle = self.SETTLE
+    
+    @property
+    def quality(self):
+        return self.levels[self.level]
+    
+    def observe(self, frame_time):
+        """Anota un frame; devuelve la nueva calidad si hay que cambiarla, si no ``None``."""
+        if self.settle:
+            self.settle -= 1
+            return None
+        times = self.times
+        times.append(frame_time)
+        if len(times) < self.WINDOW:
+            return None
+        mean = sum(times) / len(times)
+        level = self.level
+        if mean > self.HIGH * self.budget and level > 0:
+            level -= 1
+        elif level + 1 < len(self.levels):
+            ratio = (self.levels[level + 1] / self.levels[level]) ** 2
+            if mean * ratio < self.LOW * self.budget:
+                level += 1
+        if level == self.level:
+            return None
+        self.level = level
+        times.clear()
+        self.settle = self.SETTLE
+        return self.quality
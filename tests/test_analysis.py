@@ -0,0 +1,52 @@
+"""Casos límite del análisis de canciones: audio muy corto y sin pulso."""
+import wave
+
+import numpy as np
+import pytest
+
+from ritmo_runner.analysis import FRAME, HOP, MAX_BPM, analyze, chart_for_song, estimate_tempo
+from ritmo_runner.chart import load_chart
+
+FPS = 44100 / HOP
+
+
+def write_wav(path, samples, rate=44100):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.asarray(samples, dtype='<i2').tobytes())
+    return str(path)
+
+
+def test_short_wav_is_rejected(tmp_path):
+    path = write_wav(tmp_path / 'tiny.wav', np.zeros(FRAME - 1))
+    with pytest.raises(ValueError):
+        analyze(path)
+
+
+@pytest.mark.parametrize('flux', [np.zeros(0), np.zeros(2), np.zeros(2000), np.ones(2000)])
+def test_no_pulse_gives_default_tempo(flux):
+    assert estimate_tempo(flux, FPS) == (120.0, 0.0)
+
+
+def test_silence_stays_in_range(tmp_path):
+    meta, notes = analyze(write_wav(tmp_path / 'silence.wav', np.zeros(44100 * 5)))
+    assert meta['bpm'] <= MAX_BPM
+    assert notes == []
+
+
+def test_regular_clicks():
+    flux = np.zeros(4000)
+    flux[::43] = 1
+    bpm, _ = estimate_tempo(flux, FPS)
+    assert bpm == pytest.approx(60 * FPS / 43, rel=1e-3)
+
+
+def test_truncated_cache_entry_is_reanalyzed(tmp_path):
+    path = write_wav(tmp_path / 'silence.wav', np.zeros(44100))
+    cached = chart_for_song(path, str(tmp_path / 'cache'))
+    with open(cached, 'r+b') as f:
+        f.truncate(10)
+    assert chart_for_song(path, str(tmp_path / 'cache')) == cached
+    assert load_chart(cached).bpm == 120.0
@@ -0,0 +1,86 @@
+"""Motor de audio: voces a la muestra y apertura y cierre repetidos con el driver ``dummy``."""
+import faulthandler
+import os
+import time
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pytest
+
+from ritmo_runner.audio import AudioEngine
+
+CYCLES = 200
+# Bloques muy cortos: el hilo de audio pide el GIL casi sin parar
+BLOCK = 32
+SPIN = 0.01
+
+
+def mix(engine, blocks):
+    return np.concatenate([engine.render(engine.block) for _ in range(blocks)])
+
+
+def onset(out):
+    return int(np.flatnonzero(out)[0])
+
+
+def test_voice_starts_at_its_sample_inside_a_block():
+    engine = AudioEngine(block=256)
+    pcm = np.full(100, 16384, dtype=np.int16)
+    for sample in (1000, 1001, 1279):
+        engine.position = 0
+        engine.play(pcm, at=sample / engine.sample_rate, gain=0.5)
+        out = mix(engine, 8)
+        assert onset(out) == sample
+        assert np.count_nonzero(out) == len(pcm)
+        assert np.allclose(out[sample:sample + len(pcm)], 0.25, atol=1e-4)
+
+
+def test_unscheduled_voice_delay_does_not_depend_on_the_callback_phase():
+    # Tras un callback, lo mezclado va dos bloques por delante de lo que suena
+    engine = AudioEngine(block=256)
+    pcm = np.full(16, 16384, dtype=np.int16)
+    delays = []
+    for phase in (0.0, 0.3, 0.9):
+        engine.position = 0
+        engine.voices = []
+        heard = -2 * engine.block / engine.sample_rate
+        engine.clock.last = heard
+        engine.timing = (heard, time.perf_counter() - phase * engine.latency, heard + engine.latency)
+        engine.play(pcm)
+        now = engine.clock.last
+        delays.append(onset(mix(engine, 4)) / engine.sample_rate - now)
+    assert max(delays) - min(delays) <= 1.5 / engine.sample_rate
+    assert abs(delays[0] - 2 * engine.latency) <= 1.5 / engine.sample_rate
+
+
+def wait_for_callback(engine, timeout=2.0):
+    # Espera activa, como el bucle del juego: el hilo de audio se queda con
+    # el lock del dispositivo esperando el GIL justo cuando se cierra
+    start = engine.position
+    deadline = time.perf_counter() + timeout
+    while engine.position == start and time.perf_counter() < deadline:
+        pass
+    # Y un poco más, para cerrar en cualquier punto del ciclo del callback
+    busy = time.perf_counter() + SPIN
+    while time.perf_counter() < busy:
+        pass
+    return engine.position != start
+
+
+def test_open_close_does_not_deadlock():
+    # Un cierre bloqueado no volvería nunca: se aborta con la pila de cada hilo
+    faulthandler.dump_traceback_later(30, exit=True)
+    try:
+        for _ in range(CYCLES):
+            try:
+                engine = AudioEngine(block=BLOCK).open()
+            except RuntimeError as exc:
+                pytest.skip(str(exc))
+            engine.play(np.full(4096, 16384, dtype=np.int16))
+            assert wait_for_callback(engine)
+            engine.close()
+            assert engine.device is None
+            engine.close()
+    finally:
+        faulthandler.cancel_dump_traceback_later()
@@ -0,0 +1,69 @@
+"""Partituras compiladas dañadas: se recompilan desde la fuente o dan ``ChartError``."""
+import os
+import struct
+
+import pytest
+
+from ritmo_runner.chart import HEADER, ChartError, load_chart
+
+SOURCE = """title = Prueba
+bpm = 120
+4 A negra
+5 S negra
+6 D corchea
+8 tempo 90
+"""
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'prueba.chart'
+    path.write_text(SOURCE, encoding='utf-8')
+    return str(path)
+
+
+def compiled_of(source):
+    return os.path.splitext(source)[0] + '.rrc'
+
+
+def truncate(path, size):
+    with open(path, 'r+b') as f:
+        f.truncate(size)
+
+
+def touch_after(path, other):
+    # Más reciente que la fuente, para que no se recompile por fecha
+    stamp = os.path.getmtime(other) + 10
+    os.utime(path, (stamp, stamp))
+
+
+def test_source_compiles_and_loads(source):
+    chart = load_chart(source)
+    assert len(chart) == 3
+    assert chart.tempo.changes() == [(8.0, 90.0)]
+
+
+@pytest.mark.parametrize('size', [HEADER.size - 1, HEADER.size + 20, HEADER.size + 3 * 16 + 5])
+def test_truncated_compiled_is_rebuilt_from_source(source, size):
+    compiled = load_chart(source).path
+    truncate(compiled, size)
+    touch_after(compiled, source)
+    assert len(load_chart(source)) == 3
+    assert len(load_chart(compiled)) == 3
+
+
+def test_unknown_version_is_rebuilt_from_source(source):
+    compiled = load_chart(source).path
+    with open(compiled, 'r+b') as f:
+        f.seek(4)
+        f.write(struct.pack('<H', 99))
+    touch_after(compiled, source)
+    assert len(load_chart(source)) == 3
+
+
+def test_truncated_compiled_without_source_is_a_chart_error(source):
+    compiled = load_chart(source).path
+    os.remove(source)
+    truncate(compiled, HEADER.size + 20)
+    with pytest.raises(ChartError, match='truncado'):
+        load_chart(compiled)
@@ -0,0 +1,41 @@
+"""Modo clase por la red local: servidor real en un puerto libre y bots como jugadores."""
+import asyncio
+
+from ritmo_runner.classroom import ClassroomClient, ClassroomServer, play_bot
+
+
+def write_chart(tmp_path):
+    source = tmp_path / 'clase.chart'
+    lines = ["bpm = 240"] + [f"{beat} {beat % 4} negra" for beat in range(2, 14)]
+    source.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(source)
+
+
+async def play_class(chart_path):
+    server = ClassroomServer(seed=7, chart_path=chart_path, players=2, wait=5.0, countdown=0.3)
+    await server.start('127.0.0.1', 0)
+    try:
+        bots = asyncio.gather(*(play_bot('127.0.0.1', server.port, i, 'intermedio') for i in range(2)))
+        while server.start_at is None:
+            await asyncio.sleep(0.02)
+        # Llega con la partida ya anunciada: sólo mira
+        late = ClassroomClient('127.0.0.1', server.port, name='tarde')
+        spectator = asyncio.create_task(late.main())
+        results = await asyncio.wait_for(bots, timeout=30)
+        await asyncio.wait_for(spectator, timeout=5)
+        return server, results, late
+    finally:
+        await server.close()
+
+
+def test_bots_match_server_and_spectators_stay_off_the_board(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    server, results, late = asyncio.run(play_class(write_chart(tmp_path)))
+    assert len(results) == 2
+    for _id, local_score, server_score, _rtt in results:
+        assert local_score > 0
+        assert server_score == local_score
+    assert late.spectator and late.ended
+    assert str(late.id) not in late.board
+    assert 'tarde' not in [name for _score, name, *_ in server.results]
+    assert len(server.results) == 2
@@ -0,0 +1,54 @@
+"""Simulación sin pantalla: posición de las notas respecto a su tiempo y repetición exacta."""
+from ritmo_runner.autoplay import Bot
+from ritmo_runner.chart import ChartStream, compile_chart
+from ritmo_runner.simulation import Simulation
+
+
+def make_chart(tmp_path, beats, lane='A', figure='negra'):
+    source = tmp_path / 'prueba.chart'
+    lines = ["bpm = 120"] + [f"{beat} {lane} {figure}" for beat in beats]
+    source.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return ChartStream(compile_chart(str(source)))
+
+
+def perfect_presses(sim):
+    # Pulsa cada nota pendiente en el paso en que cae su tiempo
+    end = sim.time + sim.dt
+    return [(queue[0].lane, queue[0].time) for queue in sim.notes.lanes
+            if queue and sim.time < queue[0].time <= end]
+
+
+def test_chart_note_reaches_hit_line_on_time_across_level_up(tmp_path):
+    chart = make_chart(tmp_path, range(4, 40))
+    sim = Simulation(chart=chart, level_points=300)
+    arrivals = {}
+    while not sim.finished and sim.time < 30:
+        sim.step(perfect_presses(sim))
+        for note in sim.notes:
+            if abs(note.time - sim.time) <= sim.dt / 2:
+                arrivals[note.beat_time] = (note.level, sim.current_level, sim.note_x(note))
+    # Notas que aparecieron a una velocidad y llegan a otra
+    crossed = [a for a in arrivals.values() if a[0] < a[1]]
+    assert crossed
+    for _level, level, x in arrivals.values():
+        assert abs(x - sim.player.x) <= sim.levels[level]['speed'] * sim.dt / 2
+
+
+def replay(seed, steps=3000):
+    # Bot con semilla fija: las mismas pulsaciones si la partida es la misma
+    sim = Simulation(seed)
+    bot = Bot.from_profile('intermedio', seed=seed)
+    events = []
+    for _ in range(steps):
+        sim.step(bot.presses(sim))
+        events.extend(sim.events)
+        sim.events.clear()
+    return events, sim.score, sim.stats
+
+
+def test_same_seed_and_inputs_replay_the_same_game():
+    events, score, stats = replay(1234)
+    judgments = [event for event in events if event[0] == 'judgment']
+    assert judgments and score > 0
+    assert replay(1234) == (events, score, stats)
+    assert replay(4321)[0] != events
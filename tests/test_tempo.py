@@ -0,0 +1,98 @@
+"""Mapa de tempo: tablas acumuladas, cursor frente a búsqueda binaria y compases."""
+import random
+
+import pytest
+
+from ritmo_runner.tempo import TempoMap
+
+# 120 → 90 en el pulso 8, 150 en el 12, 60 en el 12.5 y 200 en el 20
+CHANGES = [(8, 90), (12, 150), (12.5, 60), (20, 200)]
+
+
+@pytest.fixture
+def tempo():
+    return TempoMap(120, CHANGES)
+
+
+def check_cursor(tempo, beats):
+    # El cursor debe dar exactamente lo mismo que la búsqueda binaria
+    cursor = tempo.cursor()
+    for beat in beats:
+        assert cursor.time(beat) == tempo.time(beat), beat
+    cursor = tempo.cursor()
+    for seconds in (tempo.time(beat) for beat in beats):
+        assert cursor.beat(seconds) == tempo.beat(seconds), seconds
+
+
+def test_cumulative_seconds(tempo):
+    assert tempo.seconds == pytest.approx([0.0, 4.0, 4 + 4 * 60 / 90, 4 + 4 * 60 / 90 + 0.5 * 60 / 150,
+                                           4 + 4 * 60 / 90 + 0.5 * 60 / 150 + 7.5])
+    assert tempo.time(10) == pytest.approx(4 + 2 * 60 / 90)
+    assert tempo.time(21) == pytest.approx(tempo.seconds[-1] + 60 / 200)
+    for beat in (0, 3, 8, 11.9, 12, 12.25, 12.5, 19.99, 20, 40):
+        assert tempo.beat(tempo.time(beat)) == pytest.approx(beat)
+
+
+def test_cursor_increasing(tempo):
+    check_cursor(tempo, [i * 0.05 for i in range(600)])
+
+
+def test_cursor_exact_boundaries(tempo):
+    beats = [beat for beat, _ in CHANGES]
+    check_cursor(tempo, [0.0] + beats)
+    check_cursor(tempo, [b + d for b in beats for d in (-1e-9, 0.0, 1e-9)])
+
+
+def test_cursor_jumps_one_two_and_many_segments(tempo):
+    # 0 → 8 (siguiente), 8 → 12.5 (dos), 12.5 → 30 (vuelve a la búsqueda)
+    check_cursor(tempo, [0, 8, 12.5, 30])
+    check_cursor(tempo, [1, 12.2, 12.6, 25])
+    check_cursor(tempo, [0, 25])
+
+
+def test_cursor_backward(tempo):
+    check_cursor(tempo, [25, 12.7, 12.1, 9, 2, -1, 0, 30, 8, 7.99])
+
+
+def test_cursor_random_sequence(tempo):
+    rng = random.Random(1)
+    check_cursor(tempo, [rng.uniform(-2, 30) for _ in range(2000)])
+
+
+def test_cursor_without_changes():
+    check_cursor(TempoMap(), [0, 5, 1, 100, 99.5])
+
+
+def test_meter_change_mid_bar():
+    # 4/4 y, a mitad del segundo compás, 3/4; luego 6/8 en el pulso 12
+    tempo = TempoMap(120, meters=[(6, 3, 4), (12, 6, 8)])
+    # El trozo 4-6 cuenta como compás entero: el 3/4 empieza en el compás 2
+    assert tempo.meter_bars == [0, 2, 4]
+    assert tempo.bar(0) == (0, 0)
+    assert tempo.bar(5) == (1, 1)
+    assert tempo.bar(6) == (2, 0)
+    assert tempo.bar(8.5) == (2, 2.5)
+    assert tempo.bar(9) == (3, 0)
+    assert tempo.bar(12) == (4, 0)
+    assert tempo.bar(15) == (5, 0)
+    assert tempo.bar(16.5) == (5, 1.5)
+
+
+def test_meter_change_on_bar_line():
+    tempo = TempoMap(120, meters=[(8, 3, 4)])
+    assert tempo.meter_bars == [0, 2]
+    assert tempo.bar(7.5) == (1, 3.5)
+    assert tempo.bar(8) == (2, 0)
+    assert tempo.bar(11) == (3, 0)
+
+
+def test_meter_at_beat_zero_replaces_initial():
+    tempo = TempoMap(120, meters=[(0, 3, 4)])
+    assert tempo.meter_changes() == [(0.0, 3, 4)]
+    assert tempo.bar(3) == (1, 0)
+
+
+@pytest.mark.parametrize('changes, meters', [([(-1, 100)], []), ([(4, 0)], []), ([], [(4, 3, 5)])])
+def test_invalid_changes(changes, meters):
+    with pytest.raises(ValueError):
+        TempoMap(120, changes, meters)